@@ -0,0 +1,71 @@
+# Benchmark de la búsqueda parcial por nombre: índice de trigramas vs recorrido lineal
+# Uso: python benchmarks/benchmark_busqueda.py [cantidad ...]
+import os
+import sys
+import time
+
+# Permite importar main.py desde la carpeta del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ListaPaises, buscar_por_nombre, invalidar_cache_consultas
+from datos_sinteticos import generar_paises
+
+# Tamaños por defecto pedidos para la comparación
+CANTIDADES = (10_000, 1_000_000, 10_000_000)
+
+# Términos de búsqueda: cortos, largos, frecuentes, raros y sin resultados
+TERMINOS = ("ar", "arg", "stan", "lombia", "zuegua", "xyz")
+
+#Mide el tiempo promedio de una búsqueda
+def medir(lista, termino, repeticiones):
+    """
+    Ejecuta buscar_por_nombre varias veces y devuelve el tiempo promedio.
+    Antes de cada búsqueda se vacía la caché de consultas (fuera del tiempo
+    medido): si no, desde la segunda repetición se mediría un acierto de la
+    caché y no el índice de trigramas.
+
+    Args:
+        lista (list): La lista de países (ListaPaises o lista común).
+        termino (str): El término a buscar.
+        repeticiones (int): Cantidad de veces que se repite la búsqueda.
+
+    Returns:
+        tuple: (segundos por búsqueda, cantidad de resultados)
+    """
+    total = 0
+    for _ in range(repeticiones):
+        invalidar_cache_consultas(lista)
+        inicio = time.perf_counter()
+        resultados = buscar_por_nombre(lista, termino)
+        total += time.perf_counter() - inicio
+    return total / repeticiones, len(resultados)
+
+#Función principal del benchmark
+def main():
+    """
+    Compara la búsqueda con índice contra el recorrido lineal para cada tamaño.
+    """
+    cantidades = [int(float(c)) for c in sys.argv[1:]] or CANTIDADES
+
+    for cantidad in cantidades:
+        inicio = time.perf_counter()
+        lista_indexada = ListaPaises(generar_paises(cantidad))
+        tiempo_carga = time.perf_counter() - inicio
+        # Lista común con las vistas (RegistroPais) de los mismos países: usa el recorrido lineal
+        lista_comun = list(lista_indexada)
+
+        # Con listas grandes se repite menos para no eternizar el recorrido lineal
+        repeticiones = max(1, 100_000 // cantidad)
+
+        print(f"\n=== {cantidad} países (carga con índices: {tiempo_carga:.2f} s) ===")
+        print(f"{'TERMINO':<10} | {'RESULTADOS':>10} | {'LINEAL (ms)':>12} | {'INDICE (ms)':>12} | {'MEJORA':>8}")
+        print("=" * 64)
+        for termino in TERMINOS:
+            tiempo_lineal, encontrados = medir(lista_comun, termino, repeticiones)
+            tiempo_indice, encontrados_indice = medir(lista_indexada, termino, repeticiones)
+            # Ambos caminos tienen que devolver lo mismo
+            assert encontrados == encontrados_indice
+            print(f"{termino:<10} | {encontrados:>10} | {tiempo_lineal * 1000:>12.3f} | {tiempo_indice * 1000:>12.3f} | {tiempo_lineal / tiempo_indice:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
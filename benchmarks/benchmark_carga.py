@@ -0,0 +1,69 @@
+# Benchmark de la carga del CSV: lectura en serie vs en paralelo con distinta cantidad de procesos
+# Uso: python benchmarks/benchmark_carga.py [cantidad ...]
+import csv
+import os
+import sys
+import tempfile
+import time
+
+# Permite importar main.py desde la carpeta del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import CLAVES_PAIS, ListaPaises, cargar_csv_paralelo, leer_paises_csv
+from datos_sinteticos import generar_paises
+
+# Tamaños por defecto
+CANTIDADES = (1_000_000, 5_000_000)
+
+#Escribe un CSV de prueba
+def escribir_csv(nombre_archivo, cantidad):
+    """
+    Escribe un CSV con países sintéticos.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo a escribir.
+        cantidad (int): Cantidad de países.
+    """
+    with open(nombre_archivo, 'w', encoding='utf-8', newline='') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=CLAVES_PAIS)
+        escritor.writeheader()
+        escritor.writerows(generar_paises(cantidad))
+
+#Función principal del benchmark
+def main():
+    """
+    Mide la lectura en serie y en paralelo (1 a la cantidad de núcleos,
+    de a potencias de 2) y verifica que den las mismas columnas.
+    """
+    cantidades = [int(float(c)) for c in sys.argv[1:]] or CANTIDADES
+    nucleos = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    procesos = [2 ** i for i in range(1, nucleos.bit_length()) if 2 ** i <= nucleos]
+    if nucleos not in procesos and nucleos > 1:
+        procesos.append(nucleos)
+
+    for cantidad in cantidades:
+        with tempfile.TemporaryDirectory() as carpeta:
+            nombre_archivo = os.path.join(carpeta, "paises.csv")
+            escribir_csv(nombre_archivo, cantidad)
+            megas = os.path.getsize(nombre_archivo) / 2 ** 20
+
+            inicio = time.perf_counter()
+            serie = ListaPaises(leer_paises_csv(nombre_archivo))
+            tiempo_serie = time.perf_counter() - inicio
+
+            print(f"\n=== {cantidad} países ({megas:.0f} MB, {nucleos} núcleo/s) ===")
+            print(f"{'PROCESOS':<10} | {'TIEMPO (s)':>10} | {'MB/s':>8} | {'MEJORA':>8}")
+            print("=" * 46)
+            print(f"{'serie':<10} | {tiempo_serie:>10.2f} | {megas / tiempo_serie:>8.1f} | {1:>7.1f}x")
+            for cantidad_procesos in procesos:
+                inicio = time.perf_counter()
+                paralela = cargar_csv_paralelo(nombre_archivo, cantidad_procesos)
+                tiempo = time.perf_counter() - inicio
+                # Ambos caminos tienen que dar las mismas columnas
+                assert paralela.nombres == serie.nombres and paralela.poblaciones == serie.poblaciones
+                assert paralela.superficies == serie.superficies and paralela.codigos_continente == serie.codigos_continente
+                assert paralela.desplazamientos_nombres == serie.desplazamientos_nombres and paralela.continentes == serie.continentes
+                print(f"{cantidad_procesos:<10} | {tiempo:>10.2f} | {megas / tiempo:>8.1f} | {tiempo_serie / tiempo:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
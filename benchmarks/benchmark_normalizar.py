@@ -0,0 +1,86 @@
+# Micro-benchmark de normalizar_texto y de las columnas normalizadas precalculadas
+# Uso: python benchmarks/benchmark_normalizar.py [cantidad]
+import os
+import sys
+import time
+import timeit
+
+# Permite importar main.py desde la carpeta del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ListaPaises, filtrar_posiciones, normalizar_texto
+from datos_sinteticos import generar_paises
+
+#Versión anterior de normalizar_texto, como referencia
+def normalizar_texto_reemplazos(texto):
+    """
+    Normalización con lower() y un str.replace por vocal (la implementación original).
+
+    Args:
+        texto (str): La cadena de texto a normalizar.
+
+    Returns:
+        str: El texto normalizado.
+    """
+    texto = texto.lower()
+    for a, b in (("á", "a"), ("é", "e"), ("í", "i"), ("ó", "o"), ("ú", "u")):
+        texto = texto.replace(a, b)
+    return texto
+
+#Mide cuántos textos por segundo normaliza una función
+def medir_normalizacion(funcion, textos, repeticiones=5):
+    """
+    Normaliza todos los textos con la función indicada varias veces y se
+    queda con la mejor vuelta (la menos afectada por el resto del sistema).
+
+    Args:
+        funcion (function): La función de normalización.
+        textos (list): Los textos a normalizar.
+        repeticiones (int): Cantidad de vueltas.
+
+    Returns:
+        float: Textos normalizados por segundo.
+    """
+    mejor = min(timeit.repeat(lambda: [funcion(texto) for texto in textos], number=1, repeat=repeticiones))
+    return len(textos) / mejor
+
+#Función principal del benchmark
+def main():
+    """
+    Compara la normalización anterior con la nueva y el filtro por
+    continente normalizando en cada consulta contra la columna precalculada.
+    """
+    cantidad = int(float(sys.argv[1])) if len(sys.argv) > 1 else 200_000
+    paises = list(generar_paises(cantidad))
+    textos = [pais["NOMBRE"] for pais in paises] + [pais["CONTINENTE"] for pais in paises]
+
+    grupos = (
+        ("Todos", textos),
+        ("ASCII", [texto for texto in textos if texto.isascii()]),
+        ("Con tildes/ñ", [texto for texto in textos if not texto.isascii()]),
+    )
+    print("\n=== normalizar_texto (textos/s) ===")
+    print(f"{'TEXTOS':<14} | {'CANTIDAD':>9} | {'REEMPLAZOS':>12} | {'TRANSLATE':>12} | {'MEJORA':>7}")
+    print("=" * 66)
+    for nombre, grupo in grupos:
+        anterior = medir_normalizacion(normalizar_texto_reemplazos, grupo)
+        nueva = medir_normalizacion(normalizar_texto, grupo)
+        print(f"{nombre:<14} | {len(grupo):>9} | {anterior:>12,.0f} | {nueva:>12,.0f} | {nueva / anterior:>6.1f}x")
+
+    # Filtro por continente: normalizar cada fila vs comparar códigos precalculados
+    lista = ListaPaises(paises)
+    inicio = time.perf_counter()
+    por_fila = [pais for pais in paises if normalizar_texto_reemplazos(pais["CONTINENTE"]) == "asia"]
+    tiempo_por_fila = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    precalculado = filtrar_posiciones(lista, continente="asia")
+    tiempo_precalculado = time.perf_counter() - inicio
+
+    assert len(por_fila) == len(precalculado)
+    print(f"\n=== Filtro por continente ({cantidad} países) ===")
+    print(f"Normalizando cada fila: {tiempo_por_fila * 1000:>10.1f} ms")
+    print(f"Columna precalculada:   {tiempo_precalculado * 1000:>10.1f} ms  ({tiempo_por_fila / tiempo_precalculado:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Prueba de carga del servicio HTTP (main.py serve): peticiones por segundo y latencias por ruta
+# Uso: python benchmarks/benchmark_servicio.py [--cantidad 100000] [--conexiones 32] [--duracion 10] [--escrituras 0.01] [--url http://...]
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+# Permite importar main.py desde la carpeta del proyecto
+CARPETA_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CARPETA_PROYECTO)
+
+from main import CLAVES_PAIS, escribir_csv_atomico
+from datos_sinteticos import CONTINENTES, generar_paises
+
+#Envia una peticion por una conexion abierta
+async def pedir(lector, escritor, host, metodo, ruta, cuerpo=None):
+    """
+    Envía una petición HTTP/1.1 (manteniendo la conexión) y lee la respuesta.
+
+    Args:
+        lector (asyncio.StreamReader): La conexión.
+        escritor (asyncio.StreamWriter): La conexión.
+        host (str): El encabezado Host.
+        metodo (str): 'GET' o 'PUT'.
+        ruta (str): La ruta con los parámetros.
+        cuerpo (dict): El JSON a enviar, o None.
+
+    Returns:
+        tuple: (código HTTP, cuerpo de la respuesta en bytes)
+    """
+    datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+    escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(datos)}\r\n\r\n".encode("latin-1") + datos)
+    await escritor.drain()
+
+    estado = int((await lector.readline()).split()[1])
+    largo = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        if nombre.lower() == "content-length":
+            largo = int(valor)
+    return estado, await lector.readexactly(largo)
+
+#Elige la proxima peticion de la mezcla
+def elegir_peticion(generador, nombres, escrituras):
+    """
+    Elige una petición al azar: búsquedas, filtros, ordenamientos, rankings,
+    estadísticas, agregados por continente, lecturas de un país y (con la
+    proporción pedida) modificaciones.
+
+    Args:
+        generador (random.Random): El generador de números al azar.
+        nombres (list): Nombres de países existentes.
+        escrituras (float): Proporción de modificaciones (0 a 1).
+
+    Returns:
+        tuple: (tipo, método, ruta, cuerpo)
+    """
+    if generador.random() < escrituras:
+        nombre = generador.choice(nombres)
+        cuerpo = {"POBLACION": generador.randint(1, 10 ** 9), "SUPERFICIE": generador.randint(1, 10 ** 7)}
+        return "PUT /countries", "PUT", f"/countries/{quote(nombre)}", cuerpo
+
+    tipo = generador.choice(("search", "filter", "sort", "top", "stats", "groups", "countries"))
+    continente = quote(generador.choice(CONTINENTES))
+    if tipo == "search":
+        nombre = generador.choice(nombres)
+        inicio = generador.randrange(max(1, len(nombre) - 3))
+        return "GET /search", "GET", f"/search?q={quote(nombre[inicio:inicio + 3])}&limit=20", None
+    if tipo == "filter":
+        minimo = generador.randint(0, 10 ** 9)
+        return "GET /filter", "GET", f"/filter?continent={continente}&pop_min={minimo}&pop_max={minimo + 10 ** 7}&sort=POBLACION:desc&limit=50", None
+    if tipo == "sort":
+        return "GET /sort", "GET", f"/sort?sort={generador.choice(CLAVES_PAIS)}:{generador.choice(('asc', 'desc'))}&limit=20", None
+    if tipo == "top":
+        clave = generador.choice(("POBLACION", "SUPERFICIE"))
+        return "GET /top", "GET", f"/top?by={clave}:{generador.choice(('asc', 'desc'))}&k=20", None
+    if tipo == "stats":
+        return "GET /stats", "GET", f"/stats?continent={continente}", None
+    if tipo == "groups":
+        minimo = generador.randint(0, 10 ** 9)
+        return "GET /groups", "GET", f"/groups?pop_min={minimo}&pop_max={minimo + 10 ** 8}", None
+    return "GET /countries", "GET", f"/countries/{quote(generador.choice(nombres))}", None
+
+#Cliente que envia peticiones sin pausa
+async def cliente(host, puerto, nombres, escrituras, fin, semilla, latencias, errores):
+    """
+    Abre una conexión y envía peticiones una detrás de otra hasta el fin.
+
+    Args:
+        host (str): El servidor.
+        puerto (int): El puerto.
+        nombres (list): Nombres de países existentes.
+        escrituras (float): Proporción de modificaciones.
+        fin (float): Momento (time.perf_counter) en que se deja de enviar.
+        semilla (int): Semilla del generador de este cliente.
+        latencias (dict): tipo -> lista de segundos (se completa).
+        errores (dict): tipo -> cantidad de respuestas con error (se completa).
+    """
+    generador = random.Random(semilla)
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while time.perf_counter() < fin:
+            tipo, metodo, ruta, cuerpo = elegir_peticion(generador, nombres, escrituras)
+            inicio = time.perf_counter()
+            estado, _ = await pedir(lector, escritor, host, metodo, ruta, cuerpo)
+            latencias.setdefault(tipo, []).append(time.perf_counter() - inicio)
+            if estado >= 400:
+                errores[tipo] = errores.get(tipo, 0) + 1
+    finally:
+        escritor.close()
+
+#Ejecuta la prueba de carga
+async def probar(host, puerto, conexiones, duracion, escrituras):
+    """
+    Lanza los clientes concurrentes y muestra el resultado.
+
+    Args:
+        host (str): El servidor.
+        puerto (int): El puerto.
+        conexiones (int): Cantidad de clientes simultáneos.
+        duracion (float): Segundos de prueba.
+        escrituras (float): Proporción de modificaciones.
+    """
+    # Nombres existentes para búsquedas, lecturas y modificaciones
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    _, cuerpo = await pedir(lector, escritor, host, "GET", "/filter?limit=1000")
+    escritor.close()
+    nombres = [pais["NOMBRE"] for pais in json.loads(cuerpo)]
+
+    latencias = {}
+    errores = {}
+    inicio = time.perf_counter()
+    fin = inicio + duracion
+    await asyncio.gather(*(cliente(host, puerto, nombres, escrituras, fin, semilla, latencias, errores)
+                           for semilla in range(conexiones)))
+    tiempo = time.perf_counter() - inicio
+
+    total = sum(len(valores) for valores in latencias.values())
+    print(f"\n=== {conexiones} conexiones, {duracion:.0f} s, {escrituras:.0%} escrituras ===")
+    print(f"{'RUTA':<16} | {'PETICIONES':>10} | {'POR SEG':>9} | {'P50 (ms)':>9} | {'P99 (ms)':>9} | {'ERRORES':>7}")
+    print("=" * 76)
+    for tipo, valores in sorted(latencias.items()):
+        valores.sort()
+        p50 = valores[len(valores) // 2] * 1000
+        p99 = valores[min(len(valores) - 1, int(len(valores) * 0.99))] * 1000
+        print(f"{tipo:<16} | {len(valores):>10} | {len(valores) / tiempo:>9.1f} | {p50:>9.2f} | {p99:>9.2f} | {errores.get(tipo, 0):>7}")
+    print("=" * 76)
+    print(f"{'TOTAL':<16} | {total:>10} | {total / tiempo:>9.1f} |")
+
+#Función principal del benchmark
+def main():
+    """
+    Levanta el servicio con datos sintéticos (o usa uno que ya esté
+    corriendo con --url) y lo prueba con clientes concurrentes.
+    """
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio HTTP")
+    parser.add_argument("--cantidad", type=lambda texto: int(float(texto)), default=100_000, help="Cantidad de países sintéticos")
+    parser.add_argument("--conexiones", type=int, default=32, help="Clientes simultáneos")
+    parser.add_argument("--duracion", type=float, default=10, help="Segundos de prueba")
+    parser.add_argument("--escrituras", type=float, default=0.01, help="Proporción de modificaciones (PUT)")
+    parser.add_argument("--workers", type=int, default=1, help="--workers del servicio")
+    parser.add_argument("--url", help="Probar un servicio que ya está corriendo (ej: http://127.0.0.1:8000)")
+    argumentos = parser.parse_args()
+
+    if argumentos.url:
+        partes = urlsplit(argumentos.url)
+        asyncio.run(probar(partes.hostname, partes.port or 80, argumentos.conexiones, argumentos.duracion, argumentos.escrituras))
+        return
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        nombre_archivo = os.path.join(carpeta, "datos_paises.csv")
+        escribir_csv_atomico(generar_paises(argumentos.cantidad), nombre_archivo)
+        # Puerto 0: el servicio elige uno libre y lo informa en su primera línea.
+        # La salida va a un archivo: un pipe sin leer se llenaría (ej: con los errores del servicio)
+        registro = os.path.join(carpeta, "servicio.log")
+        with open(registro, 'w', encoding='utf-8') as salida:
+            servicio = subprocess.Popen([sys.executable, os.path.join(CARPETA_PROYECTO, "main.py"), "--data", nombre_archivo,
+                                         "--workers", str(argumentos.workers), "serve", "--port", "0"],
+                                        stdout=salida, stderr=subprocess.STDOUT)
+        try:
+            linea = ""
+            while servicio.poll() is None and "\n" not in linea:
+                time.sleep(0.1)
+                with open(registro, 'r', encoding='utf-8') as archivo:
+                    linea = archivo.readline()
+            direccion = re.search(r"http://([\d.]+):(\d+)", linea)
+            if direccion is None:
+                sys.exit(f"El servicio no arrancó: {linea!r}")
+            print(linea.strip())
+            asyncio.run(probar(direccion[1], int(direccion[2]), argumentos.conexiones, argumentos.duracion, argumentos.escrituras))
+        finally:
+            servicio.terminate()
+            servicio.wait()
+
+if __name__ == "__main__":
+    main()
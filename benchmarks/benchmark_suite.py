@@ -0,0 +1,298 @@
+# Suite de benchmarks de las operaciones del menú: carga, guardado, búsquedas, filtros, ordenamientos y estadísticas
+# Uso: python benchmarks/benchmark_suite.py [--cantidades 1e3 1e4 ...] [--salida resultados.json] [--comparar anterior.json]
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Permite importar main.py desde la carpeta del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as programa
+from datos_sinteticos import generar_paises
+
+try:
+    import resource
+except ImportError:
+    # En Windows no existe: no se informa el máximo de memoria del proceso
+    resource = None
+
+# Tamaños por defecto (10^7 se puede pedir con --cantidades, pero tarda varios minutos)
+CANTIDADES = (1_000, 10_000, 100_000, 1_000_000)
+
+# Una operación más lenta que esta proporción respecto de la corrida anterior es una regresión
+UMBRAL_REGRESION = 1.2
+
+#Ejecuta una funcion del menu con entrada simulada
+def con_entrada(funcion, texto):
+    """
+    Devuelve una función que ejecuta 'funcion' leyendo 'texto' como si lo
+    escribiera el usuario y descartando lo que imprime.
+
+    Args:
+        funcion (callable): La función del menú (sin argumentos).
+        texto (str): Las respuestas del usuario, una por línea.
+
+    Returns:
+        callable: La función lista para medir.
+    """
+    def ejecutar():
+        entrada_original = sys.stdin
+        sys.stdin = io.StringIO(texto)
+        try:
+            with open(os.devnull, 'w', encoding='utf-8') as nulo, contextlib.redirect_stdout(nulo):
+                funcion()
+        finally:
+            sys.stdin = entrada_original
+    return ejecutar
+
+#Arma la lista de operaciones a medir
+def operaciones(lista, nombre_archivo, generador):
+    """
+    Arma las operaciones del menú a medir sobre una lista ya cargada.
+
+    Args:
+        lista (ListaPaises): La lista de países.
+        nombre_archivo (str): El CSV de la lista.
+        generador (random.Random): Para elegir nombres y rangos.
+
+    Returns:
+        list: Tuplas (nombre, función, preparación o None, recorre toda la lista).
+    """
+    nombres = [lista.nombre(generador.randrange(len(lista))) for _ in range(1000)]
+    siguiente_nombre = iter(nombres * 1000).__next__
+    poblacion_media = lista.total_poblacion // len(lista)
+    superficie_media = lista.total_superficie // len(lista)
+
+    def sin_snapshot():
+        if os.path.exists(nombre_archivo + ".snapshot"):
+            os.remove(nombre_archivo + ".snapshot")
+
+    def guardar():
+        with open(os.devnull, 'w', encoding='utf-8') as nulo, contextlib.redirect_stdout(nulo):
+            programa.guardar_datos_csv(lista, nombre_archivo)
+
+    # Sin caché: se mide la consulta, no la búsqueda en la caché de consultas
+    sin_cache = lambda: programa.invalidar_cache_consultas(lista)
+
+    resultado = [
+        ("cargar_datos_csv (CSV)", lambda: programa.cargar_datos_csv(nombre_archivo), sin_snapshot, True),
+        ("cargar_datos_csv (snapshot)", lambda: programa.cargar_datos_csv(nombre_archivo), None, True),
+        ("guardar_datos_csv", guardar, None, True),
+        ("buscar_pais_lista", lambda: programa.buscar_pais_lista(lista, siguiente_nombre()), None, False),
+    ]
+    consultas = [
+        ("buscar_pais", con_entrada(lambda: programa.buscar_pais(lista), nombres[0][:4] + "\n"), False),
+        ("filtro_continente", con_entrada(lambda: programa.filtro_continente(lista, programa.CONTINENTES), "asia\n"), True),
+        ("filtro_poblacion", con_entrada(lambda: programa.filtro_poblacion(lista), f"0\n{poblacion_media // 10}\n"), True),
+        ("filtro_superficie", con_entrada(lambda: programa.filtro_superficie(lista), f"0\n{superficie_media // 10}\n"), True),
+        ("filtro_combinado", con_entrada(lambda: programa.filtro_combinado(lista, programa.CONTINENTES),
+                                         f"{nombres[0][:3]}\nasia\n0\n{poblacion_media}\n\n\n"), True),
+    ]
+    # Cada consulta se mide calculándola y repetida (resuelta con la caché)
+    for nombre, funcion, recorre_todo in consultas:
+        resultado.append((nombre, funcion, sin_cache, recorre_todo))
+        resultado.append((f"{nombre} (caché)", funcion, None, recorre_todo))
+    for clave in programa.CLAVES_PAIS:
+        for reversa in (False, True):
+            resultado.append((f"ordenar_lista {clave}{' desc' if reversa else ''}",
+                              lambda clave=clave, reversa=reversa: programa.ordenar_lista(lista, clave, reversa),
+                              sin_cache, True))
+    resultado.append(("ordenar_lista NOMBRE (caché)", lambda: programa.ordenar_lista(lista, "NOMBRE"), None, True))
+    # Top-K: desde el índice ordenado y con el heap (pasando las posiciones se fuerza el recorrido)
+    for clave in programa.CLAVES_NUMERICAS:
+        resultado.append((f"ranking_paises {clave} k=20 (índice)", lambda clave=clave: programa.ranking_paises(lista, clave, 20),
+                          lambda clave=clave: lista.indice_ordenado(clave), False))
+        resultado.append((f"ranking_paises {clave} k=20 (heap)",
+                          lambda clave=clave: programa.ranking_paises(lista, clave, 20, posiciones=range(len(lista))), None, True))
+    resultado.append(("calcular_poblacion", con_entrada(lambda: programa.calcular_poblacion(lista), "10\n\n"), None, False))
+    for estadistica in (programa.promedio_poblacion, programa.promedio_superficie):
+        resultado.append((estadistica.__name__, con_entrada(lambda estadistica=estadistica: estadistica(lista), "\n"), None, False))
+    # Sin exportar: Enter en el nombre del archivo y Enter para continuar
+    resultado.append(("paises_por_continente", con_entrada(lambda: programa.paises_por_continente(lista), "\n"), None, True))
+    # Agregados por continente: sobre las columnas y con una pasada por los registros
+    resultado.append(("agrupar_por_continente", lambda: programa.agrupar_por_continente(lista), None, True))
+    resultado.append(("agrupar_por_continente (pasada)", lambda: programa.agrupar_por_continente(iter(lista)), None, True))
+    resultado.append(("estadisticas_lista asia", lambda: programa.estadisticas_lista(lista, "asia"), None, True))
+    return resultado
+
+#Calcula un percentil de una lista ordenada
+def percentil(ordenados, porcentaje):
+    """
+    Percentil por rango más cercano.
+
+    Args:
+        ordenados (list): Los valores, ordenados de menor a mayor.
+        porcentaje (float): El percentil (0 a 100).
+
+    Returns:
+        float: El valor del percentil.
+    """
+    posicion = max(0, min(len(ordenados) - 1, round(porcentaje / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[posicion]
+
+#Mide una operacion
+def medir(funcion, preparar, presupuesto, minimo, maximo):
+    """
+    Ejecuta la operación hasta agotar el presupuesto de tiempo (con un mínimo
+    y un máximo de repeticiones) y mide cada ejecución por separado. Después
+    la ejecuta una vez más con tracemalloc para el pico de memoria.
+
+    Args:
+        funcion (callable): La operación.
+        preparar (callable): Se llama antes de cada ejecución, fuera de la medición (o None).
+        presupuesto (float): Segundos de medición por operación.
+        minimo (int): Repeticiones mínimas.
+        maximo (int): Repeticiones máximas.
+
+    Returns:
+        dict: Latencias (segundos) y pico de memoria (bytes).
+    """
+    latencias = []
+    inicio_total = time.perf_counter()
+    while len(latencias) < maximo and (len(latencias) < minimo or time.perf_counter() - inicio_total < presupuesto):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        latencias.append(time.perf_counter() - inicio)
+
+    if preparar is not None:
+        preparar()
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencias.sort()
+    media = sum(latencias) / len(latencias)
+    return {
+        "repeticiones": len(latencias),
+        "media_s": media,
+        "min_s": latencias[0],
+        "p50_s": percentil(latencias, 50),
+        "p90_s": percentil(latencias, 90),
+        "p99_s": percentil(latencias, 99),
+        "max_s": latencias[-1],
+        "operaciones_por_segundo": 1 / media if media else None,
+        "memoria_pico_bytes": pico,
+    }
+
+#Obtiene el commit actual del repositorio
+def commit_actual():
+    """
+    Returns:
+        str: El commit de git del proyecto, o None si no se puede obtener.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+#Compara los resultados con una corrida anterior
+def comparar(resultados, anterior, umbral):
+    """
+    Compara la mediana de cada operación con la de una corrida anterior e
+    informa las que empeoraron más que el umbral.
+
+    Args:
+        resultados (list): Los resultados de esta corrida.
+        anterior (dict): El JSON de la corrida anterior.
+        umbral (float): Proporción a partir de la cual se considera regresión.
+
+    Returns:
+        int: Cantidad de regresiones.
+    """
+    medianas = {(r["cantidad"], r["operacion"]): r["p50_s"] for r in anterior["resultados"]}
+    regresiones = 0
+    print(f"\n{'OPERACION':<32} | {'CANTIDAD':>9} | {'ANTES (ms)':>11} | {'AHORA (ms)':>11} | {'CAMBIO':>7}", file=sys.stderr)
+    print("=" * 82, file=sys.stderr)
+    for r in resultados:
+        antes = medianas.get((r["cantidad"], r["operacion"]))
+        if not antes:
+            continue
+        proporcion = r["p50_s"] / antes
+        marca = "  <-- regresión" if proporcion > umbral else ""
+        regresiones += bool(marca)
+        print(f"{r['operacion']:<32} | {r['cantidad']:>9} | {antes * 1000:>11.3f} | {r['p50_s'] * 1000:>11.3f} | {proporcion:>6.2f}x{marca}", file=sys.stderr)
+    return regresiones
+
+#Función principal del benchmark
+def main():
+    """
+    Genera los datos de cada tamaño, mide todas las operaciones y escribe
+    los resultados en JSON (y un resumen legible en la salida de errores).
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks de las operaciones del menú")
+    parser.add_argument("--cantidades", nargs="+", type=lambda texto: int(float(texto)), default=CANTIDADES,
+                        help="Cantidades de países (ej: 1e3 1e5 1e7)")
+    parser.add_argument("--presupuesto", type=float, default=1.0, help="Segundos de medición por operación")
+    parser.add_argument("--minimo", type=int, default=3, help="Repeticiones mínimas por operación")
+    parser.add_argument("--maximo", type=int, default=1000, help="Repeticiones máximas por operación")
+    parser.add_argument("--operaciones", help="Medir solo las operaciones que contienen este texto")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, la salida estándar)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION, help="Proporción de empeoramiento que cuenta como regresión")
+    argumentos = parser.parse_args()
+
+    # Los listados se escriben completos, sin esperar Enter
+    programa._pantalla["pausar"] = False
+
+    resultados = []
+    for cantidad in argumentos.cantidades:
+        with tempfile.TemporaryDirectory() as carpeta:
+            nombre_archivo = os.path.join(carpeta, "datos_paises.csv")
+            programa.escribir_csv_atomico(generar_paises(cantidad), nombre_archivo)
+            lista = programa.cargar_datos_csv(nombre_archivo)
+
+            print(f"\n=== {cantidad} países ===", file=sys.stderr)
+            print(f"{'OPERACION':<32} | {'REP':>5} | {'P50 (ms)':>10} | {'P99 (ms)':>10} | {'FILAS/S':>12} | {'PICO (MB)':>9}", file=sys.stderr)
+            print("=" * 92, file=sys.stderr)
+            for nombre, funcion, preparar, recorre_todo in operaciones(lista, nombre_archivo, random.Random(cantidad)):
+                if argumentos.operaciones and argumentos.operaciones not in nombre:
+                    continue
+                medicion = medir(funcion, preparar, argumentos.presupuesto, argumentos.minimo, argumentos.maximo)
+                filas_por_segundo = cantidad * medicion["operaciones_por_segundo"] if recorre_todo and medicion["operaciones_por_segundo"] else None
+                resultados.append({"cantidad": cantidad, "operacion": nombre, **medicion, "filas_por_segundo": filas_por_segundo})
+                filas = f"{filas_por_segundo:>12.0f}" if filas_por_segundo else f"{'-':>12}"
+                print(f"{nombre:<32} | {medicion['repeticiones']:>5} | {medicion['p50_s'] * 1000:>10.3f} | "
+                      f"{medicion['p99_s'] * 1000:>10.3f} | {filas} | {medicion['memoria_pico_bytes'] / 2 ** 20:>9.1f}", file=sys.stderr)
+
+    informe = {
+        "meta": {
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_actual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "procesador": platform.processor() or platform.machine(),
+        },
+        # ru_maxrss está en KB en Linux (en bytes en macOS)
+        "rss_maximo": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+        "resultados": resultados,
+    }
+    texto = json.dumps(informe, ensure_ascii=False, indent=2)
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, 'r', encoding='utf-8') as archivo:
+            regresiones = comparar(resultados, json.load(archivo), argumentos.umbral)
+        if regresiones:
+            print(f"\n{regresiones} regresión/es", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Generador de datos de prueba para los benchmarks
+import random
+
+# Sílabas para armar nombres de países inventados
+SILABAS = (
+    "ar", "gen", "ti", "na", "bra", "sil", "chi", "le", "pe", "ru",
+    "co", "lom", "bia", "me", "xi", "ca", "da", "es", "pa", "ña",
+    "fran", "cia", "ita", "lia", "ale", "ma", "nia", "ru", "sia", "in",
+    "dia", "ja", "pon", "egip", "to", "ke", "nia", "aus", "tra", "lan",
+    "dia", "stan", "gua", "tem", "ur", "u", "pa", "ra", "ve", "zue",
+)
+
+# Continentes con el mismo formato que el CSV
+CONTINENTES = ("América", "Europa", "Asia", "África", "Oceanía", "Antártida")
+
+#Genera paises al azar con el esquema de datos_paises.csv
+def generar_paises(cantidad, semilla=42):
+    """
+    Genera países sintéticos con las columnas de datos_paises.csv.
+    Con la misma semilla siempre se obtienen los mismos datos.
+
+    Args:
+        cantidad (int): Cantidad de países a generar.
+        semilla (int): Semilla del generador aleatorio.
+
+    Yields:
+        dict: Un país con NOMBRE, POBLACION, SUPERFICIE y CONTINENTE.
+    """
+    generador = random.Random(semilla)
+    for i in range(cantidad):
+        silabas = generador.choices(SILABAS, k=generador.randint(2, 4))
+        yield {
+            "NOMBRE": "".join(silabas).title() + f" {i}",
+            "POBLACION": generador.randint(1_000, 1_500_000_000),
+            "SUPERFICIE": generador.randint(1, 17_000_000),
+            "CONTINENTE": generador.choice(CONTINENTES),
+        }
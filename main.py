@@ -1,58 +1,2382 @@
 # Importación de modulos
+import argparse
+import asyncio
+import atexit
 import csv 
+import functools
+import heapq
+import io
+import json
+import mmap
 import os   
+import re
+import shlex
+import shutil
+import signal
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from multiprocessing import shared_memory
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from collections.abc import Mapping
+from itertools import compress, islice
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+# Cantidad de cambios en el journal que dispara la compactación en segundo plano
+UMBRAL_COMPACTACION = 1000
+
+# Columnas del journal de cambios: la operación más las columnas del CSV
+COLUMNAS_JOURNAL = ["OPERACION", "NOMBRE", "POBLACION", "SUPERFICIE", "CONTINENTE"]
+
+# Snapshot binario: identificador, versión y cabecera
+# (identificador, versión, cantidad de países, mtime y tamaño del CSV de origen,
+# bytes de los nombres, bytes de la tabla de continentes)
+MAGIA_SNAPSHOT = b"PAIS"
+VERSION_SNAPSHOT = 1
+CABECERA_SNAPSHOT = struct.Struct("<4sIQqqQQ")
+
+# Candado que ordena las escrituras del journal y la compactación
+_candado_datos = threading.Lock()
+
+# Estado del journal por archivo: cantidad de entradas e hilo de compactación activo
+_entradas_journal = {}
+_hilos_compactacion = {}
+
+# Tamaño del CSV a partir del cual se lee en paralelo (si hay más de un núcleo)
+UMBRAL_CARGA_PARALELA = 64 * 1024 * 1024
+
+# Extensiones de archivo que se guardan en SQLite (el resto, en CSV)
+EXTENSIONES_SQLITE = (".db", ".sqlite", ".sqlite3")
+
+# Cantidad de países a partir de la cual el menú filtra en varios procesos
+UMBRAL_CONSULTA_PARALELA = 1_000_000
+
+# Filas de tabla que se arman y escriben juntas (una escritura por bloque)
+FILAS_POR_BLOQUE = 10_000
+
+# Resultados de consultas que guarda cada ListaPaises (ver CacheConsultas)
+TAMANO_CACHE_CONSULTAS = 256
+
+# Un índice conviene si deja menos de 1/FACTOR_RECORRIDO de la lista: volver sus
+# posiciones al orden de la lista cuesta unas 5 veces más por fila que recorrer una columna
+FACTOR_RECORRIDO = 5
+
+# Opciones de pantalla del menú (main las cambia con --no-pause)
+_pantalla = {"pausar": True}
+
+# Claves de cada país, en el orden de las columnas del CSV
+CLAVES_PAIS = ("NOMBRE", "POBLACION", "SUPERFICIE", "CONTINENTE")
+
+# Claves numéricas que tienen índice ordenado
+CLAVES_NUMERICAS = ("POBLACION", "SUPERFICIE")
+
+# Continentes válidos: nombre normalizado -> nombre con formato
+CONTINENTES = {
+    "america": "América",
+    "europa": "Europa",
+    "asia": "Asia",
+    "africa": "África",
+    "oceania": "Oceanía",
+    "antartida": "Antártida"
+}
+
+# Caché de resultados de consultas de una ListaPaises
+class CacheConsultas:
+    """
+    Caché LRU de resultados de consultas de una ListaPaises: las posiciones
+    de las búsquedas por nombre, de los filtros y de los ordenamientos, con
+    una clave normalizada (operación y parámetros, ej: ('filtro', 'asia',
+    None, None)). Guarda posiciones y no países: los registros se arman al
+    devolverlos y siempre muestran los valores actuales. Al llenarse se
+    descarta el resultado usado hace más tiempo.
+
+    Cuando la lista cambia solo se descartan los resultados que dependen
+    de la fila tocada:
+      - búsqueda por nombre: un alta cuyo nombre contiene el término (las
+        modificaciones no cambian nombres);
+      - filtro: un alta que lo cumple, o una modificación que hace entrar o
+        salir al país;
+      - consulta compuesta (nombre y filtros): lo mismo que un filtro, pero
+        solo si el nombre del país contiene el término;
+      - ordenamiento: cualquier alta, y las modificaciones si alguna de sus
+        claves es numérica.
+    Para no revisar toda la caché en cada cambio, las claves se agrupan por
+    tipo: los ordenamientos (con y sin claves numéricas), las búsquedas por
+    nombre y los filtros por continente. Un cambio solo revisa los grupos
+    que pueden depender de él (ej: una modificación en Asia, los filtros sin
+    continente y los de Asia, y los ordenamientos numéricos).
+
+    Se puede usar desde varios hilos (el servicio HTTP resuelve las
+    lecturas en hilos): cada operación toma un candado.
+
+    Attributes:
+        capacidad (int): Cantidad máxima de resultados guardados (0 la desactiva).
+        aciertos (int): Consultas resueltas con la caché.
+        fallos (int): Consultas que hubo que calcular.
+        invalidaciones (int): Resultados descartados por cambios en la lista.
+    """
+    def __init__(self, capacidad=TAMANO_CACHE_CONSULTAS):
+        self.capacidad = capacidad
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self._resultados = OrderedDict()
+        # Claves guardadas agrupadas por tipo (ver _grupo)
+        self._ordenes = set()
+        self._ordenes_numericos = set()
+        self._nombres = set()
+        self._filtros_por_continente = {}
+        self._candado = threading.Lock()
+
+    def __len__(self):
+        return len(self._resultados)
+
+    def _grupo(self, clave):
+        """
+        Returns:
+            set: El grupo de claves al que pertenece la clave: ordenamientos
+                 con o sin claves numéricas, búsquedas por nombre, o filtros
+                 y consultas compuestas de su continente (None: sin continente).
+        """
+        operacion = clave[0]
+        if operacion == "orden":
+            return self._ordenes_numericos if any(c in CLAVES_NUMERICAS for c in clave[1]) else self._ordenes
+        if operacion == "nombre":
+            return self._nombres
+        continente = clave[2] if operacion == "consulta" else clave[1]
+        return self._filtros_por_continente.setdefault(continente, set())
+
+    def _descartar(self, clave):
+        """
+        Saca una clave de su grupo (el resultado ya se sacó de la caché).
+        """
+        grupo = self._grupo(clave)
+        grupo.discard(clave)
+        if not grupo and clave[0] in ("filtro", "consulta"):
+            # Los continentes de las consultas los escribe el usuario: no se guardan grupos vacíos
+            self._filtros_por_continente.pop(clave[2] if clave[0] == "consulta" else clave[1], None)
+
+    def obtener(self, clave):
+        """
+        Args:
+            clave (tuple): La consulta normalizada.
+
+        Returns:
+            El resultado guardado (no se debe modificar), o None si no está.
+        """
+        with self._candado:
+            resultado = self._resultados.get(clave)
+            if resultado is None:
+                self.fallos += 1
+                return None
+            self._resultados.move_to_end(clave)
+            self.aciertos += 1
+            return resultado
+
+    def guardar(self, clave, resultado):
+        """
+        Guarda un resultado, descartando los menos usados si no hay lugar.
+
+        Args:
+            clave (tuple): La consulta normalizada.
+            resultado: Las posiciones calculadas.
+        """
+        if self.capacidad <= 0:
+            return
+        with self._candado:
+            if clave not in self._resultados:
+                self._grupo(clave).add(clave)
+            self._resultados[clave] = resultado
+            self._resultados.move_to_end(clave)
+            while len(self._resultados) > self.capacidad:
+                self._descartar(self._resultados.popitem(last=False)[0])
+
+    def limpiar(self):
+        """
+        Descarta todos los resultados.
+        """
+        with self._candado:
+            self.invalidaciones += len(self._resultados)
+            self._resultados.clear()
+            for grupo in (self._ordenes, self._ordenes_numericos, self._nombres):
+                grupo.clear()
+            self._filtros_por_continente.clear()
+
+    def invalidar(self, anterior, nuevo):
+        """
+        Descarta los resultados que dependen de una fila que cambió.
+
+        Args:
+            anterior (dict): El país antes del cambio (None en un alta).
+            nuevo (dict): El país después del cambio.
+        """
+        nombre_norm = normalizar_texto(nuevo["NOMBRE"])
+        continente_norm = normalizar_texto(nuevo["CONTINENTE"])
+
+        #Si el pais cumple un filtro ('filtro', continente, poblacion, superficie)
+        def cumple(pais, continente, poblacion, superficie):
+            return ((continente is None or continente_norm == continente)
+                    and (poblacion is None or poblacion[0] <= pais["POBLACION"] <= poblacion[1])
+                    and (superficie is None or superficie[0] <= pais["SUPERFICIE"] <= superficie[1]))
+
+        with self._candado:
+            # Los ordenamientos numéricos cambian con cualquier cambio; los demás y los nombres, solo con un alta
+            descartar = list(self._ordenes_numericos)
+            if anterior is None:
+                descartar.extend(self._ordenes)
+                descartar.extend(clave for clave in self._nombres if clave[1] in nombre_norm)
+
+            # Solo los filtros sin continente o del continente del país (el continente no se modifica)
+            for continente in {None, continente_norm}:
+                for clave in self._filtros_por_continente.get(continente, ()):
+                    if clave[0] == "consulta":
+                        depende = (clave[1] in nombre_norm
+                                   and cumple(nuevo, *clave[2:]) != (anterior is not None and cumple(anterior, *clave[2:])))
+                    else:
+                        depende = cumple(nuevo, *clave[1:]) != (anterior is not None and cumple(anterior, *clave[1:]))
+                    if depende:
+                        descartar.append(clave)
+
+            for clave in descartar:
+                del self._resultados[clave]
+                self._descartar(clave)
+            self.invalidaciones += len(descartar)
+
+    def estadisticas(self):
+        """
+        Returns:
+            dict: 'capacidad', 'resultados', 'aciertos', 'fallos', 'invalidaciones'
+                  y 'tasa_aciertos' (0 a 1).
+        """
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {"capacidad": self.capacidad, "resultados": len(self._resultados), "aciertos": self.aciertos,
+                    "fallos": self.fallos, "invalidaciones": self.invalidaciones,
+                    "tasa_aciertos": self.aciertos / consultas if consultas else 0}
+
+# Lista de paises con almacenamiento por columnas, índices y cachés
+class ListaPaises:
+    """
+    Lista de países guardada por columnas en lugar de un diccionario por país:
+    los números van en arrays de enteros de 64 bits, los nombres en un único
+    bloque de bytes UTF-8 con sus desplazamientos y los continentes como
+    códigos de un byte sobre una tabla (hasta 256 continentes distintos;
+    los archivos solo traen los de CONTINENTES). Ocupa varias veces menos memoria que
+    una lista de diccionarios y permite recorrer una columna entera sin
+    crear objetos por fila.
+
+    Se usa igual que una lista de diccionarios: lista[i] y la iteración
+    devuelven vistas (RegistroPais) que se leen como un dict, y append
+    acepta un diccionario. append y actualizar mantienen los índices al día.
+
+    Attributes:
+        nombres (bytearray): Los nombres en UTF-8, uno detrás del otro.
+        desplazamientos_nombres (array): Inicio de cada nombre en 'nombres'
+                                         (tiene un elemento más que países).
+        poblaciones (array): Población de cada país.
+        superficies (array): Superficie de cada país.
+        codigos_continente (array): Código del continente de cada país.
+        continentes (list): Tabla código -> nombre del continente.
+        continentes_normalizados (list): Tabla código -> continente normalizado.
+        indice_nombres (dict): Nombre normalizado -> posición del país.
+        nombres_normalizados (list): Nombre normalizado de cada país, por posición.
+        indice_trigramas (dict): Trigrama -> posiciones (crecientes) de los países
+                                 cuyo nombre normalizado lo contiene.
+                                 Estos índices de nombres se arman la primera vez
+                                 que se usan y desde ahí se mantienen en append.
+        total_poblacion (int): Suma de las poblaciones, mantenida en cada cambio.
+        total_superficie (int): Suma de las superficies, mantenida en cada cambio.
+        cantidades_continente (list): Cantidad de países por código de continente.
+        indices_ordenados (dict): Clave numérica -> posiciones ordenadas por su
+                                  valor (y por posición en los empates). Se arman
+                                  la primera vez que se piden (indice_ordenado)
+                                  y desde ahí se mantienen en cada cambio.
+        cache_consultas (CacheConsultas): Resultados de búsquedas, filtros y
+                                          ordenamientos ya calculados.
+        version (int): Aumenta con cada cambio (para saber si una copia quedó vieja).
+        ejecutor (EjecutorParalelo): Si no es None, filtrar_posiciones reparte
+                                     los recorridos completos entre sus procesos.
+    """
+    def __init__(self, paises=()):
+        # Columnas
+        self.nombres = bytearray()
+        self.desplazamientos_nombres = array('q', [0])
+        self.poblaciones = array('q')
+        self.superficies = array('q')
+        self.codigos_continente = array('B')
+        self.continentes = []
+        self.continentes_normalizados = []
+        self._codigo_por_continente = {}
+        # Agregados para las estadísticas
+        self.total_poblacion = 0
+        self.total_superficie = 0
+        self.cantidades_continente = []
+        # Índices y cachés
+        self._indice_nombres = None
+        self._nombres_normalizados = None
+        self._indice_trigramas = None
+        self.indices_ordenados = {}
+        self.cache_consultas = CacheConsultas()
+        self.version = 0
+        self.ejecutor = None
+        self.extend(paises)
+
+    @classmethod
+    def desde_columnas(cls, nombres, desplazamientos_nombres, poblaciones, superficies, codigos_continente, continentes, **argumentos):
+        """
+        Arma una ListaPaises a partir de columnas ya construidas (por ejemplo,
+        leídas de un snapshot binario), sin recorrer los países uno por uno.
+        Los agregados se calculan con operaciones sobre las columnas completas
+        y los índices quedan para cuando se usen.
+
+        Args:
+            nombres (bytearray): Los nombres en UTF-8, uno detrás del otro.
+            desplazamientos_nombres (array): Inicio de cada nombre (n + 1 valores).
+            poblaciones (array): Población de cada país.
+            superficies (array): Superficie de cada país.
+            codigos_continente (array): Código del continente de cada país.
+            continentes (list): Tabla código -> nombre del continente.
+            argumentos: Lo que recibe el constructor de la clase (ej: el mapa
+                        de ListaPaisesMapeada).
+
+        Returns:
+            ListaPaises: La lista armada.
+        """
+        lista = cls(**argumentos)
+        lista.nombres = nombres
+        lista.desplazamientos_nombres = desplazamientos_nombres
+        lista.poblaciones = poblaciones
+        lista.superficies = superficies
+        lista.codigos_continente = codigos_continente
+        lista.continentes = list(continentes)
+        lista.continentes_normalizados = [normalizar_texto(continente) for continente in continentes]
+        lista._codigo_por_continente = {continente: codigo for codigo, continente in enumerate(continentes)}
+
+        lista.total_poblacion = sum(poblaciones)
+        lista.total_superficie = sum(superficies)
+        codigos = codigos_continente.tobytes()
+        lista.cantidades_continente = [codigos.count(codigo) for codigo in range(len(continentes))]
+        return lista
+
+    def copiar(self):
+        """
+        Devuelve una copia de las columnas (sin índices ni cachés). Copiar
+        arrays es mucho más rápido que copiar un diccionario por país.
+
+        Returns:
+            ListaPaises: Una lista independiente con los mismos países.
+        """
+        return ListaPaises.desde_columnas(bytearray(self.nombres), array('q', self.desplazamientos_nombres),
+                                          array('q', self.poblaciones), array('q', self.superficies),
+                                          array('B', self.codigos_continente), self.continentes)
+
+    @property
+    def indice_nombres(self):
+        if self._indice_nombres is None:
+            self._armar_indice_nombres()
+        return self._indice_nombres
+
+    @property
+    def nombres_normalizados(self):
+        if self._nombres_normalizados is None:
+            self._armar_indice_nombres()
+        return self._nombres_normalizados
+
+    @property
+    def indice_trigramas(self):
+        if self._indice_trigramas is None:
+            self._indice_trigramas = {}
+            for posicion, nombre_norm in enumerate(self.nombres_normalizados):
+                self._indexar_trigramas(posicion, nombre_norm)
+        return self._indice_trigramas
+
+    def _armar_indice_nombres(self):
+        """
+        Arma el índice de nombres y la columna de nombres normalizados
+        recorriendo todos los países una vez.
+        """
+        self._nombres_normalizados = [normalizar_texto(self.nombre(i)) for i in range(len(self))]
+        self._indice_nombres = {}
+        for posicion, nombre_norm in enumerate(self._nombres_normalizados):
+            # Si el nombre está repetido se conserva el primero (igual que la búsqueda lineal)
+            self._indice_nombres.setdefault(nombre_norm, posicion)
+
+    def _indexar_trigramas(self, posicion, nombre_norm):
+        """
+        Registra los trigramas de un nombre normalizado en el índice de trigramas.
+
+        Args:
+            posicion (int): Posición del país (la última agregada).
+            nombre_norm (str): El nombre normalizado del país.
+        """
+        # Las posiciones se agregan en orden creciente, por eso cada lista queda ordenada
+        for trigrama in trigramas(nombre_norm):
+            self._indice_trigramas.setdefault(trigrama, []).append(posicion)
+
+    def __len__(self):
+        return len(self.poblaciones)
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [RegistroPais(self, i) for i in range(*posicion.indices(len(self)))]
+        if posicion < 0:
+            posicion += len(self)
+        if not 0 <= posicion < len(self):
+            raise IndexError("posición fuera de la lista de países")
+        return RegistroPais(self, posicion)
+
+    def __iter__(self):
+        for posicion in range(len(self)):
+            yield RegistroPais(self, posicion)
+
+    def __repr__(self):
+        return f"ListaPaises({list(map(dict, self))!r})"
+
+    def nombre(self, posicion):
+        """
+        Devuelve el nombre del país en la posición indicada.
+
+        Args:
+            posicion (int): Posición del país.
+
+        Returns:
+            str: El nombre del país.
+        """
+        inicio = self.desplazamientos_nombres[posicion]
+        fin = self.desplazamientos_nombres[posicion + 1]
+        # str() acepta tanto el bytearray como una vista sobre un archivo mapeado
+        return str(self.nombres[inicio:fin], 'utf-8')
+
+    def continente(self, posicion):
+        """
+        Devuelve el continente del país en la posición indicada.
+
+        Args:
+            posicion (int): Posición del país.
+
+        Returns:
+            str: El continente del país.
+        """
+        return self.continentes[self.codigos_continente[posicion]]
+
+    def columna(self, clave):
+        """
+        Devuelve una columna completa, indexable por posición.
+        Las columnas numéricas se devuelven tal cual (sin copiar).
+
+        Args:
+            clave (str): Una de CLAVES_PAIS.
+
+        Returns:
+            array | list: Los valores de la columna.
+        """
+        if clave == "POBLACION":
+            return self.poblaciones
+        if clave == "SUPERFICIE":
+            return self.superficies
+        if clave == "CONTINENTE":
+            return [self.continentes[codigo] for codigo in self.codigos_continente]
+        if clave == "NOMBRE":
+            return [self.nombre(i) for i in range(len(self))]
+        raise KeyError(clave)
+
+    def append(self, pais):
+        """
+        Agrega un país al final de la lista y lo registra en los índices.
+
+        Args:
+            pais (dict): El diccionario (o registro) del país a agregar.
+        """
+        posicion = len(self)
+        nombre = pais["NOMBRE"]
+        continente = pais["CONTINENTE"]
+
+        # Los continentes se guardan como código sobre la tabla de continentes
+        codigo = self._codigo_por_continente.get(continente)
+        if codigo is None:
+            codigo = len(self.continentes)
+            # Los códigos son de un byte (antes de cambiar nada, para no dejar la lista a medias)
+            if codigo > 255:
+                raise ValueError(f"La lista admite hasta 256 continentes distintos: '{continente}' no entra")
+            self.continentes.append(continente)
+            self.continentes_normalizados.append(normalizar_texto(continente))
+            self.cantidades_continente.append(0)
+            self._codigo_por_continente[continente] = codigo
+
+        self.nombres += nombre.encode('utf-8')
+        self.desplazamientos_nombres.append(len(self.nombres))
+        self.poblaciones.append(pais["POBLACION"])
+        self.superficies.append(pais["SUPERFICIE"])
+        self.codigos_continente.append(codigo)
+
+        self.total_poblacion += pais["POBLACION"]
+        self.total_superficie += pais["SUPERFICIE"]
+        self.cantidades_continente[codigo] += 1
+
+        if self._indice_nombres is not None:
+            nombre_norm = normalizar_texto(nombre)
+            self._indice_nombres.setdefault(nombre_norm, posicion)
+            self._nombres_normalizados.append(nombre_norm)
+            if self._indice_trigramas is not None:
+                self._indexar_trigramas(posicion, nombre_norm)
+
+        for clave in self.indices_ordenados:
+            self._agregar_a_indice(clave, posicion)
+
+        self.version += 1
+        if self.cache_consultas:
+            self.cache_consultas.invalidar(None, pais)
+
+    def extend(self, paises):
+        """
+        Agrega varios países, registrando cada uno en los índices de nombres.
+        Los índices ordenados se descartan y se vuelven a armar cuando se
+        pidan: un solo ordenamiento es más barato que insertar cada país
+        con búsqueda binaria.
+
+        Args:
+            paises (iterable): Los diccionarios de los países a agregar.
+        """
+        self.indices_ordenados.clear()
+        # Un alta masiva invalida casi todo: se descarta la caché una vez en lugar de revisarla por país
+        self.cache_consultas.limpiar()
+        for pais in paises:
+            self.append(pais)
+
+    def actualizar(self, posicion, poblacion, superficie):
+        """
+        Cambia la población y la superficie de un país, actualiza los
+        totales y los índices ordenados e invalida las cachés.
+
+        Args:
+            posicion (int): Posición del país.
+            poblacion (int): La nueva población.
+            superficie (int): La nueva superficie.
+        """
+        # El país antes del cambio, para descartar de la caché solo lo que depende de él
+        anterior = dict(self[posicion]) if self.cache_consultas else None
+        self.total_poblacion += poblacion - self.poblaciones[posicion]
+        self.total_superficie += superficie - self.superficies[posicion]
+
+        for clave, valor in (("POBLACION", poblacion), ("SUPERFICIE", superficie)):
+            columna = self.columna(clave)
+            if columna[posicion] == valor:
+                continue
+            # El país sale del índice con su valor viejo y vuelve a entrar con el nuevo
+            if clave in self.indices_ordenados:
+                self._quitar_de_indice(clave, posicion)
+                columna[posicion] = valor
+                self._agregar_a_indice(clave, posicion)
+            else:
+                columna[posicion] = valor
+
+        self.version += 1
+        if anterior is not None:
+            self.cache_consultas.invalidar(anterior, self[posicion])
+
+    def indice_ordenado(self, clave):
+        """
+        Devuelve el índice ordenado de una clave numérica, armándolo
+        (O(n log n)) si todavía no existe. No se debe modificar.
+
+        Args:
+            clave (str): 'POBLACION' o 'SUPERFICIE'.
+
+        Returns:
+            array: Las posiciones de los países ordenadas por el valor de la clave.
+        """
+        indice = self.indices_ordenados.get(clave)
+        if indice is None:
+            columna = self.columna(clave)
+            # El ordenamiento es estable: en los empates queda primero la posición menor
+            indice = array('q', sorted(range(len(self)), key=columna.__getitem__))
+            self.indices_ordenados[clave] = indice
+        return indice
+
+    def extremos(self, clave):
+        """
+        Devuelve las posiciones del menor y del mayor valor de una clave
+        numérica usando el índice ordenado: O(1) para el menor y O(log n)
+        para el mayor. En los empates devuelve la primera posición, igual
+        que un recorrido de la lista.
+
+        Args:
+            clave (str): 'POBLACION' o 'SUPERFICIE'.
+
+        Returns:
+            tuple: (posición del menor, posición del mayor), o (None, None) si está vacía.
+        """
+        if not len(self):
+            return None, None
+        indice = self.indice_ordenado(clave)
+        columna = self.columna(clave)
+        primera_del_mayor = bisect_left(indice, columna[indice[-1]], key=columna.__getitem__)
+        return indice[0], indice[primera_del_mayor]
+
+    def ranking(self, clave, k, mayores=False):
+        """
+        Devuelve las posiciones de los k países de menor (o mayor) valor de
+        una clave numérica tomándolas de un extremo del índice ordenado, sin
+        recorrer la lista: O(k) para los menores y O(k log n) para los
+        mayores. En los empates queda primero la posición menor, también
+        entre los mayores.
+
+        Args:
+            clave (str): 'POBLACION' o 'SUPERFICIE'.
+            k (int): Cantidad de posiciones.
+            mayores (bool): True para los de mayor valor (de mayor a menor).
+
+        Returns:
+            list: Hasta k posiciones, ordenadas por el valor de la clave.
+        """
+        if not mayores:
+            return list(self.indice_ordenado(clave)[:k])
+        return list(islice(self.descendente(clave), k))
+
+    def descendente(self, clave):
+        """
+        Recorre el índice ordenado de una clave numérica de mayor a menor
+        valor, sin copiarlo. Los empates salen por posición creciente, igual
+        que en un ordenamiento estable de la lista (el índice invertido los
+        daría al revés).
+
+        Args:
+            clave (str): 'POBLACION' o 'SUPERFICIE'.
+
+        Yields:
+            int: Las posiciones, de mayor a menor valor.
+        """
+        indice = self.indice_ordenado(clave)
+        columna = self.columna(clave)
+        fin = len(indice)
+        # Desde el final, de a grupos de empate (cada grupo ya está por posición creciente)
+        while fin:
+            valor = columna[indice[fin - 1]]
+            inicio = fin - 1
+            # Sin empate (lo común) alcanza con mirar el anterior; si hay, el grupo se busca con bisect
+            if inicio and columna[indice[inicio - 1]] == valor:
+                inicio = bisect_left(indice, valor, 0, inicio, key=columna.__getitem__)
+            yield from indice[inicio:fin]
+            fin = inicio
+
+    def _agregar_a_indice(self, clave, posicion):
+        """
+        Inserta una posición en el índice ordenado de la clave (búsqueda binaria).
+
+        Args:
+            clave (str): 'POBLACION' o 'SUPERFICIE'.
+            posicion (int): Posición del país.
+        """
+        columna = self.columna(clave)
+        insort(self.indices_ordenados[clave], posicion, key=lambda p: (columna[p], p))
+
+    def _quitar_de_indice(self, clave, posicion):
+        """
+        Quita una posición del índice ordenado de la clave (búsqueda binaria).
+        Se llama antes de cambiar el valor en la columna.
+
+        Args:
+            clave (str): 'POBLACION' o 'SUPERFICIE'.
+            posicion (int): Posición del país.
+        """
+        columna = self.columna(clave)
+        indice = self.indices_ordenados[clave]
+        i = bisect_left(indice, (columna[posicion], posicion), key=lambda p: (columna[p], p))
+        del indice[i]
+
+# Vista de un pais dentro de la ListaPaises
+class RegistroPais(Mapping):
+    """
+    Vista de un país de una ListaPaises que se lee como un diccionario
+    ({'NOMBRE', 'POBLACION', 'SUPERFICIE', 'CONTINENTE'}) sin copiar los datos.
+    POBLACION y SUPERFICIE se pueden asignar y el cambio va a la lista.
+
+    Attributes:
+        lista (ListaPaises): La lista que contiene al país.
+        posicion (int): La posición del país en la lista.
+    """
+    __slots__ = ("lista", "posicion")
+
+    def __init__(self, lista, posicion):
+        self.lista = lista
+        self.posicion = posicion
+
+    def __getitem__(self, clave):
+        if clave == "NOMBRE":
+            return self.lista.nombre(self.posicion)
+        if clave == "POBLACION":
+            return self.lista.poblaciones[self.posicion]
+        if clave == "SUPERFICIE":
+            return self.lista.superficies[self.posicion]
+        if clave == "CONTINENTE":
+            return self.lista.continente(self.posicion)
+        raise KeyError(clave)
+
+    def __setitem__(self, clave, valor):
+        if clave == "POBLACION":
+            self.lista.actualizar(self.posicion, valor, self["SUPERFICIE"])
+        elif clave == "SUPERFICIE":
+            self.lista.actualizar(self.posicion, self["POBLACION"], valor)
+        else:
+            raise KeyError(f"{clave} no se puede modificar")
+
+    def __iter__(self):
+        return iter(CLAVES_PAIS)
+
+    def __len__(self):
+        return len(CLAVES_PAIS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+# Lista de paises de solo lectura sobre un snapshot mapeado en memoria
+class ListaPaisesMapeada(ListaPaises):
+    """
+    ListaPaises de solo lectura cuyas columnas son vistas (memoryview)
+    sobre el snapshot binario mapeado con mmap: no se copia ningún dato ni
+    se crea un diccionario por país. Los números se leen directo del
+    archivo, los nombres se decodifican recién cuando se piden (con sus
+    desplazamientos) y el sistema operativo comparte las páginas del
+    archivo entre todos los procesos que lo abren.
+
+    Sirve para las búsquedas, filtros, ordenamientos y estadísticas;
+    agregar o actualizar países da TypeError. Se abre con
+    abrir_snapshot_mapeado y conviene cerrarla (o usarla con 'with').
+
+    Args:
+        mapa (mmap.mmap): El snapshot mapeado sobre el que están las columnas
+                          (se cierra con la lista).
+    """
+    def __init__(self, mapa):
+        super().__init__()
+        self._mapa = mapa
+
+    def append(self, pais):
+        raise TypeError("La lista mapeada es de solo lectura")
+
+    def actualizar(self, posicion, poblacion, superficie):
+        raise TypeError("La lista mapeada es de solo lectura")
+
+    def cerrar(self):
+        """
+        Libera las vistas y cierra el archivo mapeado.
+        """
+        for vista in (self.nombres, self.desplazamientos_nombres, self.poblaciones,
+                      self.superficies, self.codigos_continente):
+            vista.release()
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.cerrar()
+
+# Ejecución de filtros y estadísticas en varios procesos
+class EjecutorParalelo:
+    """
+    Ejecuta filtros y estadísticas de una ListaPaises repartiendo la lista
+    en particiones entre un grupo de procesos. Las columnas numéricas y los
+    códigos de continente se copian una vez a memoria compartida (y otra
+    vez solo si la lista cambió, según su 'version'): en cada consulta los
+    procesos reciben únicamente los criterios y el rango de su partición,
+    y devuelven posiciones o resultados parciales que se combinan acá.
+
+    Conviene cerrarlo al terminar (o usarlo con 'with') para liberar los
+    procesos y la memoria compartida.
+
+    Attributes:
+        lista_paises (ListaPaises): La lista sobre la que se consulta.
+        procesos (int): Cantidad de procesos.
+    """
+    def __init__(self, lista_paises, procesos=None):
+        self.lista_paises = lista_paises
+        self.procesos = procesos or nucleos_disponibles()
+        self._grupo = ProcessPoolExecutor(max_workers=self.procesos)
+        self._memoria = None
+        self._version = None
+        # Varias lecturas a la vez (servicio HTTP) publican una sola copia
+        self._candado = threading.Lock()
+
+    def _publicar(self):
+        """
+        Copia las columnas a un bloque de memoria compartida nuevo si la
+        lista cambió desde la última copia: poblaciones y superficies
+        (8 bytes por país cada una) y después los códigos de continente.
+
+        Returns:
+            str: El nombre del bloque de memoria compartida.
+        """
+        lista = self.lista_paises
+        with self._candado:
+            if self._memoria is not None and self._version == lista.version:
+                return self._memoria.name
+
+            self._liberar_memoria()
+            cantidad = len(lista)
+            memoria = shared_memory.SharedMemory(create=True, size=max(1, 17 * cantidad))
+            for inicio, columna in ((0, lista.poblaciones), (8 * cantidad, lista.superficies),
+                                    (16 * cantidad, lista.codigos_continente)):
+                with memoryview(columna) as vista, vista.cast('B') as bytes_columna:
+                    memoria.buf[inicio:inicio + len(bytes_columna)] = bytes_columna
+            self._memoria = memoria
+            self._version = lista.version
+            return memoria.name
+
+    def _ejecutar(self, funcion, continente, poblacion, superficie):
+        """
+        Ejecuta una función de partición sobre todas las particiones.
+
+        Returns:
+            list: Los resultados de cada partición, en orden.
+        """
+        nombre_memoria = self._publicar()
+        cantidad = len(self.lista_paises)
+        codigos = None if continente is None else valores_de_continente(self.lista_paises, continente)[1]
+
+        # Varias particiones por proceso para repartir mejor la carga
+        cantidad_particiones = min(self.procesos * 4, max(1, cantidad))
+        cortes = [cantidad * i // cantidad_particiones for i in range(cantidad_particiones + 1)]
+        argumentos = [(nombre_memoria, cantidad, inicio, fin, codigos, poblacion, superficie)
+                      for inicio, fin in zip(cortes, cortes[1:])]
+        return list(self._grupo.map(funcion, *zip(*argumentos)))
+
+    def filtrar(self, continente=None, poblacion=None, superficie=None):
+        """
+        Igual que filtrar_posiciones, pero cada proceso filtra su partición.
+
+        Args:
+            continente (str): Continente buscado (ignora mayúsculas y tildes).
+            poblacion (tuple): (mínimo, máximo) de población, inclusivo.
+            superficie (tuple): (mínimo, máximo) de superficie, inclusivo.
+
+        Returns:
+            array: Las posiciones (en orden de la lista) que cumplen todos los criterios.
+        """
+        posiciones = array('q')
+        for parcial in self._ejecutar(filtrar_particion, continente, poblacion, superficie):
+            posiciones.extend(parcial)
+        return posiciones
+
+    def estadisticas(self, continente=None, poblacion=None, superficie=None):
+        """
+        Estadísticas de los países que cumplen los criterios (de todos si no
+        hay criterios): cada proceso calcula cantidad, sumas, mínimo, máximo
+        y cantidades por continente de su partición, y acá se combinan.
+        El resultado es el mismo que el de calcular_estadisticas sobre los
+        países filtrados (incluido el desempate por posición y el orden de
+        los continentes).
+
+        Args:
+            continente (str): Continente buscado (ignora mayúsculas y tildes).
+            poblacion (tuple): (mínimo, máximo) de población, inclusivo.
+            superficie (tuple): (mínimo, máximo) de superficie, inclusivo.
+
+        Returns:
+            dict: Las mismas claves que calcular_estadisticas.
+        """
+        lista = self.lista_paises
+        cantidad = total_poblacion = total_superficie = 0
+        menor = mayor = None
+        continentes = {}
+        for parcial in self._ejecutar(estadisticas_particion, continente, poblacion, superficie):
+            cantidad_parcial, poblacion_parcial, superficie_parcial, posicion_menor, posicion_mayor, por_codigo = parcial
+            if not cantidad_parcial:
+                continue
+            cantidad += cantidad_parcial
+            total_poblacion += poblacion_parcial
+            total_superficie += superficie_parcial
+            # Las particiones llegan en orden: en los empates se queda la primera
+            if menor is None or lista.poblaciones[posicion_menor] < lista.poblaciones[menor]:
+                menor = posicion_menor
+            if mayor is None or lista.poblaciones[posicion_mayor] > lista.poblaciones[mayor]:
+                mayor = posicion_mayor
+            for codigo, (cantidad_codigo, primera) in por_codigo.items():
+                anterior = continentes.get(codigo)
+                continentes[codigo] = (cantidad_codigo, primera) if anterior is None else (anterior[0] + cantidad_codigo, anterior[1])
+
+        # Continentes en el orden en que aparecen en la lista
+        por_continente = {lista.continentes[codigo]: cantidad_codigo
+                          for codigo, (cantidad_codigo, _) in sorted(continentes.items(), key=lambda item: item[1][1])}
+        return {
+            "cantidad": cantidad,
+            "total_poblacion": total_poblacion,
+            "total_superficie": total_superficie,
+            "mayor_poblacion": None if mayor is None else lista[mayor],
+            "menor_poblacion": None if menor is None else lista[menor],
+            "promedio_poblacion": total_poblacion / cantidad if cantidad else 0,
+            "promedio_superficie": total_superficie / cantidad if cantidad else 0,
+            "por_continente": por_continente,
+        }
+
+    def _liberar_memoria(self):
+        if self._memoria is not None:
+            self._memoria.close()
+            self._memoria.unlink()
+            self._memoria = None
+
+    def cerrar(self):
+        """
+        Termina los procesos y libera la memoria compartida.
+        """
+        self._grupo.shutdown()
+        self._liberar_memoria()
+        if self.lista_paises.ejecutor is self:
+            self.lista_paises.ejecutor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.cerrar()
+
+# Memoria compartida abierta en cada proceso de EjecutorParalelo: (nombre, memoria, columnas)
+_memoria_proceso = [None, None, None]
+
+#Obtiene las columnas de la memoria compartida (en un proceso de EjecutorParalelo)
+def columnas_compartidas(nombre_memoria, cantidad):
+    """
+    Devuelve vistas sobre las columnas que EjecutorParalelo copió a memoria
+    compartida. El bloque se abre una sola vez por proceso; si cambió (la
+    lista se modificó), se cierra el anterior.
+
+    Args:
+        nombre_memoria (str): Nombre del bloque de memoria compartida.
+        cantidad (int): Cantidad de países.
+
+    Returns:
+        tuple: (poblaciones, superficies, códigos de continente)
+    """
+    if _memoria_proceso[0] != nombre_memoria:
+        if _memoria_proceso[1] is not None:
+            for vista in _memoria_proceso[2]:
+                vista.release()
+            _memoria_proceso[1].close()
+        memoria = shared_memory.SharedMemory(name=nombre_memoria)
+        bloque = memoria.buf
+        columnas = (bloque[:8 * cantidad].cast('q'), bloque[8 * cantidad:16 * cantidad].cast('q'),
+                    bloque[16 * cantidad:17 * cantidad])
+        _memoria_proceso[:] = [nombre_memoria, memoria, columnas]
+    return _memoria_proceso[2]
+
+#Arma los criterios de filtro sobre las columnas compartidas
+def criterios_particion(columnas, codigos_validos, poblacion, superficie):
+    """
+    Arma los criterios en el formato de aplicar_criterios.
+
+    Args:
+        columnas (tuple): (poblaciones, superficies, códigos de continente).
+        codigos_validos (set): Códigos del continente buscado, o None.
+        poblacion (tuple): (mínimo, máximo) de población, o None.
+        superficie (tuple): (mínimo, máximo) de superficie, o None.
+
+    Returns:
+        list: Los criterios.
+    """
+    poblaciones, superficies, codigos = columnas
+    criterios = []
+    if codigos_validos is not None:
+        criterios.append((codigos, codigos_validos))
+    if poblacion is not None:
+        criterios.append((poblaciones, *poblacion))
+    if superficie is not None:
+        criterios.append((superficies, *superficie))
+    return criterios
+
+#Filtra una particion (en un proceso de EjecutorParalelo)
+def filtrar_particion(nombre_memoria, cantidad, inicio, fin, codigos_validos, poblacion, superficie):
+    """
+    Filtra las posiciones [inicio, fin) con los criterios indicados.
+
+    Returns:
+        array: Las posiciones de la partición que cumplen los criterios.
+    """
+    columnas = columnas_compartidas(nombre_memoria, cantidad)
+    criterios = criterios_particion(columnas, codigos_validos, poblacion, superficie)
+    return array('q', aplicar_criterios(criterios, inicio, fin))
+
+#Calcula estadisticas parciales de una particion (en un proceso de EjecutorParalelo)
+def estadisticas_particion(nombre_memoria, cantidad, inicio, fin, codigos_validos, poblacion, superficie):
+    """
+    Calcula las estadísticas parciales de los países de [inicio, fin) que
+    cumplen los criterios.
+
+    Returns:
+        tuple: (cantidad, suma de población, suma de superficie, posición de
+               la menor población, posición de la mayor población,
+               dict código de continente -> (cantidad, primera posición))
+    """
+    columnas = columnas_compartidas(nombre_memoria, cantidad)
+    poblaciones, superficies, codigos = columnas
+    criterios = criterios_particion(columnas, codigos_validos, poblacion, superficie)
+
+    if criterios:
+        posiciones = aplicar_criterios(criterios, inicio, fin)
+        valores_poblacion = [poblaciones[i] for i in posiciones]
+        suma_superficie = sum([superficies[i] for i in posiciones])
+        valores_codigos = bytes([codigos[i] for i in posiciones])
+    else:
+        # Sin criterios se trabaja sobre la partición entera, sin recorrerla en Python
+        posiciones = range(inicio, fin)
+        valores_poblacion = array('q')
+        valores_poblacion.frombytes(poblaciones[inicio:fin].cast('B'))
+        suma_superficie = sum(superficies[inicio:fin])
+        valores_codigos = codigos[inicio:fin].tobytes()
+
+    if not posiciones:
+        return 0, 0, 0, None, None, {}
+
+    # index devuelve la primera aparición: en los empates queda la posición menor
+    menor = posiciones[valores_poblacion.index(min(valores_poblacion))]
+    mayor = posiciones[valores_poblacion.index(max(valores_poblacion))]
+    por_codigo = {codigo: (valores_codigos.count(codigo), posiciones[valores_codigos.index(codigo)])
+                  for codigo in set(valores_codigos)}
+    return len(posiciones), sum(valores_poblacion), suma_superficie, menor, mayor, por_codigo
+
+#Cantidad de nucleos que puede usar el programa
+def nucleos_disponibles():
+    """
+    Devuelve la cantidad de núcleos que puede usar este proceso.
+
+    Returns:
+        int: La cantidad de núcleos (al menos 1).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+# Función de CSV
+def leer_paises_csv(nombre_archivo):
+    """
+    Lee el archivo CSV de países de a una fila por vez (modo streaming).
+    No guarda las filas: la memoria usada no depende del tamaño del archivo,
+    por eso sirve para recorrer exportaciones grandes en una sola pasada.
+    Si el archivo no existe, no devuelve ningún país.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV.
+
+    Yields:
+        dict: Un diccionario por país, con POBLACION y SUPERFICIE como int
+              y el continente con el formato de CONTINENTES.
+
+    Raises:
+        ValueError: Si una fila tiene un continente que no está en CONTINENTES
+                    (la lista guarda el continente como código de un byte).
+    """
+    # Se verifica si el archivo existe antes de leerlo
+    if not os.path.exists(nombre_archivo):
+        return
+
+    with open(nombre_archivo, 'r', encoding='utf-8', newline='') as archivo:
+        # csv.DictReader lee el archivo
+        lector = csv.DictReader(archivo)
+        # Continente del archivo -> continente con formato (se valida una vez por cada valor distinto)
+        continentes = {}
+        # Inicio bucle
+        for fila in lector:
+            continente = continentes.get(fila["CONTINENTE"])
+            if continente is None:
+                try:
+                    continente = continentes[fila["CONTINENTE"]] = convertir_continente(fila["CONTINENTE"], CONTINENTES)
+                except ValueError:
+                    raise ValueError(f"{nombre_archivo}, línea {lector.line_num}: continente no válido '{fila['CONTINENTE']}' "
+                                     f"(válidos: {', '.join(CONTINENTES.values())})")
+            yield {"NOMBRE": fila["NOMBRE"], "POBLACION": int(fila["POBLACION"]), "SUPERFICIE": int(fila["SUPERFICIE"]), "CONTINENTE": continente}
 
 # Función de CSV
 def cargar_datos_csv(nombre_archivo):
     """
-    Carga los datos de paises desde un archivo CSV al iniciar el programa.
-    Si el archivo no existe, devuelve una lista vacía.
+    Carga los datos de paises desde un archivo CSV al iniciar el programa.
+    Si existe un snapshot binario que corresponde al CSV actual (mismo
+    tamaño y fecha de modificación) lo carga en su lugar, que es mucho más
+    rápido; si no, lee el CSV y deja escrito el snapshot.
+    Un CSV de más de UMBRAL_CARGA_PARALELA bytes se lee con
+    cargar_csv_paralelo. Después aplica los cambios del journal que todavía
+    no se compactaron. Si el archivo no existe, devuelve una lista vacía.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV.
+
+    Returns:
+        ListaPaises: Una lista de diccionarios con los datos de los paises.
+    """
+    # Si hay un snapshot binario del mismo CSV se usa; si no, se lee el CSV
+    datos_cargados = leer_snapshot(nombre_archivo)
+    if datos_cargados is None:
+        # Un CSV grande se lee en paralelo; si no, en streaming
+        datos_cargados = None
+        if os.path.exists(nombre_archivo) and os.path.getsize(nombre_archivo) >= UMBRAL_CARGA_PARALELA:
+            datos_cargados = cargar_csv_paralelo(nombre_archivo)
+        if datos_cargados is None:
+            datos_cargados = ListaPaises(leer_paises_csv(nombre_archivo))
+        # El próximo inicio ya puede usar el snapshot
+        if os.path.exists(nombre_archivo):
+            try:
+                escribir_snapshot(datos_cargados, nombre_archivo)
+            except OSError:
+                # Sin permiso de escritura se sigue sin snapshot
+                pass
+
+    # Primero el journal de una compactación interrumpida y después el actual
+    entradas = aplicar_journal(datos_cargados, nombre_archivo + ".compactando")
+    entradas += aplicar_journal(datos_cargados, nombre_archivo + ".journal")
+    _entradas_journal[nombre_archivo] = entradas
+
+    return datos_cargados
+
+# Función de CSV
+def cargar_csv_paralelo(nombre_archivo, procesos=None):
+    """
+    Lee el CSV de países en varios procesos: el archivo se divide en
+    bloques de bytes que terminan en un salto de línea, cada proceso arma
+    las columnas de su bloque (parsear_bloque_csv) y los bloques se unen en
+    orden. El resultado es igual al de leer el CSV en serie, incluida la
+    tabla de continentes (en orden de aparición).
+
+    Devuelve None cuando no conviene o no se puede leer así (un solo
+    núcleo, un encabezado con otro orden de columnas, o un nombre entre
+    comillas que contiene un salto de línea); en ese caso se usa la
+    lectura en serie.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV.
+        procesos (int): Cantidad de procesos (por defecto, los núcleos disponibles).
+
+    Returns:
+        ListaPaises: La lista de países, o None.
+    """
+    if procesos is None:
+        procesos = nucleos_disponibles()
+    if procesos < 2:
+        return None
+
+    tamanio = os.path.getsize(nombre_archivo)
+    with open(nombre_archivo, 'rb') as archivo:
+        # El encabezado tiene que tener las columnas en el orden de siempre
+        encabezado = archivo.readline()
+        if next(csv.reader([encabezado.decode('utf-8-sig')]), None) != list(CLAVES_PAIS):
+            return None
+
+        # Bloques de bytes (varios por proceso para repartir mejor), cortados en un salto de línea
+        cantidad_bloques = procesos * 4
+        cortes = [archivo.tell()]
+        for i in range(1, cantidad_bloques):
+            archivo.seek(max(tamanio * i // cantidad_bloques, cortes[-1]))
+            archivo.readline()
+            if archivo.tell() >= tamanio:
+                break
+            if archivo.tell() > cortes[-1]:
+                cortes.append(archivo.tell())
+        cortes.append(tamanio)
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        bloques = list(ejecutor.map(parsear_bloque_csv, [nombre_archivo] * (len(cortes) - 1), cortes[:-1], cortes[1:]))
+    if any(bloque is None for bloque in bloques):
+        return None
+
+    # Unión en orden: nombres concatenados, desplazamientos corridos y códigos de continente reasignados
+    nombres = bytearray()
+    desplazamientos = array('q', [0])
+    poblaciones = array('q')
+    superficies = array('q')
+    codigos = array('B')
+    continentes = []
+    codigo_por_continente = {}
+    for nombres_bloque, desplazamientos_bloque, poblaciones_bloque, superficies_bloque, codigos_bloque, continentes_bloque in bloques:
+        base = len(nombres)
+        nombres += nombres_bloque
+        desplazamientos.extend([desplazamiento + base for desplazamiento in desplazamientos_bloque])
+        poblaciones.extend(poblaciones_bloque)
+        superficies.extend(superficies_bloque)
+
+        tabla = bytearray(range(256))
+        for codigo_bloque, continente in enumerate(continentes_bloque):
+            if continente not in codigo_por_continente:
+                codigo_por_continente[continente] = len(continentes)
+                continentes.append(continente)
+            tabla[codigo_bloque] = codigo_por_continente[continente]
+        codigos.frombytes(codigos_bloque.translate(tabla))
+
+    return ListaPaises.desde_columnas(nombres, desplazamientos, poblaciones, superficies, codigos, continentes)
+
+# Función de CSV
+def parsear_bloque_csv(nombre_archivo, inicio, fin):
+    """
+    Lee las filas de un bloque de bytes del CSV y las devuelve como columnas
+    (se ejecuta en un proceso de cargar_csv_paralelo). El bloque empieza y
+    termina en un salto de línea.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV.
+        inicio (int): Posición del primer byte del bloque.
+        fin (int): Posición siguiente al último byte del bloque.
+
+    Returns:
+        tuple: (nombres en UTF-8, fin de cada nombre, poblaciones, superficies,
+               códigos de continente, tabla de continentes del bloque), o None
+               si un campo entre comillas cruza el borde del bloque o tiene
+               un salto de línea, o si una fila no se puede leer o tiene un
+               continente no válido (en esos casos cargar_csv_paralelo vuelve
+               a la lectura en serie, que informa el error).
+    """
+    with open(nombre_archivo, 'rb') as archivo:
+        archivo.seek(inicio)
+        contenido = archivo.read(fin - inicio)
+
+    # Con una cantidad impar de comillas, un campo quedó partido entre bloques
+    if contenido.count(b'"') % 2:
+        return None
+
+    nombres = bytearray()
+    desplazamientos = array('q')
+    poblaciones = array('q')
+    superficies = array('q')
+    codigos = bytearray()
+    continentes = []
+    codigo_por_continente = {}
+    # Un bloque que empieza dentro de un campo entre comillas y termina dentro de otro tiene comillas pares,
+    # pero se lee corrido: alguno de sus campos abarca un salto de línea (o la fila no se puede leer)
+    revisar_saltos = b'"' in contenido
+    try:
+        for fila in csv.reader(io.StringIO(contenido.decode('utf-8'), newline='')):
+            # Las líneas vacías se saltean, igual que en csv.DictReader
+            if not fila:
+                continue
+            if revisar_saltos and any("\n" in campo or "\r" in campo for campo in fila):
+                return None
+            nombre, poblacion, superficie, continente = fila
+            nombres += nombre.encode('utf-8')
+            desplazamientos.append(len(nombres))
+            poblaciones.append(int(poblacion))
+            superficies.append(int(superficie))
+            codigo = codigo_por_continente.get(continente)
+            if codigo is None:
+                # Igual que en leer_paises_csv: 'asia' y 'Asia' son el mismo continente
+                continente_valido = convertir_continente(continente, CONTINENTES)
+                if continente_valido not in continentes:
+                    continentes.append(continente_valido)
+                codigo = codigo_por_continente[continente] = continentes.index(continente_valido)
+            codigos.append(codigo)
+    except (ValueError, csv.Error):
+        return None
+
+    return bytes(nombres), desplazamientos, poblaciones, superficies, bytes(codigos), continentes
+
+# Función de CSV
+def escribir_csv_atomico(paises, nombre_archivo):
+    """
+    Escribe todos los países en el CSV de forma segura ante cortes:
+    primero en un archivo temporal que se sincroniza a disco y después
+    lo reemplaza con os.replace, que es atómico. El CSV nunca queda a medias.
+
+    Args:
+        paises (iterable): Los diccionarios de los países.
+        nombre_archivo (str): Ruta del archivo CSV donde se guarda.
+    """
+    archivo_temporal = nombre_archivo + ".tmp"
+
+    # Filas como tuplas: con una ListaPaises salen directo de las columnas,
+    # sin armar una vista ni un diccionario por país
+    if isinstance(paises, ListaPaises):
+        filas = zip(paises.columna("NOMBRE"), paises.poblaciones, paises.superficies, paises.columna("CONTINENTE"))
+    else:
+        filas = ((pais["NOMBRE"], pais["POBLACION"], pais["SUPERFICIE"], pais["CONTINENTE"]) for pais in paises)
+
+    with open(archivo_temporal, 'w', encoding='utf-8', newline='') as archivo:
+        escritor = csv.writer(archivo)
+        # Escribe el encabezado (NOMBRE,PROBLACIÓN,SUPERFICIE,CONTINENTE)
+        escritor.writerow(CLAVES_PAIS)
+        # Escribe todas las filas en el csv
+        escritor.writerows(filas)
+        # Se asegura que los datos estén en disco antes del reemplazo
+        archivo.flush()
+        os.fsync(archivo.fileno())
+
+    os.replace(archivo_temporal, nombre_archivo)
+
+# Función de CSV
+def guardar_datos_csv(lista_paises, nombre_archivo):
+    """
+    Guarda el estado completo de la lista de paises en el archivo CSV
+    (reescritura atómica). Las altas y modificaciones individuales usan
+    guardar_cambio_pais, que no reescribe el archivo.
+
+    Args:
+        lista_paises (list): La lista de diccionarios actualizada.
+        nombre_archivo (str): Ruta del archivo CSV donde se guarda.
+
+    Returns:
+        str: Mensaje de confirmación de datos actualizados
+    """
+    escribir_csv_atomico(lista_paises, nombre_archivo)
+    if isinstance(lista_paises, ListaPaises):
+        escribir_snapshot(lista_paises, nombre_archivo)
+    
+    # Mensaje final
+    print("========================================")
+    print(f"Datos actualizados en {nombre_archivo}.")
+
+# Función de snapshot
+def escribir_snapshot(lista_paises, nombre_archivo):
+    """
+    Escribe junto al CSV (nombre_archivo + '.snapshot') una copia binaria de
+    las columnas de la lista: cabecera, población, superficie y
+    desplazamientos de los nombres como enteros de 64 bits little-endian,
+    los códigos de continente, los nombres en UTF-8 y la tabla de
+    continentes. Cada sección empieza en un múltiplo de 8 bytes, así el
+    archivo se puede mapear en memoria y leer sin copiar.
+    La cabecera guarda el tamaño y la fecha de modificación del CSV para
+    detectar si el snapshot quedó viejo. Se escribe de forma atómica.
+
+    Args:
+        lista_paises (ListaPaises): La lista con el mismo contenido que el CSV.
+        nombre_archivo (str): Ruta del archivo CSV.
+    """
+    datos_csv = os.stat(nombre_archivo)
+    continentes = "\n".join(lista_paises.continentes).encode('utf-8')
+
+    secciones = [lista_paises.poblaciones, lista_paises.superficies, lista_paises.desplazamientos_nombres]
+    if sys.byteorder != 'little':
+        secciones = [array('q', seccion) for seccion in secciones]
+        for seccion in secciones:
+            seccion.byteswap()
+    secciones += [lista_paises.codigos_continente, lista_paises.nombres, continentes]
+
+    archivo_temporal = nombre_archivo + ".snapshot.tmp"
+    with open(archivo_temporal, 'wb') as archivo:
+        archivo.write(CABECERA_SNAPSHOT.pack(MAGIA_SNAPSHOT, VERSION_SNAPSHOT, len(lista_paises),
+                                             datos_csv.st_mtime_ns, datos_csv.st_size,
+                                             len(lista_paises.nombres), len(continentes)))
+        for seccion in secciones:
+            archivo.write(seccion)
+            # Relleno hasta el próximo múltiplo de 8
+            archivo.write(bytes(-archivo.tell() % 8))
+        archivo.flush()
+        os.fsync(archivo.fileno())
+
+    os.replace(archivo_temporal, nombre_archivo + ".snapshot")
+
+# Función de snapshot
+def leer_cabecera_snapshot(nombre_archivo):
+    """
+    Lee la cabecera del snapshot y verifica que corresponda al CSV actual.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV.
+
+    Returns:
+        tuple: (cantidad de países, bytes de los nombres, bytes de la tabla de
+               continentes), o None si no hay snapshot válido para el CSV.
+    """
+    nombre_snapshot = nombre_archivo + ".snapshot"
+    if not os.path.exists(nombre_snapshot) or not os.path.exists(nombre_archivo):
+        return None
+
+    with open(nombre_snapshot, 'rb') as archivo:
+        cabecera = archivo.read(CABECERA_SNAPSHOT.size)
+    if len(cabecera) != CABECERA_SNAPSHOT.size:
+        return None
+
+    magia, version, cantidad, mtime_csv, tamano_csv, bytes_nombres, bytes_continentes = CABECERA_SNAPSHOT.unpack(cabecera)
+    datos_csv = os.stat(nombre_archivo)
+    if (magia, version) != (MAGIA_SNAPSHOT, VERSION_SNAPSHOT):
+        return None
+    if (mtime_csv, tamano_csv) != (datos_csv.st_mtime_ns, datos_csv.st_size):
+        return None
+
+    return cantidad, bytes_nombres, bytes_continentes
+
+# Función de snapshot
+def secciones_snapshot(cantidad, bytes_nombres, bytes_continentes):
+    """
+    Calcula dónde empieza y cuánto mide cada sección del snapshot
+    (cada una empieza en un múltiplo de 8 bytes, igual que al escribirlo).
+
+    Args:
+        cantidad (int): Cantidad de países.
+        bytes_nombres (int): Largo del bloque de nombres.
+        bytes_continentes (int): Largo de la tabla de continentes.
+
+    Returns:
+        list: (inicio, largo) de población, superficie, desplazamientos,
+              códigos de continente, nombres y continentes.
+    """
+    secciones = []
+    inicio = CABECERA_SNAPSHOT.size
+    for largo in (8 * cantidad, 8 * cantidad, 8 * (cantidad + 1), cantidad, bytes_nombres, bytes_continentes):
+        secciones.append((inicio, largo))
+        inicio += largo + (-largo % 8)
+    return secciones
+
+# Función de snapshot
+def abrir_snapshot_mapeado(nombre_archivo):
+    """
+    Abre el snapshot binario del CSV en modo solo lectura mapeándolo en
+    memoria. Las columnas son vistas sobre el archivo: abrirlo no lee los
+    datos y varios procesos comparten una sola copia en la caché de páginas.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV.
+
+    Returns:
+        ListaPaisesMapeada: La lista de solo lectura, o None si no hay un
+                            snapshot válido para el CSV.
+    """
+    # Las columnas están en little-endian: solo se pueden usar sin copiar en esas máquinas
+    if sys.byteorder != 'little':
+        return None
+
+    cabecera = leer_cabecera_snapshot(nombre_archivo)
+    if cabecera is None:
+        return None
+    cantidad, bytes_nombres, bytes_continentes = cabecera
+
+    with open(nombre_archivo + ".snapshot", 'rb') as archivo:
+        # Un archivo vacío no se puede mapear: siempre tiene al menos la cabecera
+        mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+    vista = memoryview(mapa)
+    secciones = secciones_snapshot(cantidad, bytes_nombres, bytes_continentes)
+    if secciones[-1][0] + secciones[-1][1] > len(mapa):
+        vista.release()
+        mapa.close()
+        return None
+    partes = [vista[inicio:inicio + largo] for inicio, largo in secciones]
+    vista.release()
+
+    poblaciones, superficies, desplazamientos_nombres = (parte.cast('q') for parte in partes[:3])
+    codigos_continente, nombres, continentes = partes[3:]
+    tabla_continentes = str(continentes, 'utf-8').split("\n") if bytes_continentes else []
+    continentes.release()
+
+    return ListaPaisesMapeada.desde_columnas(nombres, desplazamientos_nombres, poblaciones, superficies,
+                                             codigos_continente, tabla_continentes, mapa=mapa)
+
+# Función de snapshot
+def leer_snapshot(nombre_archivo):
+    """
+    Carga la ListaPaises desde el snapshot binario del CSV, sin convertir
+    ningún valor fila por fila: mapea el archivo y copia cada columna de
+    una vez. Si el snapshot no existe, está dañado o no corresponde al CSV
+    actual, devuelve None para que se lea el CSV.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV.
+
+    Returns:
+        ListaPaises: La lista cargada (modificable), o None.
+    """
+    cabecera = leer_cabecera_snapshot(nombre_archivo)
+    if cabecera is None:
+        return None
+    cantidad, bytes_nombres, bytes_continentes = cabecera
+
+    with open(nombre_archivo + ".snapshot", 'rb') as archivo:
+        datos = archivo.read()
+
+    secciones = secciones_snapshot(cantidad, bytes_nombres, bytes_continentes)
+    if secciones[-1][0] + secciones[-1][1] > len(datos):
+        return None
+    partes = [datos[inicio:inicio + largo] for inicio, largo in secciones]
+
+    numericas = []
+    for parte in partes[:3]:
+        columna = array('q')
+        columna.frombytes(parte)
+        if sys.byteorder != 'little':
+            columna.byteswap()
+        numericas.append(columna)
+
+    poblaciones, superficies, desplazamientos_nombres = numericas
+    tabla_continentes = partes[5].decode('utf-8').split("\n") if bytes_continentes else []
+    return ListaPaises.desde_columnas(bytearray(partes[4]), desplazamientos_nombres, poblaciones, superficies,
+                                      array('B', partes[3]), tabla_continentes)
+
+# Función de journal
+def guardar_cambio_pais(lista_paises, nombre_archivo, operacion, pais):
+    """
+    Guarda el alta o la modificación de un país agregando una línea al
+    journal (nombre_archivo + '.journal'), sin reescribir el CSV.
+    El tiempo de escritura no depende de la cantidad de países.
+    Cuando el journal supera UMBRAL_COMPACTACION entradas, se compacta
+    en segundo plano.
+
+    Args:
+        lista_paises (list): La lista de paises (para la compactación).
+        nombre_archivo (str): Ruta del archivo CSV.
+        operacion (str): 'ALTA' o 'MODIFICACION'.
+        pais (dict): El país agregado o modificado.
+    """
+    with _candado_datos:
+        with open(nombre_archivo + ".journal", 'a', encoding='utf-8', newline='') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow([operacion, pais["NOMBRE"], pais["POBLACION"], pais["SUPERFICIE"], pais["CONTINENTE"]])
+            # El cambio tiene que sobrevivir a un corte
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+        _entradas_journal[nombre_archivo] = _entradas_journal.get(nombre_archivo, 0) + 1
+        entradas = _entradas_journal[nombre_archivo]
+
+    if entradas >= UMBRAL_COMPACTACION:
+        iniciar_compactacion(lista_paises, nombre_archivo)
+
+# Función de journal
+def aplicar_journal(lista_paises, nombre_journal):
+    """
+    Aplica sobre la lista los cambios guardados en un journal.
+    Cada línea se aplica como "alta o modificación" según si el país existe,
+    así aplicar dos veces la misma línea no cambia el resultado (necesario
+    si la compactación se cortó después de reemplazar el CSV).
+
+    Args:
+        lista_paises (ListaPaises): La lista cargada desde el CSV.
+        nombre_journal (str): Ruta del journal.
+
+    Returns:
+        int: Cantidad de entradas aplicadas.
+    """
+    if not os.path.exists(nombre_journal):
+        return 0
+
+    with open(nombre_journal, 'rb') as archivo:
+        contenido = archivo.read()
+
+    # Una línea sin salto final quedó a medias por un corte: se descarta y se
+    # recorta el archivo para que la próxima entrada no se pegue a ella
+    fin_completo = contenido.rfind(b"\n") + 1
+    if fin_completo < len(contenido):
+        with open(nombre_journal, 'r+b') as archivo:
+            archivo.truncate(fin_completo)
+
+    entradas = 0
+    lineas = contenido[:fin_completo].decode('utf-8').splitlines()
+    for fila in csv.reader(lineas):
+        if len(fila) != len(COLUMNAS_JOURNAL):
+            continue
+        _, nombre, poblacion, superficie, continente = fila
+        pais = buscar_pais_lista(lista_paises, nombre)
+        if pais:
+            modificar_pais(lista_paises, pais, int(poblacion), int(superficie))
+        else:
+            lista_paises.append({"NOMBRE": nombre, "POBLACION": int(poblacion), "SUPERFICIE": int(superficie), "CONTINENTE": continente})
+        entradas += 1
+
+    return entradas
+
+# Función de journal
+def compactar_datos(lista_paises, nombre_archivo):
+    """
+    Vuelca el journal en el CSV (y en el snapshot binario). El journal
+    actual se renombra a '.compactando' (los cambios nuevos van a un journal
+    vacío), se escribe el CSV completo de forma atómica y recién después se
+    borra el '.compactando'. Si el programa se corta en el medio, al cargar
+    se vuelven a aplicar ambos journals y no se pierde nada.
+
+    Args:
+        lista_paises (list): La lista de paises con todos los cambios.
+        nombre_archivo (str): Ruta del archivo CSV.
+    """
+    copia = preparar_compactacion(lista_paises, nombre_archivo)
+    escribir_compactacion(copia, nombre_archivo)
+
+# Función de journal
+def preparar_compactacion(lista_paises, nombre_archivo):
+    """
+    Primera parte de la compactación, en el hilo que modifica la lista:
+    renombra el journal y copia los países. Así la copia coincide
+    exactamente con lo que quedó en el '.compactando'.
 
     Args:
+        lista_paises (list): La lista de paises con todos los cambios.
         nombre_archivo (str): Ruta del archivo CSV.
 
     Returns:
-        list: Una lista de diccionarios con los datos de los paises.
+        list: Copia de los países (una ListaPaises si la lista lo era).
     """
-    datos_cargados = []
-    
-    # Se verifica si el archivo existe antes de leerlo
-    if os.path.exists(nombre_archivo):
-        with open(nombre_archivo, 'r', encoding='utf-8', newline='') as archivo:
-            # csv.DictReader lee el archivo
-            lector = csv.DictReader(archivo)
-            # Inicio bucle
-            for fila in lector:
-                datos_cargados.append({"NOMBRE": fila["NOMBRE"], "POBLACION": int(fila["POBLACION"]), "SUPERFICIE": int(fila["SUPERFICIE"]), "CONTINENTE": fila["CONTINENTE"]})
-    
-    # Se devuelve la lista cargada o si el archivo no existe, vacia
-    return datos_cargados
+    nombre_journal = nombre_archivo + ".journal"
+    nombre_compactando = nombre_archivo + ".compactando"
 
-# Función de CSV
-def guardar_datos_csv(lista_paises, nombre_archivo):
+    with _candado_datos:
+        # Si quedó un '.compactando' de un corte anterior, se incluye en esta compactación
+        if os.path.exists(nombre_journal) and not os.path.exists(nombre_compactando):
+            os.replace(nombre_journal, nombre_compactando)
+        _entradas_journal[nombre_archivo] = 0
+
+    # Copia de las filas: la lista puede seguir cambiando mientras se escribe
+    if isinstance(lista_paises, ListaPaises):
+        return lista_paises.copiar()
+    return [dict(pais) for pais in lista_paises]
+
+# Función de journal
+def escribir_compactacion(copia, nombre_archivo):
     """
-    Guarda el estado actual de la lista de paises en el archivo CSV.
-    Esta función se llama después de cualquier modificación de datos.
+    Segunda parte de la compactación (puede correr en segundo plano):
+    escribe el CSV y el snapshot y borra el '.compactando'.
 
     Args:
-        lista_paises (list): La lista de diccionarios actualizada.
-        nombre_archivo (str): Ruta del archivo CSV donde se guarda.
+        copia (list): La copia devuelta por preparar_compactacion.
+        nombre_archivo (str): Ruta del archivo CSV.
+    """
+    escribir_csv_atomico(copia, nombre_archivo)
+    if isinstance(copia, ListaPaises):
+        escribir_snapshot(copia, nombre_archivo)
+
+    nombre_compactando = nombre_archivo + ".compactando"
+    if os.path.exists(nombre_compactando):
+        os.remove(nombre_compactando)
+
+# Función de journal
+def iniciar_compactacion(lista_paises, nombre_archivo):
+    """
+    Compacta el journal: la copia de los datos se hace en el momento (es
+    una copia de arrays) y la escritura de los archivos en un hilo de fondo,
+    salvo que ya haya uno trabajando sobre el mismo archivo. El hilo no es
+    daemon: si el usuario sale del programa, la compactación termina antes
+    de cerrar.
+
+    Args:
+        lista_paises (list): La lista de paises.
+        nombre_archivo (str): Ruta del archivo CSV.
+    """
+    hilo = _hilos_compactacion.get(nombre_archivo)
+    if hilo is not None and hilo.is_alive():
+        return
+
+    copia = preparar_compactacion(lista_paises, nombre_archivo)
+    hilo = threading.Thread(target=escribir_compactacion, args=(copia, nombre_archivo))
+    _hilos_compactacion[nombre_archivo] = hilo
+    hilo.start()
+
+#Consulta compuesta sobre una lista en memoria
+def consultar_lista(lista, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+    """
+    Resuelve una consulta de Almacenamiento.consultar sobre una ListaPaises
+    ya cargada: los criterios con el plan de planificar_consulta (y la
+    caché de consultas), y el orden con ordenar_posiciones. Solo se arman
+    los países que entran en el límite.
+
+    Args:
+        lista (ListaPaises): La lista de países.
+        (los demás, como en Almacenamiento.consultar)
 
     Returns:
-        str: Mensaje de confirmación de datos actualizados
+        list: Los países (RegistroPais).
     """
+    posiciones = None
+    if termino is not None or continente is not None or poblacion is not None or superficie is not None:
+        posiciones = filtrar_posiciones(lista, continente, poblacion, superficie, termino)
 
-    with open(nombre_archivo, 'w', encoding='utf-8', newline='') as archivo:
-        # DictWriter escribe el archivo
-        escritor = csv.DictWriter(archivo, fieldnames=["NOMBRE","POBLACION","SUPERFICIE","CONTINENTE"])
-        # Escribe el encabezado (NOMBRE,PROBLACIÓN,SUPERFICIE,CONTINENTE)
-        escritor.writeheader()
-        # Escribe todas las filas en el csv
-        escritor.writerows(lista_paises)
-    
-    # Mensaje final
-    print("========================================")
-    print(f"Datos actualizados en {nombre_archivo}.")
+    if orden is not None:
+        claves, reversas = orden
+        reversas = (reversas,) * len(claves) if isinstance(reversas, bool) else tuple(reversas)
+        posiciones = ordenar_posiciones(lista, posiciones, tuple(claves), reversas, limite)
+    elif posiciones is None:
+        posiciones = range(len(lista))
+    return [lista[i] for i in islice(posiciones, limite)]
+
+#Explica como se resuelve una consulta
+def explicar_consulta(lista, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+    """
+    Resuelve una consulta igual que consultar_lista, pero sin la caché de
+    consultas, y devuelve cómo se resolvió en lugar de los países: los
+    pasos del plan con los países estimados y los que quedaron en cada uno,
+    cómo se ordenó y cuánto tardó.
+
+    Args:
+        lista (ListaPaises): La lista de países.
+        (los demás, como en Almacenamiento.consultar)
+
+    Returns:
+        dict: 'motor' ('memoria'), 'paises' (de la lista), 'plan' (los pasos
+              de planificar_consulta con sus 'filas'), 'orden' (ej:
+              'POBLACION:desc', o None), 'estrategia_orden' (ver
+              estrategia_de_orden), 'limite', 'resultado' (países
+              devueltos) y 'segundos'.
+    """
+    inicio = time.perf_counter()
+    plan = planificar_consulta(lista, termino, continente, poblacion, superficie)
+    posiciones = ejecutar_plan(lista, plan) if plan else None
+
+    texto_orden = estrategia_orden = None
+    if orden is not None:
+        claves, reversas = orden
+        reversas = (reversas,) * len(claves) if isinstance(reversas, bool) else tuple(reversas)
+        texto_orden = ",".join(f"{clave}:{'desc' if reversa else 'asc'}" for clave, reversa in zip(claves, reversas))
+        estrategia_orden = estrategia_de_orden(lista, posiciones, tuple(claves), limite)
+        posiciones = ordenar_posiciones(lista, posiciones, tuple(claves), reversas, limite)
+    elif posiciones is None:
+        posiciones = range(len(lista))
+    resultado = sum(1 for _ in islice(posiciones, limite))
+
+    return {"motor": "memoria", "paises": len(lista), "plan": plan, "orden": texto_orden, "estrategia_orden": estrategia_orden,
+            "limite": limite, "resultado": resultado, "segundos": time.perf_counter() - inicio}
+
+#Estadisticas de una lista en memoria
+def estadisticas_lista(lista, continente=None, poblacion=None, superficie=None):
+    """
+    Resuelve Almacenamiento.estadisticas sobre una ListaPaises ya cargada.
+
+    Args:
+        lista (ListaPaises): La lista de países.
+        (los demás, como en Almacenamiento.estadisticas)
+
+    Returns:
+        dict: Las mismas claves que calcular_estadisticas.
+    """
+    if continente is None and poblacion is None and superficie is None:
+        return calcular_estadisticas(lista)
+    # Con un ejecutor paralelo, cada proceso calcula las estadísticas parciales de su partición
+    if lista.ejecutor is not None:
+        return lista.ejecutor.estadisticas(continente, poblacion, superficie)
+    return estadisticas_posiciones(lista, filtrar_posiciones(lista, continente, poblacion, superficie))
+
+#Agregados por continente de una lista en memoria
+def agrupar_lista(lista, continente=None, poblacion=None, superficie=None):
+    """
+    Resuelve Almacenamiento.agrupar sobre una ListaPaises ya cargada: los
+    filtros salen de filtrar_posiciones (y su caché) y los agregados, de
+    agrupar_por_continente sobre las columnas.
+
+    Args:
+        lista (ListaPaises): La lista de países.
+        (los demás, como en Almacenamiento.agrupar)
+
+    Returns:
+        dict: continente -> agregados (ver resumen_grupo).
+    """
+    posiciones = None
+    if continente is not None or poblacion is not None or superficie is not None:
+        posiciones = filtrar_posiciones(lista, continente, poblacion, superficie)
+    return agrupar_por_continente(lista, posiciones)
+
+#Ranking de una lista en memoria
+def ranking_lista(lista, clave, k, mayores=True, continente=None, poblacion=None, superficie=None):
+    """
+    Resuelve Almacenamiento.ranking sobre una ListaPaises ya cargada: sin
+    filtros usa su índice ordenado (si está armado); con filtros elige con
+    un heap entre las posiciones de filtrar_posiciones.
+
+    Args:
+        lista (ListaPaises): La lista de países.
+        (los demás, como en Almacenamiento.ranking)
+
+    Returns:
+        list: Los países (RegistroPais).
+    """
+    posiciones = None
+    if continente is not None or poblacion is not None or superficie is not None:
+        posiciones = filtrar_posiciones(lista, continente, poblacion, superficie)
+    return ranking_paises(lista, clave, k, mayores, posiciones)
+
+# Interfaz de almacenamiento de los países
+class Almacenamiento(ABC):
+    """
+    Dónde y cómo se guardan los países. El menú carga la lista completa con
+    cargar y guarda cada alta o modificación con guardar_cambio; las
+    consultas sin menú (consultar y estadisticas) las resuelve cada motor
+    de la forma más directa que tenga. Las implementaciones son
+    AlmacenamientoCSV y AlmacenamientoSQLite (ver abrir_almacenamiento).
+
+    Attributes:
+        nombre_archivo (str): Ruta del archivo de datos.
+    """
+    def __init__(self, nombre_archivo):
+        self.nombre_archivo = nombre_archivo
+
+    @abstractmethod
+    def cargar(self):
+        """
+        Returns:
+            ListaPaises: Todos los países, en el orden en que se agregaron.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def guardar(self, lista_paises):
+        """
+        Guarda la lista completa, reemplazando lo que hubiera.
+
+        Args:
+            lista_paises (list): La lista de países.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def guardar_cambio(self, lista_paises, operacion, pais):
+        """
+        Guarda un alta o una modificación ya aplicada en la lista.
+
+        Args:
+            lista_paises (list): La lista de países.
+            operacion (str): 'ALTA' o 'MODIFICACION'.
+            pais (dict): El país agregado o modificado.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def importar(self, lista_paises, paises):
+        """
+        Agrega muchos países (ya validados y sin duplicados) a la lista y
+        los guarda con una sola escritura.
+
+        Args:
+            lista_paises (list): La lista de países.
+            paises (list): Los diccionarios de los países nuevos.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def consultar(self, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+        """
+        Países cuyo nombre contiene el término y que cumplen los filtros
+        (los criterios en None no se aplican), ordenados y recortados.
+
+        Args:
+            termino (str): Parte del nombre (ignora mayúsculas y tildes).
+            continente (str): Continente (ignora mayúsculas y tildes).
+            poblacion (tuple): (mínimo, máximo) de población, inclusivo.
+            superficie (tuple): (mínimo, máximo) de superficie, inclusivo.
+            orden (tuple): (claves, reversas) como en ordenar_lista, o None
+                           para el orden de la lista.
+            limite (int): Cantidad máxima de países.
+
+        Returns:
+            list: Los países (diccionarios o RegistroPais).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def estadisticas(self, continente=None, poblacion=None, superficie=None):
+        """
+        Estadísticas de los países que cumplen los filtros.
+
+        Returns:
+            dict: Las mismas claves que calcular_estadisticas.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def agrupar(self, continente=None, poblacion=None, superficie=None):
+        """
+        Cantidad, suma, promedio, mínimo y máximo de población y superficie,
+        y densidad, de cada continente, entre los países que cumplen los
+        filtros (una sola pasada por los datos).
+
+        Args:
+            (los filtros, como en consultar)
+
+        Returns:
+            dict: continente -> agregados (ver resumen_grupo), en el orden
+                  en que aparece cada continente.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def explicar(self, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+        """
+        Resuelve una consulta como consultar, pero devuelve cómo la resolvió
+        el motor en lugar de los países.
+
+        Args:
+            (como en consultar)
+
+        Returns:
+            dict: 'motor', 'paises', 'plan' (los pasos, cada uno un dict),
+                  'orden', 'estrategia_orden', 'limite', 'resultado' (países
+                  que devuelve la consulta) y 'segundos'.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def ranking(self, clave, k, mayores=True, continente=None, poblacion=None, superficie=None):
+        """
+        Los k países con mayor (o menor) valor de una clave numérica entre
+        los que cumplen los filtros, sin ordenar todos. En los empates queda
+        primero el que se agregó antes (ver ranking_paises).
+
+        Args:
+            clave (str): 'POBLACION' o 'SUPERFICIE'.
+            k (int): Cantidad de países.
+            mayores (bool): True para los de mayor valor (de mayor a menor),
+                            False para los de menor valor (de menor a mayor).
+            (los filtros, como en consultar)
+
+        Returns:
+            list: Los países (diccionarios o RegistroPais).
+
+        Raises:
+            ValueError: Si la clave no es numérica.
+        """
+        raise NotImplementedError
+
+    def cerrar(self):
+        """
+        Libera los recursos abiertos (conexiones, procesos).
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.cerrar()
+
+# Almacenamiento en CSV con journal y snapshot
+class AlmacenamientoCSV(Almacenamiento):
+    """
+    Los países en un CSV, con el journal de cambios y el snapshot binario.
+    Las consultas se resuelven en memoria con los índices de la ListaPaises
+    (abriendo el snapshot mapeado si está al día).
+
+    Attributes:
+        nombre_archivo (str): Ruta del archivo CSV.
+        procesos (int): Si es mayor a 1, las consultas usan un EjecutorParalelo.
+    """
+    def __init__(self, nombre_archivo, procesos=1):
+        super().__init__(nombre_archivo)
+        self.procesos = procesos
+        self._lista = None
+
+    def cargar(self):
+        self._lista = cargar_datos_csv(self.nombre_archivo)
+        return self._lista
+
+    def guardar(self, lista_paises):
+        # Una compactación en segundo plano escribe el mismo CSV: se espera a que termine
+        hilo = _hilos_compactacion.get(self.nombre_archivo)
+        if hilo is not None:
+            hilo.join()
+        compactar_datos(lista_paises, self.nombre_archivo)
+
+    def guardar_cambio(self, lista_paises, operacion, pais):
+        guardar_cambio_pais(lista_paises, self.nombre_archivo, operacion, pais)
+
+    def importar(self, lista_paises, paises):
+        lista_paises.extend(paises)
+        self.guardar(lista_paises)
+
+    def lista_consultas(self):
+        """
+        Devuelve la lista sobre la que se consulta: la cargada con cargar,
+        o si no, la de cargar_para_consultas (con su EjecutorParalelo si
+        hay más de un proceso).
+
+        Returns:
+            ListaPaises: La lista de países.
+        """
+        if self._lista is None:
+            self._lista = cargar_para_consultas(self.nombre_archivo)
+        if self.procesos > 1 and self._lista.ejecutor is None:
+            self._lista.ejecutor = EjecutorParalelo(self._lista, self.procesos)
+        return self._lista
+
+    def consultar(self, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+        return consultar_lista(self.lista_consultas(), termino, continente, poblacion, superficie, orden, limite)
+
+    def explicar(self, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+        return explicar_consulta(self.lista_consultas(), termino, continente, poblacion, superficie, orden, limite)
+
+    def estadisticas(self, continente=None, poblacion=None, superficie=None):
+        return estadisticas_lista(self.lista_consultas(), continente, poblacion, superficie)
+
+    def agrupar(self, continente=None, poblacion=None, superficie=None):
+        return agrupar_lista(self.lista_consultas(), continente, poblacion, superficie)
+
+    def ranking(self, clave, k, mayores=True, continente=None, poblacion=None, superficie=None):
+        return ranking_lista(self.lista_consultas(), clave, k, mayores, continente, poblacion, superficie)
+
+    def cerrar(self):
+        if self._lista is not None and self._lista.ejecutor is not None:
+            self._lista.ejecutor.cerrar()
+        # La lista del snapshot mapeado tiene el archivo abierto
+        if isinstance(self._lista, ListaPaisesMapeada):
+            self._lista.cerrar()
+
+# Almacenamiento en una base SQLite
+class AlmacenamientoSQLite(Almacenamiento):
+    """
+    Los países en una base SQLite local (modo WAL), con índices sobre el
+    nombre normalizado, el continente normalizado, la población y la
+    superficie. Las altas y modificaciones escriben una sola fila, y las
+    búsquedas, filtros, ordenamientos y estadísticas se resuelven con
+    consultas SQL sin cargar la lista.
+
+    El 'id' de cada fila conserva el orden en que se agregaron los países.
+    El nombre no es único en la tabla, igual que en la lista y en el CSV
+    (un CSV puede traer 'Argentina' y 'ARGENTINA'): guardar copia los
+    repetidos tal cual y una modificación cambia el primero, que es el que
+    encuentra buscar_pais_lista.
+
+    Attributes:
+        nombre_archivo (str): Ruta de la base.
+        conexion (sqlite3.Connection): La conexión abierta.
+    """
+    # Columna de la tabla para cada clave de país
+    COLUMNAS = {"NOMBRE": "nombre", "POBLACION": "poblacion", "SUPERFICIE": "superficie", "CONTINENTE": "continente"}
+
+    def __init__(self, nombre_archivo):
+        super().__init__(nombre_archivo)
+        self.conexion = sqlite3.connect(nombre_archivo)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        # En modo WAL, NORMAL no pierde consistencia ante un corte
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        with self.conexion:
+            self.conexion.executescript("""
+                CREATE TABLE IF NOT EXISTS paises (
+                    id INTEGER PRIMARY KEY,
+                    nombre TEXT NOT NULL,
+                    nombre_normalizado TEXT NOT NULL,
+                    poblacion INTEGER NOT NULL,
+                    superficie INTEGER NOT NULL,
+                    continente TEXT NOT NULL,
+                    continente_normalizado TEXT NOT NULL
+                );
+            """)
+            self._quitar_nombre_unico()
+            self.conexion.executescript("""
+                CREATE INDEX IF NOT EXISTS paises_nombre ON paises (nombre_normalizado);
+                CREATE INDEX IF NOT EXISTS paises_continente ON paises (continente_normalizado);
+                CREATE INDEX IF NOT EXISTS paises_poblacion ON paises (poblacion);
+                CREATE INDEX IF NOT EXISTS paises_superficie ON paises (superficie);
+            """)
+
+    def _quitar_nombre_unico(self):
+        """
+        Las bases creadas por versiones anteriores tienen el nombre
+        normalizado como UNIQUE (y no aceptan los repetidos que sí acepta
+        la lista): se copia la tabla a una sin esa restricción, con los
+        mismos ids.
+        """
+        definicion = self.conexion.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'paises'").fetchone()[0]
+        if "UNIQUE" not in definicion:
+            return
+        self.conexion.executescript(f"""
+            BEGIN;
+            ALTER TABLE paises RENAME TO paises_anterior;
+            {definicion.replace("NOT NULL UNIQUE", "NOT NULL")};
+            INSERT INTO paises SELECT * FROM paises_anterior;
+            DROP TABLE paises_anterior;
+            COMMIT;
+        """)
+
+    @staticmethod
+    def fila(pais):
+        """
+        Convierte un país en los valores de una fila de la tabla.
+
+        Args:
+            pais (dict): El país.
+
+        Returns:
+            tuple: (nombre, nombre normalizado, población, superficie,
+                   continente, continente normalizado)
+        """
+        return (pais["NOMBRE"], normalizar_texto(pais["NOMBRE"]), pais["POBLACION"], pais["SUPERFICIE"],
+                pais["CONTINENTE"], normalizar_texto(pais["CONTINENTE"]))
+
+    def cargar(self):
+        cursor = self.conexion.execute("SELECT nombre, poblacion, superficie, continente FROM paises ORDER BY id")
+        return ListaPaises({"NOMBRE": nombre, "POBLACION": poblacion, "SUPERFICIE": superficie, "CONTINENTE": continente}
+                           for nombre, poblacion, superficie, continente in cursor)
+
+    def guardar(self, lista_paises):
+        with self.conexion:
+            self.conexion.execute("DELETE FROM paises")
+            self._insertar(lista_paises)
+
+    def guardar_cambio(self, lista_paises, operacion, pais):
+        with self.conexion:
+            if operacion == "ALTA":
+                self._insertar([pais])
+            else:
+                # Si el nombre está repetido se modifica el primero, como en la lista
+                self.conexion.execute("UPDATE paises SET poblacion = ?, superficie = ? "
+                                      "WHERE id = (SELECT MIN(id) FROM paises WHERE nombre_normalizado = ?)",
+                                      (pais["POBLACION"], pais["SUPERFICIE"], normalizar_texto(pais["NOMBRE"])))
+
+    def importar(self, lista_paises, paises):
+        # Primero la base (una transacción): si falla, la lista no cambia
+        with self.conexion:
+            self._insertar(paises)
+        lista_paises.extend(paises)
+
+    def _insertar(self, paises):
+        self.conexion.executemany(
+            "INSERT INTO paises (nombre, nombre_normalizado, poblacion, superficie, continente, continente_normalizado) "
+            "VALUES (?, ?, ?, ?, ?, ?)", map(self.fila, paises))
+
+    def _condiciones(self, termino=None, continente=None, poblacion=None, superficie=None):
+        """
+        Arma el WHERE de una consulta a partir de los criterios.
+
+        Returns:
+            tuple: (texto del WHERE, o "" sin criterios; parámetros)
+        """
+        condiciones = []
+        parametros = []
+        if termino is not None:
+            # Búsqueda parcial sobre el nombre normalizado (no hace falta escapar comodines)
+            condiciones.append("instr(nombre_normalizado, ?) > 0")
+            parametros.append(normalizar_texto(termino))
+        if continente is not None:
+            condiciones.append("continente_normalizado = ?")
+            parametros.append(normalizar_texto(continente))
+        for columna, rango in (("poblacion", poblacion), ("superficie", superficie)):
+            if rango is not None:
+                condiciones.append(f"{columna} BETWEEN ? AND ?")
+                parametros.extend(rango)
+        return (" WHERE " + " AND ".join(condiciones) if condiciones else ""), parametros
+
+    def _consulta(self, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+        """
+        Arma el SELECT de consultar.
+
+        Returns:
+            tuple: (texto de la consulta, parámetros)
+        """
+        donde, parametros = self._condiciones(termino, continente, poblacion, superficie)
+
+        # En los empates queda primero el que se agregó antes, igual que en ordenar_lista
+        orden_sql = []
+        if orden is not None:
+            claves, reversas = orden
+            reversas = (reversas,) * len(claves) if isinstance(reversas, bool) else reversas
+            orden_sql = [f"{self.COLUMNAS[clave]} {'DESC' if reversa else 'ASC'}" for clave, reversa in zip(claves, reversas)]
+        orden_sql.append("id")
+
+        consulta = f"SELECT nombre, poblacion, superficie, continente FROM paises{donde} ORDER BY {', '.join(orden_sql)}"
+        if limite is not None:
+            consulta += " LIMIT ?"
+            parametros.append(limite)
+        return consulta, parametros
+
+    def consultar(self, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+        consulta, parametros = self._consulta(termino, continente, poblacion, superficie, orden, limite)
+        return [{"NOMBRE": nombre, "POBLACION": poblacion, "SUPERFICIE": superficie, "CONTINENTE": continente}
+                for nombre, poblacion, superficie, continente in self.conexion.execute(consulta, parametros)]
+
+    def estadisticas(self, continente=None, poblacion=None, superficie=None):
+        donde, parametros = self._condiciones(continente=continente, poblacion=poblacion, superficie=superficie)
+        cantidad, total_poblacion, total_superficie = self.conexion.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(poblacion), 0), COALESCE(SUM(superficie), 0) FROM paises{donde}", parametros).fetchone()
+
+        # Mayor y menor: en los empates, el primero que se agregó (salen del índice de población)
+        extremos = []
+        for direccion in ("DESC", "ASC"):
+            fila = self.conexion.execute(f"SELECT nombre, poblacion, superficie, continente FROM paises{donde} "
+                                         f"ORDER BY poblacion {direccion}, id LIMIT 1", parametros).fetchone()
+            extremos.append(None if fila is None else dict(zip(CLAVES_PAIS, fila)))
+
+        # Continentes en el orden en que aparecen
+        por_continente = dict(self.conexion.execute(
+            f"SELECT continente, COUNT(*) FROM paises{donde} GROUP BY continente ORDER BY MIN(id)", parametros))
+
+        return {
+            "cantidad": cantidad,
+            "total_poblacion": total_poblacion,
+            "total_superficie": total_superficie,
+            "mayor_poblacion": extremos[0],
+            "menor_poblacion": extremos[1],
+            "promedio_poblacion": total_poblacion / cantidad if cantidad else 0,
+            "promedio_superficie": total_superficie / cantidad if cantidad else 0,
+            "por_continente": por_continente,
+        }
+
+    def agrupar(self, continente=None, poblacion=None, superficie=None):
+        donde, parametros = self._condiciones(continente=continente, poblacion=poblacion, superficie=superficie)
+        # Un solo GROUP BY calcula todos los agregados; continentes en el orden en que aparecen
+        filas = self.conexion.execute(
+            "SELECT continente, COUNT(*), SUM(poblacion), MIN(poblacion), MAX(poblacion), SUM(superficie), MIN(superficie), MAX(superficie) "
+            f"FROM paises{donde} GROUP BY continente ORDER BY MIN(id)", parametros)
+        return {continente: resumen_grupo(*agregados) for continente, *agregados in filas}
+
+    def explicar(self, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+        # El plan lo elige SQLite: cada paso es una línea de EXPLAIN QUERY PLAN
+        consulta, parametros = self._consulta(termino, continente, poblacion, superficie, orden, limite)
+        inicio = time.perf_counter()
+        resultado = len(self.conexion.execute(consulta, parametros).fetchall())
+        segundos = time.perf_counter() - inicio
+        plan = [{"estrategia": detalle} for *_, detalle in self.conexion.execute("EXPLAIN QUERY PLAN " + consulta, parametros)]
+        paises = self.conexion.execute("SELECT COUNT(*) FROM paises").fetchone()[0]
+
+        texto_orden = None
+        if orden is not None:
+            claves, reversas = orden
+            reversas = (reversas,) * len(claves) if isinstance(reversas, bool) else reversas
+            texto_orden = ",".join(f"{clave}:{'desc' if reversa else 'asc'}" for clave, reversa in zip(claves, reversas))
+        return {"motor": "sqlite", "paises": paises, "plan": plan, "orden": texto_orden, "estrategia_orden": None,
+                "limite": limite, "resultado": resultado, "segundos": segundos}
+
+    def ranking(self, clave, k, mayores=True, continente=None, poblacion=None, superficie=None):
+        if clave not in CLAVES_NUMERICAS:
+            raise ValueError(f"El ranking solo puede ser por {' o '.join(CLAVES_NUMERICAS)}")
+        donde, parametros = self._condiciones(continente=continente, poblacion=poblacion, superficie=superficie)
+        # Con LIMIT, SQLite se queda con los k primeros sin ordenar toda la tabla; en los empates, el que se agregó antes
+        consulta = (f"SELECT nombre, poblacion, superficie, continente FROM paises{donde} "
+                    f"ORDER BY {self.COLUMNAS[clave]} {'DESC' if mayores else 'ASC'}, id LIMIT ?")
+        return [dict(zip(CLAVES_PAIS, fila)) for fila in self.conexion.execute(consulta, parametros + [k])]
+
+    def cerrar(self):
+        self.conexion.close()
+
+#Abre el almacenamiento que corresponde a un archivo
+def abrir_almacenamiento(nombre_archivo, procesos=1):
+    """
+    Devuelve el almacenamiento según la extensión del archivo: SQLite para
+    .db, .sqlite y .sqlite3, y CSV para el resto.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo de datos.
+        procesos (int): Procesos para las consultas del CSV (ver AlmacenamientoCSV).
+
+    Returns:
+        Almacenamiento: El almacenamiento abierto.
+    """
+    if nombre_archivo.lower().endswith(EXTENSIONES_SQLITE):
+        return AlmacenamientoSQLite(nombre_archivo)
+    return AlmacenamientoCSV(nombre_archivo, procesos)
+
+# Función de importación
+def leer_filas_importacion(origen, formato=None):
+    """
+    Lee las filas a importar de un archivo CSV (con encabezado
+    NOMBRE,POBLACION,SUPERFICIE,CONTINENTE), de un archivo JSON Lines (un
+    objeto por línea) o de un iterable de diccionarios. Las filas se
+    devuelven sin validar, de a una por vez.
+
+    Args:
+        origen (str | iterable): Ruta del archivo, o los diccionarios a importar.
+        formato (str): 'csv' o 'jsonl'. Si no se indica, sale de la extensión
+                       del archivo (.jsonl / .ndjson es JSON Lines).
+
+    Yields:
+        tuple: (número de fila, diccionario de la fila, o None si la línea
+               JSON no se pudo leer)
+    """
+    if not isinstance(origen, str):
+        yield from enumerate(origen, start=1)
+        return
+
+    if formato is None:
+        formato = "jsonl" if origen.endswith((".jsonl", ".ndjson")) else "csv"
+
+    with open(origen, 'r', encoding='utf-8', newline='') as archivo:
+        if formato == "csv":
+            # La fila 1 es el encabezado
+            yield from enumerate(csv.DictReader(archivo), start=2)
+            return
+        for numero_fila, linea in enumerate(archivo, start=1):
+            if not linea.strip():
+                continue
+            try:
+                fila = json.loads(linea)
+            except ValueError:
+                fila = None
+            yield numero_fila, fila if isinstance(fila, dict) else None
+
+#Valida los datos de un pais que no se ingresan por el menu
+def validar_pais(fila, continentes_validos=CONTINENTES, claves=CLAVES_PAIS):
+    """
+    Valida los campos de un país (de una fila importada o de una petición
+    al servicio) con las mismas reglas que el alta por menú: nombre no
+    vacío ni solo números (con formato de título, como en validar_string),
+    población y superficie enteros positivos y continente válido.
+
+    Args:
+        fila (dict): Los datos recibidos (los valores pueden ser texto o números).
+        continentes_validos (dict): El diccionario de continentes.
+        claves (tuple): Los campos a validar (por defecto, todos).
+
+    Returns:
+        dict: Los campos validados y convertidos.
+
+    Raises:
+        ValueError: 'CLAVE: motivo' con el primer campo inválido, o si la
+                    fila no es un diccionario.
+    """
+    if not isinstance(fila, Mapping):
+        raise ValueError(f"La fila tiene que ser un diccionario con {', '.join(claves)}")
+    pais = {}
+    for clave in claves:
+        try:
+            if clave == "NOMBRE":
+                pais[clave] = convertir_string(str(fila.get(clave) or ""))
+            elif clave == "CONTINENTE":
+                pais[clave] = convertir_continente(str(fila.get(clave) or ""), continentes_validos)
+            else:
+                pais[clave] = convertir_numero(str(fila.get(clave, "")))
+        except ValueError as error:
+            raise ValueError(f"{clave}: {str(error).strip()}")
+    return pais
+
+# Función de importación
+def importar_paises(lista_paises, origen, almacenamiento, continentes_validos=CONTINENTES, formato=None):
+    """
+    Importa muchos países de una vez. Cada fila se valida con las mismas
+    reglas que el alta por menú (ver validar_pais) y los duplicados se
+    detectan con un conjunto de nombres normalizados, tanto contra la lista
+    como dentro del mismo lote. Las filas inválidas (también las que no son
+    diccionarios) o repetidas se informan y se saltean.
+
+    Los países válidos se agregan juntos y se guardan una sola vez al final
+    con Almacenamiento.importar (en CSV, el archivo y el snapshot completos;
+    en SQLite, una sola transacción). Si la escritura falla, los datos
+    guardados quedan como estaban.
+
+    Args:
+        lista_paises (list): La lista actual de países.
+        origen (str | iterable): Archivo CSV o JSON Lines, o un iterable de diccionarios.
+        almacenamiento (Almacenamiento | str): Donde se guardan los datos (o la
+                                              ruta del archivo, ver abrir_almacenamiento).
+        continentes_validos (dict): El diccionario de continentes.
+        formato (str): 'csv' o 'jsonl' (ver leer_filas_importacion).
+
+    Returns:
+        dict: 'agregados' (cantidad), 'duplicados' (cantidad) y 'errores'
+              (lista de (número de fila, motivo)).
+    """
+    # Conjunto de nombres normalizados ya presentes
+    indice_nombres = getattr(lista_paises, 'indice_nombres', None)
+    existentes = indice_nombres if indice_nombres is not None else {normalizar_texto(pais["NOMBRE"]) for pais in lista_paises}
+    nuevos = set()
+
+    validos = []
+    duplicados = 0
+    errores = []
+    for numero_fila, fila in leer_filas_importacion(origen, formato):
+        try:
+            if fila is None:
+                raise ValueError("La línea no es un objeto JSON")
+            pais = validar_pais(fila, continentes_validos)
+        except ValueError as error:
+            errores.append((numero_fila, str(error)))
+            continue
+
+        # Duplicados contra la lista y dentro del lote
+        nombre_norm = normalizar_texto(pais["NOMBRE"])
+        if nombre_norm in existentes or nombre_norm in nuevos:
+            duplicados += 1
+            continue
+        nuevos.add(nombre_norm)
+        validos.append(pais)
+
+    if validos:
+        # Una sola escritura para todo el lote (si llegó una ruta, el almacenamiento se abre y se cierra acá)
+        if isinstance(almacenamiento, str):
+            with abrir_almacenamiento(almacenamiento) as abierto:
+                abierto.importar(lista_paises, validos)
+        else:
+            almacenamiento.importar(lista_paises, validos)
+
+    return {"agregados": len(validos), "duplicados": duplicados, "errores": errores}
 
 # Función de validación
 def lista_vacia(lista_paises):
@@ -87,20 +2411,52 @@ def validar_string(mensaje):
     """
     #Validar que no esté vacío
     while True:
-        cadena = input(mensaje).strip()
-        if not cadena:
-            print("Error: Ingreso vacío ")
-        # Comprueba si la cadena consiste SOLO de dígitos
-        elif cadena.isdigit():
-            print("Error: La entrada no puede ser solo números.")
-        else: 
-            return cadena.title()
+        try:
+            return convertir_string(input(mensaje))
+        except ValueError as error:
+            print(f"Error: {error}")
+
+#Convierte un texto en un nombre valido
+def convertir_string(cadena):
+    """
+    Valida que un texto no esté vacío ni sea solo números y le da formato
+    de título. Son las reglas de validar_string, sin pedir nada al usuario
+    (la importación masiva y el servicio las usan para los nombres).
+
+    Args:
+        cadena (str): El texto a convertir.
+
+    Returns:
+        str: El texto sin espacios en los extremos y con formato de título.
+
+    Raises:
+        ValueError: Si el texto está vacío o es solo números.
+    """
+    cadena = cadena.strip()
+    if not cadena:
+        raise ValueError("Ingreso vacío ")
+    # Comprueba si la cadena consiste SOLO de dígitos
+    if cadena.isdigit():
+        raise ValueError("La entrada no puede ser solo números.")
+    return cadena.title()
+
+# Tabla de normalización: vocales con tilde, diéresis o acento grave (minúsculas
+# y mayúsculas) y la ñ pasan a su letra sin marca. Es un str de 256 caracteres
+# indexado por código (más rápido que un dict en str.translate); los caracteres
+# fuera de Latin-1 quedan como están
+_REEMPLAZOS_NORMALIZACION = str.maketrans(
+    "áéíóúàèìòùäëïöüâêîôûñÁÉÍÓÚÀÈÌÒÙÄËÏÖÜÂÊÎÔÛÑ",
+    "aeiouaeiouaeiouaeioun" "aeiouaeiouaeiouaeioun",
+)
+TABLA_NORMALIZACION = "".join(chr(_REEMPLAZOS_NORMALIZACION.get(i, i)) for i in range(256))
 
 #Normalizar el texto para evitar errores por tildes
 def normalizar_texto(texto):
     """
-    Convierte un texto a minúsculas y reemplaza las vocales
-    con tilde por sus equivalentes sin tilde.
+    Convierte un texto a minúsculas y reemplaza las vocales con tilde,
+    diéresis o acento (también en mayúscula) y la ñ por sus equivalentes
+    sin marca. Usa un único str.translate en lugar de un reemplazo por
+    letra, y ni siquiera eso si el texto es ASCII (el caso más común).
 
     Args:
         texto (str): La cadena de texto a normalizar.
@@ -108,23 +2464,25 @@ def normalizar_texto(texto):
     Returns:
         str: El texto normalizado.
     """
-    # Primero, convierte todo a minúsculas
-    texto = texto.lower()
-    
-    # Define los reemplazos
-    reemplazos = (
-        ("á", "a"),
-        ("é", "e"),
-        ("í", "i"),
-        ("ó", "o"),
-        ("ú", "u"),
-    )
-
-    # Aplica cada reemplazo
-    for a, b in reemplazos:
-        texto = texto.replace(a, b)
-        
-    return texto
+    # Un texto ASCII no tiene tildes: alcanza con pasarlo a minúsculas
+    if texto.isascii():
+        return texto.lower()
+
+    return texto.lower().translate(TABLA_NORMALIZACION)
+
+#Obtiene los trigramas de un texto
+def trigramas(texto):
+    """
+    Devuelve el conjunto de subcadenas de 3 caracteres de un texto.
+    Se usan para indexar los nombres y acelerar la búsqueda parcial.
+
+    Args:
+        texto (str): El texto (ya normalizado).
+
+    Returns:
+        set: Los trigramas del texto (vacío si tiene menos de 3 caracteres).
+    """
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
 
 #Validar que se ingrese un numero entero y positivo
 def validar_numero(mensaje):
@@ -141,72 +2499,118 @@ def validar_numero(mensaje):
     """
     while True:
         #Pedimos al usuario que ingrese un numero
-        numero_cadena = input(mensaje).strip()
+        try:
+            return convertir_numero(input(mensaje))
+        #Si no es valido, mostramos el error
+        except ValueError as error:
+            print(f"Error: {error}")
 
-        #Si el ingreso esta vacío, mostramos el error
-        if not numero_cadena:
-            print("Error: Ingreso vacío ")
-            continue
+#Convierte un texto en un numero entero y positivo
+def convertir_numero(numero_cadena):
+    """
+    Valida que un texto sea un número entero positivo y lo convierte.
+    Son las reglas de validar_numero, sin pedir nada al usuario
+    (la importación masiva las usa fila por fila).
 
-        #Vemos si el ingreso del usuario es un numero
-        if numero_cadena.isdigit():
-            numero_int = int(numero_cadena)
-            if numero_int < 0:
-                print("Error: El número debe ser positivo ")
-            else: 
-                return numero_int
-        #Si no es un numero, mostramos el error
-        else:
-            print("Error: Debe ingresar un número entero y positivo ")
+    Args:
+        numero_cadena (str): El texto a convertir.
+
+    Returns:
+        int: El número entero validado (positivo o cero).
+
+    Raises:
+        ValueError: Si el texto está vacío o no es un entero positivo.
+    """
+    numero_cadena = numero_cadena.strip()
+
+    #Si el ingreso esta vacío, es un error
+    if not numero_cadena:
+        raise ValueError("Ingreso vacío ")
+
+    #Vemos si el ingreso es un numero
+    if numero_cadena.isdigit():
+        numero_int = int(numero_cadena)
+        if numero_int < 0:
+            raise ValueError("El número debe ser positivo ")
+        #Las columnas guardan enteros de 64 bits
+        if numero_int > sys.maxsize:
+            raise ValueError(f"El número no puede ser mayor a {sys.maxsize} ")
+        return numero_int
+    #Si no es un numero, es un error
+    raise ValueError("Debe ingresar un número entero y positivo ")
 
 def validar_continente(mensaje, continentes_validos):
     """
-    Solicita un continente al usuario y valida que esté en el diccionario de
-    continentes, la validación ignora tildes y mayúsculas/minúsculas.
+    Solicita un continente al usuario y valida que esté en el diccionario de
+    continentes, la validación ignora tildes y mayúsculas/minúsculas.
+
+    Args:
+        mensaje (str): El texto (print) que ve el usuario.
+        continentes_validos (dict): El diccionario de continentes a validar.
+
+    Returns:
+        str: El nombre del continente validado y en formato correcto
+    """
+    # Inicio bucle
+    while True:
+        # Solicitud y validación del continente
+        try:
+            return convertir_continente(input(mensaje), continentes_validos)
+        except ValueError as error:
+            # Mensaje de error y se repite el bucle
+            print(f"Error: {error}")
+
+#Convierte un texto en un continente valido
+def convertir_continente(continente_ingresado, continentes_validos):
+    """
+    Valida que un texto sea un continente del diccionario (ignorando tildes
+    y mayúsculas/minúsculas) y devuelve su nombre con formato. Son las
+    reglas de validar_continente, sin pedir nada al usuario.
 
     Args:
-        mensaje (str): El texto (print) que ve el usuario.
+        continente_ingresado (str): El texto a validar.
         continentes_validos (dict): El diccionario de continentes a validar.
 
     Returns:
-        str: El nombre del continente validado y en formato correcto
+        str: El nombre del continente en formato correcto.
+
+    Raises:
+        ValueError: Si el texto está vacío o no es un continente válido.
     """
-    # Inicio bucle
-    while True:
-        # Solicitud y asignación de valor a variable
-        continente_ingresado = input(mensaje).strip()
-        # Validación ingreso vacio
-        if not continente_ingresado:
-            print("Error: Ingreso vacío.")
-            # Se repite el bucle
-            continue 
-            
-        # Llamado a función y asignación de valor a variable
-        continente_norm = normalizar_texto(continente_ingresado)
+    continente_ingresado = continente_ingresado.strip()
+    # Validación ingreso vacio
+    if not continente_ingresado:
+        raise ValueError("Ingreso vacío.")
 
-        # Validación de coincidencia de continente valido
-        if continente_norm in continentes_validos:
-            # Si se encuentra, devuelve el continente
-            return continentes_validos[continente_norm]
-        else:
-            # Sino se encuentra, mensaje de error
-            print("Error: Continente no válido. Intente nuevamente.")
+    # Validación de coincidencia de continente valido
+    continente = continentes_validos.get(normalizar_texto(continente_ingresado))
+    if continente is None:
+        raise ValueError("Continente no válido. Intente nuevamente.")
+    return continente
 
 # Función de validación
 def buscar_pais_lista(lista_paises, nombre_buscado):
     """
     Busca un país en la lista usando el nombre normalizado 
     (ignora mayúsculas/minúsculas y tildes).
+    Con una ListaPaises usa su índice de nombres; con una lista común
+    recorre la lista.
 
     Args:
         lista_paises (list): Lista de diccionarios (paises).
         nombre_buscado (str): El nombre del país a buscar.
 
     Returns:
-        dict: El diccionario del país si se encuentra, None si no.
+        dict: El diccionario (o RegistroPais) del país si se encuentra, None si no.
     """
     # Normalización del nombre buscado
     nombre_norm_buscado = normalizar_texto(nombre_buscado)
+
+    # Si la lista tiene índice de nombres, la búsqueda es directa (O(1))
+    indice_nombres = getattr(lista_paises, 'indice_nombres', None)
+    if indice_nombres is not None:
+        posicion = indice_nombres.get(nombre_norm_buscado)
+        return None if posicion is None else lista_paises[posicion]
     
     for pais in lista_paises:
         # Normalizacion de los nombres de la lista de paises
@@ -219,11 +2623,27 @@ def buscar_pais_lista(lista_paises, nombre_buscado):
     # Sino se encuentra se devuelve none
     return None
 
+#Espera que el usuario presione Enter
+def esperar_enter(mensaje="\nPresione Enter para continuar. "):
+    """
+    Pausa el menú hasta que el usuario presione Enter, salvo con
+    --no-pause (ver _pantalla), donde sigue sin esperar.
+
+    Args:
+        mensaje (str): El texto que se muestra.
+    """
+    if _pantalla["pausar"]:
+        input(mensaje)
+
 #Muestra una lista de paises
 def mostrar_lista_paises(lista):
     """
     Imprime en consola una lista de países en un formato de tabla.
     Si la lista está vacía, lo informa.
+    En una terminal muestra la tabla por páginas del alto de la pantalla
+    y solo formatea la página visible; si la salida va a un archivo o a
+    otro programa, o con --no-pause, escribe la tabla completa por bloques.
+    Con --no-pause tampoco espera que el usuario presione Enter.
 
     Args:
         lista (list): Una lista de diccionarios, donde cada diccionario
@@ -232,24 +2652,112 @@ def mostrar_lista_paises(lista):
     Returns:
         None: Esta función no retorna ningún valor, solo imprime en consola.
     """
+    pausar = _pantalla["pausar"]
+
     #Valida si la lista de resultados está vacía
     if not lista:
         print("\nNo se encontraron países que cumplan con el requisito\n")
-        input("\nPresione Enter para continuar. ")
+        if pausar:
+            input("\nPresione Enter para continuar. ")
         return
-    
-    #Mostrar por pantalla el encabezado (nombre,poblacion,superficie,continente)
-    print(f"\n{'NOMBRE':<20} | {'POBLACION':>12} | {'SUPERFICIE':>10} | {'CONTINENTE':<15}")
-    print("="*70)
 
-    #Mostrar por pantalla cada pais 
-    for pais in lista:
-        print(f"{pais['NOMBRE']:<20} | {pais['POBLACION']:>12} | {pais['SUPERFICIE']:>10} | {pais['CONTINENTE']:<15}")
-    print("="*70)
-    input("\nPresione Enter para continuar. ")
+    #Mostrar por pantalla la tabla, paginada si hay una persona mirando
+    if pausar and sys.stdout.isatty():
+        paginar_tabla(lista)
+        return
+
+    escribir_tabla(lista, sys.stdout)
+    if pausar:
+        input("\nPresione Enter para continuar. ")
+
+#Muestra una tabla de paises por paginas
+def paginar_tabla(lista):
+    """
+    Muestra la tabla de a una página por vez: Enter pasa a la siguiente,
+    'a' vuelve a la anterior y 'q' termina. Cada página se formatea recién
+    cuando se muestra y se escribe de una sola vez.
+
+    Args:
+        lista (list): Los países a mostrar.
+    """
+    filas_por_pagina = max(5, shutil.get_terminal_size().lines - 6)
+    paginas = (len(lista) + filas_por_pagina - 1) // filas_por_pagina
+    pagina = 0
+    while True:
+        inicio = pagina * filas_por_pagina
+        texto = [ENCABEZADO_TABLA] + lineas_tabla(lista, inicio, inicio + filas_por_pagina) + ["="*70]
+        sys.stdout.write("\n".join(texto) + "\n")
+
+        if paginas == 1:
+            input("\nPresione Enter para continuar. ")
+            return
+        opcion = input(f"\nPágina {pagina + 1}/{paginas} - Enter: siguiente, a: anterior, q: salir --> ").strip().lower()
+        if opcion == "q" or (not opcion and pagina == paginas - 1):
+            return
+        if opcion == "a":
+            pagina = max(0, pagina - 1)
+        elif not opcion:
+            pagina += 1
+
+# Encabezado de las tablas de paises (nombre,poblacion,superficie,continente)
+ENCABEZADO_TABLA = f"\n{'NOMBRE':<20} | {'POBLACION':>12} | {'SUPERFICIE':>10} | {'CONTINENTE':<15}\n" + "="*70
+
+#Formatea las filas de una tabla de paises
+def lineas_tabla(lista, inicio=0, fin=None):
+    """
+    Formatea solo las filas de la tabla entre inicio y fin. Los países que
+    son vistas de una ListaPaises se leen directo de sus columnas.
+
+    Args:
+        lista (list): Los países.
+        inicio (int): Primera fila a formatear.
+        fin (int): Fila siguiente a la última (None: hasta el final).
+
+    Returns:
+        list: Una línea de texto por país.
+    """
+    lineas = []
+    for pais in lista[inicio:fin]:
+        if type(pais) is RegistroPais:
+            paises, posicion = pais.lista, pais.posicion
+            lineas.append(f"{paises.nombre(posicion):<20} | {paises.poblaciones[posicion]:>12} | {paises.superficies[posicion]:>10} | {paises.continente(posicion):<15}")
+        else:
+            lineas.append(f"{pais['NOMBRE']:<20} | {pais['POBLACION']:>12} | {pais['SUPERFICIE']:>10} | {pais['CONTINENTE']:<15}")
+    return lineas
+
+#Escribe una tabla de paises completa
+def escribir_tabla(lista, salida):
+    """
+    Escribe la tabla completa armándola por bloques de FILAS_POR_BLOQUE
+    filas: una sola escritura por bloque en lugar de un print por país, y
+    sin tener toda la tabla en memoria a la vez.
+
+    Args:
+        lista (list): Los países a mostrar.
+        salida (file): Donde se escribe la tabla (ej: sys.stdout).
+    """
+    salida.write(ENCABEZADO_TABLA + "\n")
+    for inicio in range(0, len(lista), FILAS_POR_BLOQUE):
+        salida.write("\n".join(lineas_tabla(lista, inicio, inicio + FILAS_POR_BLOQUE)) + "\n")
+    salida.write("="*70 + "\n")
+    salida.flush()
+
+#Arma la tabla de una lista de paises
+def formatear_tabla(lista):
+    """
+    Arma el texto de la tabla completa (encabezado, una línea por país y
+    cierre), el mismo que escribe escribir_tabla.
+
+    Args:
+        lista (list): Los países a mostrar.
+
+    Returns:
+        str: La tabla completa.
+    """
+    return "\n".join([ENCABEZADO_TABLA] + lineas_tabla(lista) + ["="*70])
 
 # Función de menú
-def agregar_pais(lista_paises, nombre_archivo, continentes_validos):
+def agregar_pais(lista_paises, almacenamiento, continentes_validos):
     """
     Agrega un país con su nombre, población, superficie y continente.
     Valida que el nombre no esté vacío y que no sea un duplicado
@@ -258,7 +2766,7 @@ def agregar_pais(lista_paises, nombre_archivo, continentes_validos):
 
     Args:
         lista_paises (list): La lista actual de países.
-        nombre_archivo (str): Archivo CSV para guardar los cambios.
+        almacenamiento (Almacenamiento): Donde se guardan los cambios.
         continentes_validos (dict): El diccionario de continentes.
     """
     # Mensaje inicial
@@ -297,24 +2805,26 @@ def agregar_pais(lista_paises, nombre_archivo, continentes_validos):
         "CONTINENTE": continente 
     }
     
-    # Se agrega el diccionario al array lista_paises
+    # Se agrega el diccionario al array lista_paises (y a sus índices)
     lista_paises.append(nuevo_pais_dic)
     
     # Llamado de función
-    guardar_datos_csv(lista_paises, nombre_archivo)
+    almacenamiento.guardar_cambio(lista_paises, "ALTA", nuevo_pais_dic)
     
-    # Mensaje final
+    # Mensaje final (el almacenamiento no imprime: también lo usan el servicio y la importación)
+    print("========================================")
+    print(f"Datos actualizados en {almacenamiento.nombre_archivo}.")
     print(f"¡El país '{nombre_pais}' ha sido agregado exitosamente!")
 
 # Función de menú
-def actualizar_datos_pais(lista_paises, nombre_archivo):
+def actualizar_datos_pais(lista_paises, almacenamiento):
     """
     Actualiza la población y la superficie de un país existente.
     Busca al país por nombre (ignora mayúsculas/minúsculas y tildes).
 
     Args:
         lista_paises (list): La lista actual de países.
-        nombre_archivo (str): Archivo CSV para guardar los cambios.
+        almacenamiento (Almacenamiento): Donde se guardan los cambios.
     """
     # Mensaje inicial
     print("\n--- Actualizar los datos de poblacion y superficie de un país ---\n")
@@ -345,156 +2855,672 @@ def actualizar_datos_pais(lista_paises, nombre_archivo):
         nueva_superficie = validar_numero(f"Nueva superficie para '{pais_encontrado['NOMBRE']}': ")
         
         # Actualiza los datos del diccionario de "pais_encontrado" que esta dentro de "lista_paises"
-        pais_encontrado['POBLACION'] = nueva_poblacion
-        pais_encontrado['SUPERFICIE'] = nueva_superficie
+        modificar_pais(lista_paises, pais_encontrado, nueva_poblacion, nueva_superficie)
         
         # Llamado de función
-        guardar_datos_csv(lista_paises, nombre_archivo)
+        almacenamiento.guardar_cambio(lista_paises, "MODIFICACION", pais_encontrado)
+
+        # Mensaje final
+        print("========================================")
+        print(f"Datos actualizados en {almacenamiento.nombre_archivo}.")
+
+    else:
+        # Mensaje de error
+        print(f"Error: El país '{nombre_pais_buscado}' no se encontró en la lista.")
+
+# Función de modificación
+def modificar_pais(lista_paises, pais, poblacion, superficie):
+    """
+    Cambia la población y la superficie de un país de la lista e
+    invalida las cachés que dependen de esos valores.
+
+    Args:
+        lista_paises (list): La lista que contiene al país.
+        pais (dict): El diccionario del país a modificar.
+        poblacion (int): La nueva población.
+        superficie (int): La nueva superficie.
+    """
+    # En una ListaPaises el cambio (y el mantenimiento de índices) lo hace la lista
+    if isinstance(pais, RegistroPais):
+        pais.lista.actualizar(pais.posicion, poblacion, superficie)
+        return
+
+    pais['POBLACION'] = poblacion
+    pais['SUPERFICIE'] = superficie
+
+    # Los resultados guardados ya no son válidos
+    invalidar_cache_consultas(lista_paises)
+
+# Función de menú
+def buscar_pais(lista_paises):
+    """
+    Busca países por nombre (coincidencia parcial o exacta).
+    La búsqueda ignora mayúsculas/minúsculas y tildes.
+    Muestra los resultados en una tabla.
+
+    Args:
+        lista_paises (list): La lista de países.
+    """
+    # Mensaje inicial
+    print("\n--- Buscar un país por nombre (coincidencia parcial o exacta) ---\n")
+
+    # Inicio condicional - Llamado a función
+    if lista_vacia(lista_paises):
+    # Si la lista esta vacia, se sale de la función
+        return 
+
+    # Llamado de función y asignación de valor a variable
+    termino_buscado = validar_string("Ingrese el nombre (o parte del nombre) del país a buscar: ")
+
+    # Llamado de funcion y mensaje final con resultados
+    mostrar_lista_paises(buscar_por_nombre(lista_paises, termino_buscado))
+
+#Busca paises cuyo nombre contenga un texto
+def buscar_por_nombre(lista_paises, termino_buscado):
+    """
+    Devuelve los países cuyo nombre contiene el término buscado
+    (ignora mayúsculas/minúsculas y tildes), en el orden de la lista.
+    Con una ListaPaises usa el índice de trigramas: solo verifica los
+    países de la lista de posiciones más corta entre los trigramas del
+    término (y guarda las posiciones en la caché de consultas de la lista).
+    Con una lista común recorre toda la lista.
+
+    Args:
+        lista_paises (list): La lista de países.
+        termino_buscado (str): El nombre (o parte del nombre) a buscar.
+
+    Returns:
+        list: Los países encontrados.
+    """
+    # Llamado de función y asignación de valor a variable
+    termino_norm_buscado = normalizar_texto(termino_buscado)
+
+    # Una búsqueda repetida sale de la caché de consultas de la lista
+    cache = getattr(lista_paises, 'cache_consultas', None)
+    clave_cache = ("nombre", termino_norm_buscado)
+    posiciones = cache.obtener(clave_cache) if cache is not None else None
+    if posiciones is not None:
+        return [lista_paises[i] for i in posiciones]
+
+    indice_trigramas = getattr(lista_paises, 'indice_trigramas', None)
+
+    # Sin índice: recorrido completo normalizando cada nombre
+    if indice_trigramas is None:
+        return [pais for pais in lista_paises if termino_norm_buscado in normalizar_texto(pais["NOMBRE"])]
+
+    nombres_normalizados = lista_paises.nombres_normalizados
+    trigramas_buscados = trigramas(termino_norm_buscado)
+
+    if trigramas_buscados:
+        # Si falta algún trigrama no hay coincidencias posibles
+        candidatos = min((indice_trigramas.get(t, []) for t in trigramas_buscados), key=len)
+    else:
+        # Términos de menos de 3 letras: se revisan todos los nombres ya normalizados
+        candidatos = range(len(nombres_normalizados))
+
+    # Inicio bucle - Se verifica cada candidato
+    posiciones = [i for i in candidatos if termino_norm_buscado in nombres_normalizados[i]]
+    if cache is not None:
+        cache.guardar(clave_cache, posiciones)
+    return [lista_paises[i] for i in posiciones]
+
+#Filtra los paises cargados por continente
+def filtro_continente(lista, continentes_validos):
+    """
+    Filtra la lista de países por un continente ingresado por el usuario.
+    La búsqueda ignora mayúsculas, minúsculas Y tildes.
+    Usa 'validar_continente(mensaje)' para asegurar una entrada válida.
+
+    Args:
+        lista (list): La lista completa de países.
+        continentes_validos (dict): El diccionario de continentes.
+
+    Returns:
+        list: Una nueva lista (encontrados) que contiene solo los países que coinciden con el continente ingresado.
+    """
+    #Pide un continente y devuelve una lista filtrada
+    print("\n--- Filtrar por continente ---\n")
+    
+    # Llamado a función y asignación de valor a variable
+    continente_ingresado = validar_continente("Ingrese el continente: ", continentes_validos)
+
+    return [lista[i] for i in filtrar_posiciones(lista, continente=continente_ingresado)]
+
+#Recorre los paises de un continente
+def paises_de_continente(paises, continente):
+    """
+    Devuelve, de a uno, los países de un continente (ignora mayúsculas y tildes).
+    Acepta cualquier iterable, por ejemplo la lectura de leer_paises_csv.
+
+    Args:
+        paises (iterable): Los países a filtrar.
+        continente (str): El continente buscado.
+
+    Yields:
+        dict: Cada país que pertenece al continente.
+    """
+    # Normalizamos la entrada del usuario (ej: "América" -> "america")
+    continente_normalizado = normalizar_texto(continente)
+
+    # Hay pocos continentes distintos: cada uno se normaliza una sola vez
+    coincide = {}
+
+    for pais in paises:
+        valor = pais['CONTINENTE']
+        if valor not in coincide:
+            # Normalizamos el dato del CSV (ej: "América" -> "america") y comparamos
+            coincide[valor] = normalizar_texto(valor) == continente_normalizado
+
+        if coincide[valor]:
+            yield pais
+
+#Recorre los paises con un valor dentro de un rango
+def paises_en_rango(paises, clave, minimo, maximo):
+    """
+    Devuelve, de a uno, los países cuyo valor en 'clave' está entre
+    minimo y maximo (inclusivo). Acepta cualquier iterable.
+
+    Args:
+        paises (iterable): Los países a filtrar.
+        clave (str): 'POBLACION' o 'SUPERFICIE'.
+        minimo (int): Valor mínimo del rango.
+        maximo (int): Valor máximo del rango.
+
+    Yields:
+        dict: Cada país dentro del rango.
+    """
+    for pais in paises:
+        if minimo <= pais[clave] <= maximo:
+            yield pais
+
+#Filtra por rango de poblacion 
+def filtro_poblacion(lista):
+    """
+    Filtra la lista de países por un rango de población (mínimo y máximo)
+    ingresado por el usuario.
+
+    Args:
+        lista (list): La lista completa de países.
+
+    Returns:
+        list: Una nueva lista (encontrados) que contiene solo los países
+                cuya población está dentro del rango especificado.
+                Devuelve una lista vacía si el mínimo es mayor al máximo.
+    """
+    #Pide un rango de poblacion
+    print("\n--- Filtrar por población ---\n")
+    minimo = validar_numero("Ingrese la población mínima: ")
+    maximo = validar_numero("Ingrese la población máxima: ")
+
+    #Si el numero minimo es mayor al maximo. mostramos el error
+    if minimo > maximo:
+        print("Error: La población mínima no puede ser mayor a la máxima! ")
+        return []
+    
+    #Creamos una lista con los paises que cumplen la condicion 
+    return [lista[i] for i in filtrar_posiciones(lista, poblacion=(minimo, maximo))]
+
+#Filtra por rango de superficie
+def filtro_superficie(lista):
+    """
+    Filtra la lista de países por un rango de superficie (mínimo y máximo)
+    ingresado por el usuario.
+
+    Args:
+        lista (list): La lista completa de países a filtrar.
+
+    Returns:
+        list: Una nueva lista (encontrados) que contiene solo los países
+                cuya superficie está dentro del rango especificado (inclusivo).
+                Devuelve una lista vacía si el mínimo es mayor al máximo.
+    """
+    #Pide un rango de superficie
+    print("\n--- Filtrar por superficie ---\n")
+    minimo = validar_numero("Ingrese la superficie mínima: ")
+    maximo = validar_numero("Ingrese la superficie máxima: ")
+
+    #Si el numero minimo es mayor al maximo, mostramos el error
+    if minimo > maximo:
+        print("Error: La superficie mínima no puede ser mayor a la máxima! ")
+        return []
+    
+    #Creamos una lista con los paises que cumplen la condicion 
+    return [lista[i] for i in filtrar_posiciones(lista, superficie=(minimo, maximo))]
+
+#Filtra por varios criterios a la vez
+def filtro_combinado(lista, continentes_validos):
+    """
+    Pide parte del nombre, un continente y los rangos de población y
+    superficie, y devuelve los países que cumplen todos a la vez. Los
+    criterios que se dejan vacíos no se aplican (un rango sin máximo no
+    tiene tope).
+
+    Args:
+        lista (list): La lista completa de países.
+        continentes_validos (dict): El diccionario de continentes.
+
+    Returns:
+        list: Los países que cumplen todos los criterios.
+              Devuelve una lista vacía si algún mínimo es mayor a su máximo.
+    """
+    print("\n--- Filtro combinado (deje vacío lo que no quiera filtrar) ---\n")
+    termino = input("Nombre o parte del nombre: ").strip() or None
+    continente = pedir_opcional("Continente: ", lambda texto: convertir_continente(texto, continentes_validos))
+
+    #Pide los dos rangos
+    rangos = []
+    for nombre in ("población", "superficie"):
+        minimo = pedir_opcional(f"{nombre.capitalize()} mínima: ", convertir_numero)
+        maximo = pedir_opcional(f"{nombre.capitalize()} máxima: ", convertir_numero)
+        if minimo is None and maximo is None:
+            rangos.append(None)
+            continue
+        minimo = minimo or 0
+        maximo = sys.maxsize if maximo is None else maximo
+        #Si el numero minimo es mayor al maximo, mostramos el error
+        if minimo > maximo:
+            print(f"Error: La {nombre} mínima no puede ser mayor a la máxima! ")
+            return []
+        rangos.append((minimo, maximo))
+
+    #Creamos una lista con los paises que cumplen todos los criterios (sin criterios, la lista completa)
+    return [lista[i] for i in filtrar_posiciones(lista, continente, *rangos, termino=termino)]
+
+#Pide un dato que se puede dejar vacio
+def pedir_opcional(mensaje, convertir):
+    """
+    Solicita un dato al usuario que se puede dejar vacío. El bucle se
+    repite mientras el dato no sea válido.
+
+    Args:
+        mensaje (str): El texto (print) que ve el usuario.
+        convertir (function): Valida y convierte el texto (lanza ValueError si no es válido).
+
+    Returns:
+        El dato convertido, o None si se dejó vacío.
+    """
+    while True:
+        texto = input(mensaje).strip()
+        if not texto:
+            return None
+        try:
+            return convertir(texto)
+        #Si no es valido, mostramos el error
+        except ValueError as error:
+            print(f"Error: {error}")
+
+#Filtra por varios criterios a la vez, con la cache de consultas
+def filtrar_posiciones(lista_paises, continente=None, poblacion=None, superficie=None, termino=None):
+    """
+    Igual que calcular_posiciones_filtro, pero en una ListaPaises una
+    consulta repetida sale de su caché de consultas (con el texto
+    normalizado: 'ASIA' y 'asia' son la misma consulta). Una consulta solo
+    por nombre comparte el resultado con buscar_por_nombre.
+
+    Args:
+        lista_paises (list): La lista de países (ListaPaises o lista común).
+        continente (str): Continente buscado (ignora mayúsculas y tildes).
+        poblacion (tuple): (mínimo, máximo) de población, inclusivo.
+        superficie (tuple): (mínimo, máximo) de superficie, inclusivo.
+        termino (str): Parte del nombre (ignora mayúsculas y tildes).
+
+    Returns:
+        array: Las posiciones (en orden de la lista) de los países que
+               cumplen todos los criterios. No se debe modificar.
+    """
+    cache = getattr(lista_paises, 'cache_consultas', None)
+    if cache is None:
+        return calcular_posiciones_filtro(lista_paises, continente, poblacion, superficie, termino)
+
+    filtro = (None if continente is None else normalizar_texto(continente),
+              None if poblacion is None else tuple(poblacion), None if superficie is None else tuple(superficie))
+    if termino is None:
+        clave_cache = ("filtro",) + filtro
+    elif filtro == (None, None, None):
+        clave_cache = ("nombre", normalizar_texto(termino))
+    else:
+        clave_cache = ("consulta", normalizar_texto(termino)) + filtro
+    posiciones = cache.obtener(clave_cache)
+    if posiciones is None:
+        posiciones = calcular_posiciones_filtro(lista_paises, continente, poblacion, superficie, termino)
+        cache.guardar(clave_cache, posiciones)
+    return posiciones
+
+#Filtra por varios criterios a la vez sobre las columnas
+def calcular_posiciones_filtro(lista_paises, continente=None, poblacion=None, superficie=None, termino=None):
+    """
+    Filtra la lista combinando (con Y) los criterios indicados, trabajando
+    sobre las columnas en lugar de sobre los países: planificar_consulta
+    elige por qué criterio empezar y ejecutar_plan verifica los demás solo
+    sobre las posiciones que sobrevivieron. Los criterios en None no se
+    aplican.
+
+    Args:
+        lista_paises (list): La lista de países (ListaPaises o lista común).
+        continente (str): Continente buscado (ignora mayúsculas y tildes).
+        poblacion (tuple): (mínimo, máximo) de población, inclusivo.
+        superficie (tuple): (mínimo, máximo) de superficie, inclusivo.
+        termino (str): Parte del nombre (ignora mayúsculas y tildes).
+
+    Returns:
+        array: Las posiciones (en orden de la lista) de los países que
+               cumplen todos los criterios.
+    """
+    posiciones = ejecutar_plan(lista_paises, planificar_consulta(lista_paises, termino, continente, poblacion, superficie))
+    # El ejecutor paralelo ya devuelve un array
+    return posiciones if isinstance(posiciones, array) else array('q', posiciones)
+
+#Arma el plan de una consulta compuesta
+def planificar_consulta(lista_paises, termino=None, continente=None, poblacion=None, superficie=None):
+    """
+    Decide en qué orden se evalúan los criterios de una consulta (se
+    combinan con Y). Primero estima cuántos países cumple cada uno sin
+    recorrer la lista: el nombre con la lista de posiciones más corta entre
+    sus trigramas (si el índice ya está armado o el nombre es el único
+    criterio), los rangos con dos búsquedas binarias en el índice ordenado
+    (si ya está armado: armarlo cuesta O(n log n), más que recorrer la
+    columna, así que sin él el rango se recorre) y el continente con los
+    contadores por continente.
+
+    El primer paso es el criterio más selectivo que tiene índice, salvo que
+    deje más de 1/FACTOR_RECORRIDO de la lista (o que ninguno tenga índice):
+    ahí se recorre la columna más selectiva. Los demás se verifican solo
+    sobre los países que sobrevivieron, de más a menos selectivo. Si la
+    lista tiene un ejecutor paralelo y hay que recorrer una columna, los
+    filtros se evalúan juntos en los procesos del ejecutor.
+
+    Args:
+        lista_paises (list): La lista de países (ListaPaises o lista común).
+        termino (str): Parte del nombre (ignora mayúsculas y tildes).
+        continente (str): Continente buscado (ignora mayúsculas y tildes).
+        poblacion (tuple): (mínimo, máximo) de población, inclusivo.
+        superficie (tuple): (mínimo, máximo) de superficie, inclusivo.
+
+    Returns:
+        list: Los pasos, en el orden en que se ejecutan (vacía sin criterios).
+              Cada uno es un dict con 'clave', 'valor' (el término o el
+              continente normalizados, o (mínimo, máximo)), 'estrategia'
+              ('indice_trigramas', 'indice_ordenado', 'recorrido',
+              'recorrido_paralelo' o 'verificacion') y 'estimado' (países
+              que se espera que cumplan el criterio).
+    """
+    cantidad = len(lista_paises)
+    columnar = isinstance(lista_paises, ListaPaises)
+    pasos = []
+
+    if termino is not None:
+        termino_norm = normalizar_texto(termino)
+        trigramas_buscados = trigramas(termino_norm) if columnar else ()
+        # Armar el índice de trigramas recorre todos los nombres: con otros criterios, el nombre se verifica al final
+        solo_nombre = continente is None and poblacion is None and superficie is None
+        if trigramas_buscados and (solo_nombre or lista_paises._indice_trigramas is not None):
+            # Como mucho, los países que tienen el trigrama menos frecuente
+            indice_trigramas = lista_paises.indice_trigramas
+            estimado = min(len(indice_trigramas.get(t, ())) for t in trigramas_buscados)
+            pasos.append({"clave": "NOMBRE", "valor": termino_norm, "estrategia": "indice_trigramas", "estimado": estimado})
+        else:
+            pasos.append({"clave": "NOMBRE", "valor": termino_norm, "estrategia": "recorrido", "estimado": cantidad})
+
+    if continente is not None:
+        estimado = cantidad
+        if columnar:
+            _, codigos = valores_de_continente(lista_paises, continente)
+            estimado = sum(lista_paises.cantidades_continente[codigo] for codigo in codigos)
+        pasos.append({"clave": "CONTINENTE", "valor": normalizar_texto(continente), "estrategia": "recorrido", "estimado": estimado})
+
+    for clave, rango in (("POBLACION", poblacion), ("SUPERFICIE", superficie)):
+        if rango is None:
+            continue
+        minimo, maximo = rango
+        # Igual que con los trigramas: el índice ordenado no se arma solo para estimar
+        if columnar and clave in lista_paises.indices_ordenados:
+            inicio, fin = limites_en_rango(lista_paises, clave, minimo, maximo)
+            pasos.append({"clave": clave, "valor": (minimo, maximo), "estrategia": "indice_ordenado", "estimado": fin - inicio})
+        else:
+            pasos.append({"clave": clave, "valor": (minimo, maximo), "estrategia": "recorrido", "estimado": cantidad})
+
+    if not pasos:
+        return pasos
+
+    # Se empieza por el índice más selectivo
+    con_indice = [paso for paso in pasos if paso["estrategia"] != "recorrido"]
+    primero = min(con_indice, key=lambda paso: paso["estimado"]) if con_indice else None
+
+    # Sin índices, o si el índice deja gran parte de la lista, conviene recorrer la columna más selectiva
+    if primero is None or primero["estimado"] * FACTOR_RECORRIDO > cantidad:
+        primero = min(pasos, key=lambda paso: paso["estimado"])
+        primero["estrategia"] = "recorrido"
+
+    # Con un ejecutor paralelo, los recorridos se reparten entre sus procesos
+    ejecutor = getattr(lista_paises, 'ejecutor', None)
+    if ejecutor is not None and termino is None and primero["estrategia"] == "recorrido":
+        for paso in pasos:
+            paso["estrategia"] = "recorrido_paralelo"
+        return pasos
+
+    resto = sorted((paso for paso in pasos if paso is not primero), key=lambda paso: paso["estimado"])
+    for paso in resto:
+        paso["estrategia"] = "verificacion"
+    return [primero] + resto
+
+#Ejecuta el plan de una consulta compuesta
+def ejecutar_plan(lista_paises, plan):
+    """
+    Ejecuta los pasos de planificar_consulta: el primero obtiene las
+    posiciones candidatas (con su índice o recorriendo su columna) y cada
+    uno de los siguientes descarta las que no cumplen su criterio. Anota
+    en cada paso cuántos países quedaron ('filas').
+
+    Args:
+        lista_paises (list): La lista de países.
+        plan (list): Los pasos de planificar_consulta.
+
+    Returns:
+        list | array: Las posiciones (en orden de la lista) que cumplen todos los criterios.
+    """
+    cantidad = len(lista_paises)
+    if not plan:
+        return list(range(cantidad))
+
+    # Los filtros se evalúan juntos en los procesos del ejecutor
+    if plan[0]["estrategia"] == "recorrido_paralelo":
+        criterios = {"continente": None, "poblacion": None, "superficie": None}
+        for paso in plan:
+            criterios[paso["clave"].lower()] = paso["valor"]
+            paso["filas"] = None
+        posiciones = lista_paises.ejecutor.filtrar(**criterios)
+        plan[-1]["filas"] = len(posiciones)
+        return posiciones
 
+    #Criterio de aplicar_criterios para un paso sobre una columna
+    def criterio(paso):
+        if paso["clave"] == "CONTINENTE":
+            return valores_de_continente(lista_paises, paso["valor"])
+        return (obtener_columna(lista_paises, paso["clave"]), *paso["valor"])
+
+    primero, *resto = plan
+    if primero["estrategia"] == "indice_trigramas":
+        indice_trigramas = lista_paises.indice_trigramas
+        candidatos = min((indice_trigramas.get(t, ()) for t in trigramas(primero["valor"])), key=len)
+        posiciones = posiciones_con_nombre(lista_paises, primero["valor"], candidatos)
+    elif primero["estrategia"] == "indice_ordenado":
+        # Se vuelve al orden de la lista
+        posiciones = sorted(posiciones_en_rango(lista_paises, primero["clave"], *primero["valor"]))
+    elif primero["clave"] == "NOMBRE":
+        posiciones = posiciones_con_nombre(lista_paises, primero["valor"], range(cantidad))
     else:
-        # Mensaje de error
-        print(f"Error: El país '{nombre_pais_buscado}' no se encontró en la lista.")
+        posiciones = aplicar_criterios([criterio(primero)], 0, cantidad)
+    primero["filas"] = len(posiciones)
 
-# Función de menú
-def buscar_pais(lista_paises):
+    # Resto de los criterios: solo sobre los sobrevivientes
+    for paso in resto:
+        if paso["clave"] == "NOMBRE":
+            posiciones = posiciones_con_nombre(lista_paises, paso["valor"], posiciones)
+        else:
+            posiciones = aplicar_criterios([criterio(paso)], 0, cantidad, posiciones)
+        paso["filas"] = len(posiciones)
+
+    return posiciones
+
+#Obtiene las posiciones cuyo nombre contiene un texto
+def posiciones_con_nombre(lista_paises, termino_norm, posiciones):
     """
-    Busca países por nombre (coincidencia parcial o exacta).
-    La búsqueda ignora mayúsculas/minúsculas y tildes.
-    Muestra los resultados en una tabla.
+    Devuelve las posiciones cuyo nombre normalizado contiene el término.
+    En una ListaPaises compara contra los nombres ya normalizados; si la
+    lista todavía no los tiene y son pocas posiciones, normaliza solo esas.
 
     Args:
         lista_paises (list): La lista de países.
+        termino_norm (str): El término ya normalizado.
+        posiciones (iterable): Las posiciones a revisar, en orden.
+
+    Returns:
+        list: Las posiciones, en orden, cuyo nombre contiene el término.
     """
-    # Mensaje inicial
-    print("\n--- Buscar un país por nombre (coincidencia parcial o exacta) ---\n")
+    if not isinstance(lista_paises, ListaPaises):
+        return [i for i in posiciones if termino_norm in normalizar_texto(lista_paises[i]["NOMBRE"])]
+    if lista_paises._nombres_normalizados is None and len(posiciones) * FACTOR_RECORRIDO < len(lista_paises):
+        return [i for i in posiciones if termino_norm in normalizar_texto(lista_paises.nombre(i))]
+    nombres_normalizados = lista_paises.nombres_normalizados
+    return [i for i in posiciones if termino_norm in nombres_normalizados[i]]
 
-    # Inicio condicional - Llamado a función
-    if lista_vacia(lista_paises):
-    # Si la lista esta vacia, se sale de la función
-        return 
+#Aplica los criterios de filtro sobre las columnas
+def aplicar_criterios(criterios, inicio, fin, posiciones=None):
+    """
+    Devuelve las posiciones entre inicio y fin que cumplen todos los
+    criterios. Si no se pasan posiciones, el primer criterio recorre su
+    columna completa (entre inicio y fin) una sola vez; los demás se
+    evalúan solo sobre las posiciones que sobrevivieron.
 
-    # Llamado de función y asignación de valor a variable
-    termino_buscado = validar_string("Ingrese el nombre (o parte del nombre) del país a buscar: ")
+    Args:
+        criterios (list): Cada uno es (columna, conjunto de valores válidos)
+                          o (columna, mínimo, máximo).
+        inicio (int): Primera posición a considerar.
+        fin (int): Posición siguiente a la última.
+        posiciones (list): Posiciones ya filtradas (en orden) de donde partir, o None.
 
-    # Llamado de función y asignación de valor a variable
-    termino_norm_buscado = normalizar_texto(termino_buscado)
-    
-    # Inicializacion de lista
-    encontrados = []
-    
-    # Inicio bucle
-    for pais in lista_paises:
-        # Normalizacion de los nombres de la lista de paises
-        nombre_norm_lista = normalizar_texto(pais["NOMBRE"])
-    
-        if termino_norm_buscado in nombre_norm_lista:
-            # Si los caracteres ingresados estan dentro de un nombre de la lista de paises, se agrega a la lista "encontrados"
-            encontrados.append(pais)
-            
-    # Llamado de funcion y mensaje final con resultados
-    mostrar_lista_paises(encontrados)
+    Returns:
+        list: Las posiciones, en orden, que cumplen los criterios.
+    """
+    if posiciones is None:
+        if not criterios:
+            return list(range(inicio, fin))
 
-#Filtra los paises cargados por continente
-def filtro_continente(lista, continentes_validos):
+        # Primer criterio: recorrido completo de una sola columna
+        primero, *criterios = criterios
+        columna = primero[0]
+        if inicio or fin != len(columna):
+            columna = columna[inicio:fin]
+        if len(primero) == 2:
+            validos = primero[1]
+            posiciones = [i for i, valor in enumerate(columna, inicio) if valor in validos]
+        else:
+            _, minimo, maximo = primero
+            posiciones = [i for i, valor in enumerate(columna, inicio) if minimo <= valor <= maximo]
+
+    # Resto de los criterios: solo sobre los sobrevivientes
+    for criterio in criterios:
+        if len(criterio) == 2:
+            columna, validos = criterio
+            posiciones = [i for i in posiciones if columna[i] in validos]
+        else:
+            columna, minimo, maximo = criterio
+            posiciones = [i for i in posiciones if minimo <= columna[i] <= maximo]
+
+    return posiciones
+
+#Obtiene las posiciones con un valor dentro de un rango usando el indice ordenado
+def posiciones_en_rango(lista_paises, clave, minimo, maximo):
     """
-    Filtra la lista de países por un continente ingresado por el usuario.
-    La búsqueda ignora mayúsculas, minúsculas Y tildes.
-    Usa 'validar_continente(mensaje)' para asegurar una entrada válida.
+    Devuelve las posiciones de los países cuyo valor en 'clave' está entre
+    minimo y maximo (inclusivo), con dos búsquedas binarias sobre el índice
+    ordenado de la ListaPaises: O(log n + k).
 
     Args:
-        lista (list): La lista completa de países.
-        continentes_validos (dict): El diccionario de continentes.
+        lista_paises (ListaPaises): La lista de países.
+        clave (str): 'POBLACION' o 'SUPERFICIE'.
+        minimo (int): Valor mínimo del rango.
+        maximo (int): Valor máximo del rango.
 
     Returns:
-        list: Una nueva lista (encontrados) que contiene solo los países que coinciden con el continente ingresado.
+        array: Las posiciones encontradas, ordenadas por el valor de la clave.
     """
-    #Pide un continente y devuelve una lista filtrada
-    print("\n--- Filtrar por continente ---\n")
-    
-    # Llamado a función y asignación de valor a variable
-    continente_ingresado = validar_continente("Ingrese el continente: ", continentes_validos)
+    inicio, fin = limites_en_rango(lista_paises, clave, minimo, maximo)
+    return lista_paises.indice_ordenado(clave)[inicio:fin]
 
-    # Normalizamos la entrada del usuario (ej: "América" -> "america")
-    continente_normalizado = normalizar_texto(continente_ingresado)
+#Obtiene los limites de un rango dentro del indice ordenado
+def limites_en_rango(lista_paises, clave, minimo, maximo):
+    """
+    Devuelve dónde empieza y dónde termina un rango de valores dentro del
+    índice ordenado de una clave (dos búsquedas binarias, O(log n)): la
+    cantidad de países del rango es fin - inicio.
 
-    encontrados = []
-    for pais in lista:
-        # Normalizamos el dato del CSV (ej: "América" -> "america")
-        pais_continente_normalizado = normalizar_texto(pais['CONTINENTE'])
+    Args:
+        lista_paises (ListaPaises): La lista de países.
+        clave (str): 'POBLACION' o 'SUPERFICIE'.
+        minimo (int): Valor mínimo del rango.
+        maximo (int): Valor máximo del rango.
 
-        # Comparamos los dos textos normalizados
-        if pais_continente_normalizado == continente_normalizado:
-            encontrados.append(pais)
-            
-    return encontrados
+    Returns:
+        tuple: (inicio, fin) en el índice ordenado.
+    """
+    indice = lista_paises.indice_ordenado(clave)
+    columna = lista_paises.columna(clave)
 
-#Filtra por rango de poblacion 
-def filtro_poblacion(lista):
+    inicio = bisect_left(indice, minimo, key=columna.__getitem__)
+    fin = bisect_right(indice, maximo, key=columna.__getitem__)
+
+    # Si el mínimo es mayor al máximo no hay resultados
+    return inicio, max(inicio, fin)
+
+#Obtiene los valores de la columna continente que coinciden
+def valores_de_continente(lista_paises, continente):
     """
-    Filtra la lista de países por un rango de población (mínimo y máximo)
-    ingresado por el usuario.
+    Devuelve la columna de continentes y el conjunto de sus valores que
+    corresponden al continente buscado. Solo normaliza los valores distintos
+    (en una ListaPaises la columna son códigos y se compara contra la tabla
+    de continentes ya normalizados).
 
     Args:
-        lista (list): La lista completa de países.
+        lista_paises (list): La lista de países.
+        continente (str): El continente buscado.
 
     Returns:
-        list: Una nueva lista (encontrados) que contiene solo los países
-                cuya población está dentro del rango especificado.
-                Devuelve una lista vacía si el mínimo es mayor al máximo.
+        tuple: (columna, conjunto de valores válidos)
     """
-    #Pide un rango de poblacion
-    print("\n--- Filtrar por población ---\n")
-    minimo = validar_numero("Ingrese la población mínima: ")
-    maximo = validar_numero("Ingrese la población máxima: ")
+    continente_normalizado = normalizar_texto(continente)
 
-    #Si el numero minimo es mayor al maximo. mostramos el error
-    if minimo > maximo:
-        print("Error: La población mínima no puede ser mayor a la máxima! ")
-        return []
-    
-    #Creamos una lista vacia para ir agregando los paises que cumplen la condicion 
-    encontrados = []
-    for pais in lista:
-        if minimo <= pais['POBLACION'] <= maximo:
-            encontrados.append(pais)
-    return encontrados
+    if isinstance(lista_paises, ListaPaises):
+        codigos = {codigo for codigo, normalizado in enumerate(lista_paises.continentes_normalizados)
+                   if normalizado == continente_normalizado}
+        return lista_paises.codigos_continente, codigos
 
-#Filtra por rango de superficie
-def filtro_superficie(lista):
+    columna = obtener_columna(lista_paises, "CONTINENTE")
+    return columna, {valor for valor in set(columna) if normalizar_texto(valor) == continente_normalizado}
+
+#Obtiene una columna de una lista de paises
+def obtener_columna(lista_paises, clave):
     """
-    Filtra la lista de países por un rango de superficie (mínimo y máximo)
-    ingresado por el usuario.
+    Devuelve los valores de una clave para todos los países, por posición.
+    En una ListaPaises usa sus columnas (sin copiar las numéricas).
 
     Args:
-        lista (list): La lista completa de países a filtrar.
+        lista_paises (list): La lista de países.
+        clave (str): La clave del diccionario (ej: 'POBLACION').
 
     Returns:
-        list: Una nueva lista (encontrados) que contiene solo los países
-                cuya superficie está dentro del rango especificado (inclusivo).
-                Devuelve una lista vacía si el mínimo es mayor al máximo.
+        array | list: Los valores de la columna.
     """
-    #Pide un rango de superficie
-    print("\n--- Filtrar por superficie ---\n")
-    minimo = validar_numero("Ingrese la superficie mínima: ")
-    maximo = validar_numero("Ingrese la superficie máxima: ")
-
-    #Si el numero minimo es mayor al maximo, mostramos el error
-    if minimo > maximo:
-        print("Error: La superficie mínima no puede ser mayor a la máxima! ")
-        return []
-    
-    #Creamos una lista vacia para ir agregando los paises que cumplen la condicion 
-    encontrados = []
-    for pais in lista:
-        if minimo <= pais['SUPERFICIE'] <= maximo:
-            encontrados.append(pais)
-    return encontrados
+    if isinstance(lista_paises, ListaPaises):
+        return lista_paises.columna(clave)
+    return [pais[clave] for pais in lista_paises]
 
 #Opciones de filtros
 def filtrar_paises(lista_paises, continentes_validos):
     """
     Muestra un sub-menú para las opciones de filtrado.
-    Permite al usuario elegir filtrar por continente, población o superficie.
+    Permite al usuario elegir filtrar por continente, población o superficie,
+    o por varios de esos criterios (y parte del nombre) a la vez.
     Llama a las funciones de filtro correspondientes y muestra los resultados.
 
     Args:
@@ -513,7 +3539,8 @@ def filtrar_paises(lista_paises, continentes_validos):
         print("1. Filtrar por continente ")
         print("2. Filtrar por rango de población ")
         print("3. Filtrar por rango de superficie ")
-        print("4. Volver atrás ")
+        print("4. Filtro combinado (nombre, continente, población y superficie) ")
+        print("5. Volver atrás ")
         print("\n")
 
         opcion = input("Ingrese una de las opciones --> ").strip()
@@ -535,61 +3562,246 @@ def filtrar_paises(lista_paises, continentes_validos):
                 mostrar_lista_paises(lista_filtrada)
 
             case '4':
+                lista_filtrada = filtro_combinado(lista_paises, continentes_validos)
+                mostrar_lista_paises(lista_filtrada)
+
+            case '5':
                 print("Volviendo al menú...")
                 break
         
             case _: 
                 print("Opción inválida!")
-                input("\nPresione Enter para volver. ")
+                esperar_enter("\nPresione Enter para volver. ")
 
 #Ordena una lista de paises
 def ordenar_lista(lista_paises,clave,reversa=False):
     """
-    Ordena una copia de la lista de países
+    Ordena una copia de la lista de países usando el ordenamiento de Python
+    (Timsort, O(n log n)). Admite varias claves, cada una con su propia
+    dirección. Si la lista es una ListaPaises, la permutación resultante se
+    guarda en su caché de consultas (hasta un alta, o una modificación si se
+    ordena por un número), y los ordenamientos por POBLACION o SUPERFICIE
+    salen directo del índice ordenado.
 
     Args:
         lista_paises (list): La lista de paises a ordenar
-        clave (str): La clave del diccionario (ej: 'NOMBRE', 'POBLACION')
-        reversa (bool): False para ascendente (A-Z), True para descendente (Z-A)
+        clave (str | tuple): La clave del diccionario (ej: 'NOMBRE', 'POBLACION')
+                             o una tupla de claves (ej: ('CONTINENTE', 'POBLACION'))
+        reversa (bool | tuple): False para ascendente (A-Z), True para descendente (Z-A).
+                                Con varias claves puede ser un bool por clave.
 
     Returns:
         list: Una nueva lista ordenada
     """
-    
-    #Hacemos una copia de la lista de paises
-    lista_copia = lista_paises.copy()
-    longitud_lista = len(lista_copia) 
+    #Pasamos las claves y direcciones a tuplas del mismo largo
+    claves = (clave,) if isinstance(clave, str) else tuple(clave)
+    reversas = (reversa,) * len(claves) if isinstance(reversa, bool) else tuple(reversa)
 
-    #Bucle exterior: recorre la lista de 0 hasta el final
-    for i in range(longitud_lista):
-        
-        #Asumimos que el elemento en i es el extremo (mínimo o máximo)
-        #Guardamos su posicion
-        idx_extremo = i
-        
-        #Bucle interior: busca en el "resto" de la lista 
-        #para ver si encontramos un elemento "mejor"
-        for j in range(i + 1, longitud_lista):
-            
-            #Logica de comparacion
-            valor_actual = lista_copia[j][clave]
-            valor_extremo = lista_copia[idx_extremo][clave]
-            
-            if reversa:
-                #Orden descendente (buscamos el maximo)
-                if valor_actual > valor_extremo:
-                    idx_extremo = j
-            else:
-                #Orden ascendente (buscamos el minimo)
-                if valor_actual < valor_extremo:
-                    idx_extremo = j 
+    if len(claves) != len(reversas):
+        raise ValueError("Debe indicar una dirección por cada clave de ordenamiento")
 
-        #Al final del bucle interior idx_extremo tiene la posición
-        #del país correcto. Lo intercambiamos con la posición i
-        lista_copia[i], lista_copia[idx_extremo] = lista_copia[idx_extremo], lista_copia[i]
-        
-    #Devolver la lista copiada y ordenada
-    return lista_copia
+    #Devolver una lista nueva siguiendo la permutación
+    return [lista_paises[i] for i in posiciones_ordenadas(lista_paises, claves, reversas)]
+
+#Obtiene la permutacion ordenada de una lista de paises
+def posiciones_ordenadas(lista_paises, claves, reversas):
+    """
+    Devuelve las posiciones de la lista en el orden pedido, sin armar los
+    países: así quien solo necesita los primeros (ej: una consulta con
+    límite) no paga por toda la lista. Usa el índice ordenado o la caché
+    de ordenamientos de la ListaPaises cuando puede.
+
+    Args:
+        lista_paises (list): La lista de paises a ordenar
+        claves (tuple): Las claves de ordenamiento, de mayor a menor prioridad
+        reversas (tuple): Un bool por clave (True para descendente)
+
+    Returns:
+        iterable: Las posiciones de la lista en el orden pedido
+    """
+    #Una sola clave numérica en una ListaPaises: el índice ordenado ya es la permutación
+    if isinstance(lista_paises, ListaPaises) and len(claves) == 1 and claves[0] in CLAVES_NUMERICAS:
+        #En descendente se recorre por grupos de empate, para que queden por posición creciente
+        return lista_paises.descendente(claves[0]) if reversas[0] else lista_paises.indice_ordenado(claves[0])
+
+    #Buscamos la permutación en la caché (solo si la lista tiene una)
+    cache = getattr(lista_paises, 'cache_consultas', None)
+    clave_cache = ("orden", claves, reversas)
+    permutacion = None
+
+    if cache is not None:
+        permutacion = cache.obtener(clave_cache)
+        #Si la lista cambió de largo sin invalidar la caché, la descartamos
+        if permutacion is not None and len(permutacion) != len(lista_paises):
+            permutacion = None
+
+    if permutacion is None:
+        permutacion = calcular_permutacion(lista_paises, claves, reversas)
+        if cache is not None:
+            cache.guardar(clave_cache, permutacion)
+
+    return permutacion
+
+#Calcula el orden de las posiciones de una lista de paises
+def calcular_permutacion(lista_paises, claves, reversas):
+    """
+    Calcula la permutación (lista de posiciones) que deja ordenada la lista.
+    Ordena primero por la última clave y termina por la primera: como el
+    ordenamiento de Python es estable, el resultado respeta todas las claves
+    aunque cada una tenga una dirección distinta.
+
+    Args:
+        lista_paises (list): La lista de paises a ordenar
+        claves (tuple): Las claves de ordenamiento, de mayor a menor prioridad
+        reversas (tuple): Un bool por clave (True para descendente)
+
+    Returns:
+        list: Las posiciones de la lista en el orden pedido
+    """
+    posiciones = list(range(len(lista_paises)))
+
+    for clave, reversa in reversed(list(zip(claves, reversas))):
+        #Extraemos la columna una sola vez para no acceder al diccionario en cada comparación
+        columna = obtener_columna(lista_paises, clave)
+        posiciones.sort(key=columna.__getitem__, reverse=reversa)
+
+    return posiciones
+
+#Elige como ordenar el resultado de una consulta
+def estrategia_de_orden(lista_paises, posiciones, claves, limite=None):
+    """
+    Decide cómo ordena ordenar_posiciones el resultado de una consulta.
+
+    Args:
+        lista_paises (list): La lista de paises.
+        posiciones (list): Las posiciones a ordenar, o None para toda la lista.
+        claves (tuple): Las claves de ordenamiento.
+        limite (int): Cantidad de posiciones que se van a usar, o None.
+
+    Returns:
+        str: 'indice_ordenado' o 'permutacion' (toda la lista, ver
+             posiciones_ordenadas), 'heap' (los primeros de una sola clave)
+             u 'ordenamiento' (las posiciones encontradas).
+    """
+    if posiciones is None:
+        if isinstance(lista_paises, ListaPaises) and len(claves) == 1 and claves[0] in CLAVES_NUMERICAS:
+            return "indice_ordenado"
+        return "permutacion"
+    if limite is not None and limite < len(posiciones) and len(claves) == 1:
+        return "heap"
+    return "ordenamiento"
+
+#Ordena las posiciones encontradas por una consulta
+def ordenar_posiciones(lista_paises, posiciones, claves, reversas, limite=None):
+    """
+    Ordena el resultado de una consulta. La lista completa (posiciones
+    None) sale de posiciones_ordenadas; de las posiciones encontradas, si
+    hay un límite y una sola clave se eligen los primeros con un heap
+    (O(m log k)) y si no se ordenan solo esas posiciones. En los empates
+    queda primero la posición menor, igual que con ordenar_lista sobre los
+    países encontrados.
+
+    Args:
+        lista_paises (list): La lista de paises.
+        posiciones (list): Las posiciones (en orden de la lista), o None para toda la lista.
+        claves (tuple): Las claves de ordenamiento, de mayor a menor prioridad.
+        reversas (tuple): Un bool por clave (True para descendente).
+        limite (int): Cantidad de posiciones que se van a usar, o None.
+
+    Returns:
+        iterable: Las posiciones en el orden pedido (con el heap, solo las primeras).
+    """
+    estrategia = estrategia_de_orden(lista_paises, posiciones, claves, limite)
+    if posiciones is None:
+        return posiciones_ordenadas(lista_paises, claves, reversas)
+
+    if estrategia == "heap":
+        seleccionar = heapq.nlargest if reversas[0] else heapq.nsmallest
+        return seleccionar(limite, posiciones, key=valor_por_posicion(lista_paises, claves[0]))
+
+    #Igual que calcular_permutacion, pero solo con las posiciones encontradas
+    posiciones = list(posiciones)
+    for clave, reversa in reversed(list(zip(claves, reversas))):
+        posiciones.sort(key=valor_por_posicion(lista_paises, clave), reverse=reversa)
+    return posiciones
+
+#Obtiene una funcion que lee una clave por posicion
+def valor_por_posicion(lista_paises, clave):
+    """
+    Devuelve una función posición -> valor de la clave, sin armar la
+    columna completa (sirve para ordenar pocas posiciones).
+
+    Args:
+        lista_paises (list): La lista de paises.
+        clave (str): Una de CLAVES_PAIS.
+
+    Returns:
+        function: La función que lee el valor.
+    """
+    if isinstance(lista_paises, ListaPaises):
+        if clave in CLAVES_NUMERICAS:
+            return lista_paises.columna(clave).__getitem__
+        return lista_paises.nombre if clave == "NOMBRE" else lista_paises.continente
+    return lambda posicion: lista_paises[posicion][clave]
+
+#Vacía la caché de consultas de la lista
+def invalidar_cache_consultas(lista_paises):
+    """
+    Elimina todos los resultados guardados de la lista de países
+    (búsquedas, filtros y ordenamientos). Los cambios hechos con append o
+    actualizar ya descartan solo los que dependen de la fila tocada.
+
+    Args:
+        lista_paises (list): La lista de paises.
+    """
+    cache = getattr(lista_paises, 'cache_consultas', None)
+    if cache is not None:
+        cache.limpiar()
+
+#Obtiene los K paises con mayor o menor valor de una clave
+def ranking_paises(lista_paises, clave, k, mayores=True, posiciones=None):
+    """
+    Devuelve los k países con mayor (o menor) valor en una clave numérica
+    sin ordenar la lista completa. El resultado es el mismo que el de
+    sorted(lista, key=clave, reverse=mayores)[:k]: en los empates queda
+    primero el que se agregó antes (con k=1, el mismo país que
+    calcular_estadisticas).
+
+    Si la lista es una ListaPaises que ya armó el índice ordenado de la
+    clave, los países salen de un extremo del índice (O(k log n)); si no,
+    se eligen con un heap en una sola pasada por la columna (O(n log k)).
+
+    Args:
+        lista_paises (list): La lista de países (ListaPaises o lista común).
+        clave (str): 'POBLACION' o 'SUPERFICIE'.
+        k (int): Cantidad de países del ranking.
+        mayores (bool): True para los de mayor valor (de mayor a menor),
+                        False para los de menor valor (de menor a mayor).
+        posiciones (iterable): Posiciones (en orden de la lista) entre las que
+                               elegir, ej: las de filtrar_posiciones. None
+                               para toda la lista.
+
+    Returns:
+        list: Los países del ranking (menos de k si no hay suficientes).
+
+    Raises:
+        ValueError: Si la clave no es numérica.
+    """
+    if clave not in CLAVES_NUMERICAS:
+        raise ValueError(f"El ranking solo puede ser por {' o '.join(CLAVES_NUMERICAS)}")
+    if k <= 0:
+        return []
+
+    #Con el índice ordenado ya armado no hace falta recorrer la lista
+    if posiciones is None and isinstance(lista_paises, ListaPaises) and clave in lista_paises.indices_ordenados:
+        return [lista_paises[i] for i in lista_paises.ranking(clave, k, mayores)]
+
+    #Selección con un heap de tamaño k: no se ordena la columna completa
+    columna = obtener_columna(lista_paises, clave)
+    if posiciones is None:
+        posiciones = range(len(lista_paises))
+    seleccionar = heapq.nlargest if mayores else heapq.nsmallest
+    return [lista_paises[i] for i in seleccionar(k, posiciones, key=columna.__getitem__)]
 
 
 #Ordena paises por nombre,poblacion o superficie
@@ -616,7 +3828,9 @@ def ordenar_paises(lista_paises):
         print("2. Ordenar por población (ascendente) ")
         print("3. Ordenar por superficie (ascendente) ")
         print("4. Ordenar por superficie (descendente) ")
-        print("5. Volver atrás ")
+        print("5. Los K países con mayor y menor población ")
+        print("6. Los K países con mayor y menor superficie ")
+        print("7. Volver atrás ")
         print("\n")
 
         opcion = input("Ingrese una de las opciones --> ").strip()
@@ -642,41 +3856,57 @@ def ordenar_paises(lista_paises):
                 lista_ordenada = ordenar_lista(lista_paises, clave='SUPERFICIE', reversa=True)
                 mostrar_lista_paises(lista_ordenada)
 
+            #Los rankings eligen solo los K pedidos, sin ordenar toda la lista
             case '5':
+                mostrar_ranking(lista_paises, 'POBLACION')
+
+            case '6':
+                mostrar_ranking(lista_paises, 'SUPERFICIE')
+
+            case '7':
                 print("Volviendo al menú...")
                 break
 
             case _: 
                 print("Opción inválida!")
-                input("\nPresione Enter para volver. ")
+                esperar_enter("\nPresione Enter para volver. ")
 
-#Calcula el pais con mayor y menor poblacion
+#Muestra el ranking de paises con mayor y menor poblacion
 def calcular_poblacion(lista_paises):
     """
-    Encuentra el país con la mayor y la menor población de la lista.
+    Muestra los K países con mayor y con menor población de la lista
+    (K lo elige el usuario; con K=1, el país con mayor y menor población).
     Imprime los resultados directamente en la consola.
 
     Args:
         lista_paises (list): La lista de países.
     """
-    #Asumimos que el primer pais es el menor y mayor para tener un punto de partida
-    menor = lista_paises[0]
-    mayor = lista_paises[0]
+    mostrar_ranking(lista_paises, 'POBLACION')
 
-    #Recorremos la lista para comparar
-    for pais in lista_paises:
-        actual = pais['POBLACION']
-        #Comparamos y actualizamos el valor
-        if actual < menor['POBLACION']:
-            menor = pais
-        if actual > mayor['POBLACION']:
-            mayor = pais
+#Muestra los K paises con mayor y menor valor de una clave
+def mostrar_ranking(lista_paises, clave):
+    """
+    Pide la cantidad de países K y muestra los K con mayor y los K con
+    menor valor de la clave (ver ranking_paises).
 
-    #Mostramos los resultados
-    print("\n--- País con mayor y menor población ---\n")
-    print(f"País con mayor población: {mayor['NOMBRE']} --> {mayor['POBLACION']} habitantes")
-    print(f"País con menor población: {menor['NOMBRE']} --> {menor['POBLACION']} habitantes")
-    input("\nPresione Enter para continuar. ")
+    Args:
+        lista_paises (list): La lista de países.
+        clave (str): 'POBLACION' o 'SUPERFICIE'.
+    """
+    #Pedimos K hasta que sea al menos 1
+    k = validar_numero("Cantidad de países del ranking (K): ")
+    while k < 1:
+        print("Error: Debe ingresar un número mayor a cero ")
+        k = validar_numero("Cantidad de países del ranking (K): ")
+
+    nombre_clave, unidad = ("población", "habitantes") if clave == 'POBLACION' else ("superficie", "km²")
+
+    #Mostramos los resultados, los mayores primero
+    for mayores, titulo in ((True, "mayor"), (False, "menor")):
+        print(f"\n--- Países con {titulo} {nombre_clave} ---\n")
+        for puesto, pais in enumerate(ranking_paises(lista_paises, clave, k, mayores), 1):
+            print(f"{puesto}. {pais['NOMBRE']} --> {pais[clave]} {unidad}")
+    esperar_enter()
 
 #Muestra el promedio de la poblacion en la lista
 def promedio_poblacion(lista_paises):
@@ -687,21 +3917,13 @@ def promedio_poblacion(lista_paises):
     Args:
         lista_paises (list): La lista de países.
     """
-    #Usamos un acumulador para calcular el promedio
-    total = 0
-
-    #Recorremos la lista y sumamos la cantidad de poblacion al acumulador
-    for pais in lista_paises:
-        total += pais['POBLACION']
-    
-    #Calculamos el promedio
-    cantidad_paises = len(lista_paises)
-    promedio = total / cantidad_paises
+    #El promedio sale del total que mantiene la lista (o de una sola pasada)
+    promedio = calcular_estadisticas(lista_paises)['promedio_poblacion']
 
     #Mostramos el resultado en pantalla
     print("\n--- Promedio de población ---\n")
     print(f"El promedio es de: {int(promedio)} habitantes ")
-    input("\nPresione Enter para continuar. ")
+    esperar_enter()
 
 #Muestra el promedio de la superficie en la lista
 def promedio_superficie(lista_paises):
@@ -712,50 +3934,274 @@ def promedio_superficie(lista_paises):
     Args:
         lista_paises (list): La lista de países.
     """
-    #Usamos un acumulador para calcular el promedio
-    total = 0
-
-    #Recorremos la lista y sumamos la superficie al acumulador
-    for pais in lista_paises:
-        total += pais['SUPERFICIE']
-    
-    #Calculamos el promedio
-    cantidad_paises = len(lista_paises)
-    promedio = total / cantidad_paises
+    #El promedio sale del total que mantiene la lista (o de una sola pasada)
+    promedio = calcular_estadisticas(lista_paises)['promedio_superficie']
 
     #Mostramos el resultado en pantalla
     print("\n--- Promedio de superficie ---\n")
     print(f"El promedio es de: {int(promedio)} km² ")
-    input("\nPresione Enter para continuar. ")
+    esperar_enter()
+
+#Muestra el resumen de cada continente
+def paises_por_continente(lista_paises):
+    """
+    Muestra, para cada continente, la cantidad de países, el total, el
+    promedio, el mínimo y el máximo de población y de superficie, y la
+    densidad de población (ver agrupar_por_continente).
+
+    Args:
+        lista_paises (list): La lista de países.
+    """
+    #Todos los agregados salen de una sola pasada por la lista
+    grupos = agrupar_por_continente(lista_paises)
+
+    #Mostramos los resultados
+    print("\n--- Resumen por continente ---\n")
+    print(formatear_grupos(grupos, "table"))
+    esperar_enter()
+
+#Exporta el resumen por continente a un archivo
+def exportar_resumen_continentes(lista_paises):
+    """
+    Pide un archivo y guarda en él el resumen por continente de
+    paises_por_continente: JSON si termina en .json, si no CSV.
+
+    Args:
+        lista_paises (list): La lista de países.
+    """
+    nombre_archivo = input("Archivo para exportar el resumen (.csv o .json, Enter para cancelar): ").strip()
+    if not nombre_archivo:
+        print("Exportación cancelada.")
+        return
+
+    grupos = agrupar_por_continente(lista_paises)
+    formato = "json" if nombre_archivo.lower().endswith(".json") else "csv"
+    try:
+        with open(nombre_archivo, 'w', encoding='utf-8', newline='') as archivo:
+            archivo.write(formatear_grupos(grupos, formato) + "\n")
+        print(f"Resumen de {len(grupos)} continente/s exportado a '{nombre_archivo}'.")
+    except OSError as error:
+        print(f"Error: No se pudo exportar el resumen ({error.strerror}).")
+    esperar_enter()
+
+#Calcula todas las estadisticas en una sola pasada
+def calcular_estadisticas(paises):
+    """
+    Calcula las estadísticas de la lista recorriéndola una sola vez.
+    Acepta cualquier iterable, así que puede consumir directamente la
+    lectura de leer_paises_csv sin cargar el archivo en memoria.
+    Con una ListaPaises no recorre nada: usa los totales, los contadores
+    por continente y el índice ordenado que la lista mantiene (O(log n)).
+
+    Args:
+        paises (iterable): Los países.
+
+    Returns:
+        dict: 'cantidad', 'total_poblacion', 'total_superficie',
+              'mayor_poblacion' y 'menor_poblacion' (dict del país o None),
+              'promedio_poblacion', 'promedio_superficie' y
+              'por_continente' (dict continente -> cantidad).
+    """
+    # Con una ListaPaises todo sale de los agregados que mantiene la lista
+    if isinstance(paises, ListaPaises):
+        cantidad = len(paises)
+        total_poblacion = paises.total_poblacion
+        total_superficie = paises.total_superficie
+        posicion_menor, posicion_mayor = paises.extremos('POBLACION')
+        menor = None if posicion_menor is None else paises[posicion_menor]
+        mayor = None if posicion_mayor is None else paises[posicion_mayor]
+        contador = dict(zip(paises.continentes, paises.cantidades_continente))
+        paises = ()
+
+    else:
+        cantidad = 0
+        total_poblacion = 0
+        total_superficie = 0
+        mayor = None
+        menor = None
+        contador = {}
+
+    for pais in paises:
+        cantidad += 1
+        total_poblacion += pais['POBLACION']
+        total_superficie += pais['SUPERFICIE']
+        #Nos quedamos con el primero en caso de empate, igual que calcular_poblacion
+        if mayor is None or pais['POBLACION'] > mayor['POBLACION']:
+            mayor = pais
+        if menor is None or pais['POBLACION'] < menor['POBLACION']:
+            menor = pais
+        contador[pais['CONTINENTE']] = contador.get(pais['CONTINENTE'], 0) + 1
+
+    return {
+        "cantidad": cantidad,
+        "total_poblacion": total_poblacion,
+        "total_superficie": total_superficie,
+        "mayor_poblacion": mayor,
+        "menor_poblacion": menor,
+        "promedio_poblacion": total_poblacion / cantidad if cantidad else 0,
+        "promedio_superficie": total_superficie / cantidad if cantidad else 0,
+        "por_continente": contador,
+    }
+
+#Columnas de continente, poblacion y superficie de algunas posiciones
+def columnas_de_posiciones(lista, posiciones=None):
+    """
+    Copia las columnas de los países de las posiciones dadas, para
+    recorrerlas con las funciones de C (sum, min, max, compress,
+    bytes.count) en lugar de un bucle de Python. Los números quedan en
+    listas: reducir una lista es varias veces más rápido que reducir el
+    array, que crea un entero por cada valor que entrega.
+
+    Args:
+        lista (ListaPaises): La lista de países.
+        posiciones (iterable): Las posiciones, o None para todos los países.
+
+    Returns:
+        tuple: (códigos de continente en bytes, poblaciones, superficies)
+    """
+    if posiciones is None:
+        return bytes(lista.codigos_continente), lista.poblaciones.tolist(), lista.superficies.tolist()
+    return (bytes(map(lista.codigos_continente.__getitem__, posiciones)),
+            list(map(lista.poblaciones.__getitem__, posiciones)),
+            list(map(lista.superficies.__getitem__, posiciones)))
+
+#Codigos de continente en el orden en que aparecen
+def codigos_presentes(lista, codigos):
+    """
+    Args:
+        lista (ListaPaises): La lista de países (su tabla de continentes).
+        codigos (bytes): Un código de continente por país.
+
+    Returns:
+        list: Los códigos que aparecen, en el orden de su primera aparición.
+    """
+    primeras = ((codigos.find(codigo), codigo) for codigo in range(len(lista.continentes)))
+    return [codigo for primera, codigo in sorted(primeras) if primera != -1]
+
+#Estadisticas de algunas posiciones de la lista
+def estadisticas_posiciones(lista, posiciones):
+    """
+    Calcula las estadísticas de los países de las posiciones sin crear un
+    registro por país: copia sus columnas y las reduce con funciones de C.
+    Da lo mismo que calcular_estadisticas sobre esos países (en los
+    empates, el primero; los continentes, en el orden en que aparecen).
+
+    Args:
+        lista (ListaPaises): La lista de países.
+        posiciones (list): Las posiciones (ej: las de filtrar_posiciones).
+
+    Returns:
+        dict: Las mismas claves que calcular_estadisticas.
+    """
+    codigos, poblaciones, superficies = columnas_de_posiciones(lista, posiciones)
+    cantidad = len(poblaciones)
+    total_poblacion = sum(poblaciones)
+    total_superficie = sum(superficies)
+    mayor = menor = None
+    if cantidad:
+        # index devuelve la primera aparición: en los empates queda el primero
+        menor = lista[posiciones[poblaciones.index(min(poblaciones))]]
+        mayor = lista[posiciones[poblaciones.index(max(poblaciones))]]
+
+    return {
+        "cantidad": cantidad,
+        "total_poblacion": total_poblacion,
+        "total_superficie": total_superficie,
+        "mayor_poblacion": mayor,
+        "menor_poblacion": menor,
+        "promedio_poblacion": total_poblacion / cantidad if cantidad else 0,
+        "promedio_superficie": total_superficie / cantidad if cantidad else 0,
+        "por_continente": {lista.continentes[codigo]: codigos.count(codigo) for codigo in codigos_presentes(lista, codigos)},
+    }
+
+#Arma los agregados de un grupo de paises
+def resumen_grupo(cantidad, total_poblacion, minimo_poblacion, maximo_poblacion, total_superficie, minimo_superficie, maximo_superficie):
+    """
+    Args:
+        cantidad (int): Cantidad de países del grupo (al menos 1).
+        (los demás, la suma, el mínimo y el máximo de cada columna)
 
-#Muestra la cantidad de paises de cada continente
-def paises_por_continente(lista_paises):
+    Returns:
+        dict: 'cantidad', y total, promedio, mínimo y máximo de población y
+              de superficie ('total_poblacion', 'promedio_poblacion',
+              'minimo_poblacion', 'maximo_poblacion' y lo mismo con
+              '_superficie'), y 'densidad' (habitantes por km² del grupo:
+              población total sobre superficie total; None sin superficie).
+    """
+    return {
+        "cantidad": cantidad,
+        "total_poblacion": total_poblacion,
+        "promedio_poblacion": total_poblacion / cantidad,
+        "minimo_poblacion": minimo_poblacion,
+        "maximo_poblacion": maximo_poblacion,
+        "total_superficie": total_superficie,
+        "promedio_superficie": total_superficie / cantidad,
+        "minimo_superficie": minimo_superficie,
+        "maximo_superficie": maximo_superficie,
+        "densidad": total_poblacion / total_superficie if total_superficie else None,
+    }
+
+#Agrupa los paises por continente en una sola pasada
+def agrupar_por_continente(paises, posiciones=None):
     """
-    Cuenta cuántos países pertenecen a cada continente.
-    Imprime el resultado.
+    Calcula, para cada continente, la cantidad de países, la suma, el
+    promedio, el mínimo y el máximo de población y de superficie, y la
+    densidad de población, sin una pasada aparte por cada estadística.
+
+    Con una ListaPaises trabaja sobre las columnas: cada continente se
+    separa con una máscara de bytes (bytes.translate) y compress, y sus
+    valores se reducen con sum, min y max, todo en C. Con cualquier otro
+    iterable (ej: la lectura de leer_paises_csv) lo recorre una sola vez.
 
     Args:
-        lista_paises (list): La lista de países.
+        paises (iterable): Los países.
+        posiciones (iterable): Solo estas posiciones de la lista (ej: las de
+                               filtrar_posiciones), o None para todos.
+
+    Returns:
+        dict: continente -> agregados (ver resumen_grupo), en el orden en
+              que aparece cada continente; vacío si no hay países.
     """
-    #Usamos un diccionario para contar
-    contador = {}
+    if isinstance(paises, ListaPaises):
+        codigos, poblaciones, superficies = columnas_de_posiciones(paises, posiciones)
+        presentes = codigos_presentes(paises, codigos)
+        grupos = {}
+        for codigo in presentes:
+            if len(presentes) == 1:
+                # Un solo continente (ej: filtrado por continente): no hace falta separar nada
+                valores_poblacion, valores_superficie = poblaciones, superficies
+            else:
+                mascara = codigos.translate(bytes(i == codigo for i in range(256)))
+                valores_poblacion = list(compress(poblaciones, mascara))
+                valores_superficie = list(compress(superficies, mascara))
+            grupos[paises.continentes[codigo]] = resumen_grupo(
+                len(valores_poblacion), sum(valores_poblacion), min(valores_poblacion), max(valores_poblacion),
+                sum(valores_superficie), min(valores_superficie), max(valores_superficie))
+        return grupos
 
-    #Recorremos la lista
-    for pais in lista_paises:
-        continente = pais['CONTINENTE']
-        #Si es la primera vez que el programa ve este continente, se le da valor 1
-        #Caso contrario, se le suma 1
-        if continente not in contador:
-            contador[continente] = 1
-        else:
-            contador[continente] += 1
-    
-    #Mostramos los resultados
-    print("\n--- Cantidad de países por continente ---\n")
-    # .items() nos da la clave (continente) y el valor (cantidad)
-    for continente, cantidad in contador.items():
-        print(f"{continente}: {cantidad} país/es ")
-    input("\nPresione Enter para continuar. ")
+    if posiciones is not None:
+        paises = (paises[i] for i in posiciones)
+    #Por continente: [cantidad, suma, minimo y maximo de poblacion, suma, minimo y maximo de superficie]
+    acumulados = {}
+    for pais in paises:
+        poblacion = pais['POBLACION']
+        superficie = pais['SUPERFICIE']
+        acumulado = acumulados.get(pais['CONTINENTE'])
+        if acumulado is None:
+            acumulados[pais['CONTINENTE']] = [1, poblacion, poblacion, poblacion, superficie, superficie, superficie]
+            continue
+        acumulado[0] += 1
+        acumulado[1] += poblacion
+        if poblacion < acumulado[2]:
+            acumulado[2] = poblacion
+        if poblacion > acumulado[3]:
+            acumulado[3] = poblacion
+        acumulado[4] += superficie
+        if superficie < acumulado[5]:
+            acumulado[5] = superficie
+        if superficie > acumulado[6]:
+            acumulado[6] = superficie
+    return {continente: resumen_grupo(*acumulado) for continente, acumulado in acumulados.items()}
 
 #Muestra estadisticas de poblacion,superficie y paises por continente
 def mostrar_estadisticas(lista_paises):
@@ -776,11 +4222,12 @@ def mostrar_estadisticas(lista_paises):
     #Sub-menu de opciones para ordenar
     while True:
         print("\n--- Mostrar estadísticas ---\n")
-        print("1. País con mayor y menor población ")
+        print("1. Ranking de países con mayor y menor población ")
         print("2. Promedio de población ")
         print("3. Promedio de superficie ")
-        print("4. Cantidad de países por continente ")
-        print("5. Volver atrás ")
+        print("4. Resumen por continente (cantidad, población, superficie y densidad) ")
+        print("5. Exportar el resumen por continente (CSV o JSON) ")
+        print("6. Volver atrás ")
         print("\n")
 
         opcion = input("Ingrese una de las opciones --> ").strip()
@@ -800,12 +4247,15 @@ def mostrar_estadisticas(lista_paises):
                 paises_por_continente(lista_paises)
 
             case '5':
+                exportar_resumen_continentes(lista_paises)
+
+            case '6':
                 print("Volviendo al menú...")
                 break
 
             case _: 
                 print("Opción inválida!")
-                input("\nPresione Enter para volver. ")
+                esperar_enter("\nPresione Enter para volver. ")
 
 # Función de menú
 def mostrar_menu():
@@ -826,26 +4276,26 @@ def mostrar_menu():
     print("=" * 60)
 
 # Función principal
-def main():
+def main(nombre_archivo='datos_paises.csv', pausar=True):
     """
     Función principal del programa.
-    Inicializa los datos del csv, la variable CONTINENTES y ejecuta el bucle del menú.
-    """
-    # Asignacion de valor a variable
-    nombre_archivo = 'datos_paises.csv'
-
-    # Inicialización de variable
-    CONTINENTES = {
-        "america": "América",
-        "europa": "Europa",
-        "asia": "Asia",
-        "africa": "África",
-        "oceania": "Oceanía",
-        "antartida": "Antártida"
-    }
-    
+    Inicializa los datos del csv y ejecuta el bucle del menú.
+
+    Args:
+        nombre_archivo (str): Archivo de países (CSV, o SQLite según la extensión).
+        pausar (bool): Si es False, los listados se muestran completos sin
+                       paginar ni esperar Enter (--no-pause).
+    """
+    # Opciones de pantalla para los listados
+    _pantalla["pausar"] = pausar
+
     # Llamado de función y almacenamiento de lista de diccionarios en lista_paises
-    lista_paises = cargar_datos_csv(nombre_archivo)
+    almacenamiento = abrir_almacenamiento(nombre_archivo)
+    lista_paises = almacenamiento.cargar()
+
+    # Con muchos países y varios núcleos, los filtros se reparten entre procesos
+    if len(lista_paises) >= UMBRAL_CONSULTA_PARALELA and nucleos_disponibles() > 1:
+        lista_paises.ejecutor = EjecutorParalelo(lista_paises)
 
     # Inicio bucle principal
     while True:
@@ -858,11 +4308,11 @@ def main():
         match opcion:
             case '1':
                 # Llamado a función
-                agregar_pais(lista_paises, nombre_archivo, CONTINENTES)
+                agregar_pais(lista_paises, almacenamiento, CONTINENTES)
             
             case '2':
                 # Llamado a función
-                actualizar_datos_pais(lista_paises, nombre_archivo)
+                actualizar_datos_pais(lista_paises, almacenamiento)
             
             case '3':
                 # Llamado a función
@@ -881,6 +4331,10 @@ def main():
                 mostrar_estadisticas(lista_paises)
             
             case '7':
+                # Se liberan los procesos de los filtros, si los hay
+                if lista_paises.ejecutor is not None:
+                    lista_paises.ejecutor.cerrar()
+                almacenamiento.cerrar()
                 # Mensaje finalización del programa
                 print("¡Programa finalizado!")
                 # Finaliza el bucle principal del programa
@@ -890,5 +4344,1113 @@ def main():
                 # Manejo de opción inválida
                 print("Opción invalida. Vuelva a intentarlo")
 
+# Instrumentación (opcional, con --profile o la variable de entorno PAISES_PERFIL)
+#Funciones del camino crítico que se miden, agrupadas por operación
+FUNCIONES_INSTRUMENTADAS = {
+    "carga": ("cargar_datos_csv", "leer_paises_csv", "cargar_csv_paralelo", "leer_snapshot", "abrir_snapshot_mapeado",
+              "aplicar_journal", "AlmacenamientoSQLite.cargar"),
+    "guardado": ("guardar_datos_csv", "escribir_csv_atomico", "escribir_snapshot", "guardar_cambio_pais", "compactar_datos",
+                 "importar_paises", "AlmacenamientoSQLite.guardar", "AlmacenamientoSQLite.guardar_cambio"),
+    "normalizacion": ("normalizar_texto", "trigramas", "ListaPaises._armar_indice_nombres"),
+    "busqueda": ("buscar_pais_lista", "buscar_por_nombre", "buscar_pais"),
+    "filtros": ("filtrar_posiciones", "calcular_posiciones_filtro", "planificar_consulta", "ejecutar_plan", "posiciones_con_nombre", "aplicar_criterios", "posiciones_en_rango", "paises_de_continente", "paises_en_rango",
+                "EjecutorParalelo.filtrar", "filtro_continente", "filtro_poblacion", "filtro_superficie"),
+    "ordenamiento": ("ordenar_lista", "posiciones_ordenadas", "ordenar_posiciones", "calcular_permutacion", "ListaPaises.indice_ordenado",
+                     "ranking_paises", "ListaPaises.ranking"),
+    "estadisticas": ("calcular_estadisticas", "estadisticas_posiciones", "agrupar_por_continente", "EjecutorParalelo.estadisticas",
+                     "calcular_poblacion", "promedio_poblacion", "promedio_superficie", "paises_por_continente",
+                     "exportar_resumen_continentes"),
+    "consultas": ("consultar_lista", "explicar_consulta", "estadisticas_lista", "agrupar_lista", "ranking_lista", "AlmacenamientoCSV.consultar",
+                  "AlmacenamientoCSV.estadisticas", "AlmacenamientoCSV.agrupar", "AlmacenamientoCSV.ranking", "AlmacenamientoSQLite.consultar",
+                  "AlmacenamientoSQLite.estadisticas", "AlmacenamientoSQLite.agrupar", "AlmacenamientoSQLite.ranking"),
+}
+
+# Modos de --profile: tiempos (llamadas y tiempo), memoria (además, bytes con tracemalloc) y cprofile (además, perfil completo)
+MODOS_PERFIL = ("tiempos", "memoria", "cprofile")
+
+# Estado de la instrumentación: modo activo, archivo del informe, perfilador y contadores por función
+# (contadores: nombre -> [llamadas, segundos, bytes asignados])
+_perfil = {"modo": None, "archivo": None, "perfilador": None, "contadores": {}}
+
+#Envuelve una funcion para contar llamadas, tiempo y memoria
+def instrumentar(funcion, nombre):
+    """
+    Devuelve una versión de la función que suma sus llamadas, su tiempo
+    (incluye el de las funciones que llama) y, en modo memoria, los bytes
+    que quedan asignados al terminar.
+
+    Args:
+        funcion (callable): La función original.
+        nombre (str): El nombre con el que aparece en el resumen.
+
+    Returns:
+        callable: La función instrumentada.
+    """
+    contador = _perfil["contadores"].setdefault(nombre, [0, 0.0, 0])
+    reloj = time.perf_counter
+
+    if _perfil["modo"] == "memoria":
+        import tracemalloc
+        memoria = tracemalloc.get_traced_memory
+
+        @functools.wraps(funcion)
+        def instrumentada(*args, **kwargs):
+            bytes_antes = memoria()[0]
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                contador[1] += reloj() - inicio
+                contador[2] += memoria()[0] - bytes_antes
+                contador[0] += 1
+    else:
+        @functools.wraps(funcion)
+        def instrumentada(*args, **kwargs):
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                contador[1] += reloj() - inicio
+                contador[0] += 1
+
+    return instrumentada
+
+#Activa la instrumentacion
+def activar_perfil(modo, archivo=None):
+    """
+    Reemplaza las funciones de FUNCIONES_INSTRUMENTADAS por sus versiones
+    instrumentadas y registra el resumen para la salida del programa y para
+    la señal SIGUSR1. Sin activarla, las funciones son las originales: no
+    hay ningún costo extra.
+
+    Args:
+        modo (str): Uno de MODOS_PERFIL.
+        archivo (str): Donde guardar el informe (JSON, o el perfil de cProfile
+            en ese modo). Si es None, solo se muestra el resumen.
+
+    Raises:
+        ValueError: Si el modo no existe.
+    """
+    if modo not in MODOS_PERFIL:
+        raise ValueError(f"Modo de perfil inválido: '{modo}' (opciones: {', '.join(MODOS_PERFIL)})")
+    # Activarla dos veces envolvería las funciones dos veces
+    if _perfil["modo"] is not None:
+        return
+    _perfil["modo"] = modo
+    _perfil["archivo"] = archivo
+
+    # Los módulos de perfilado se importan solo acá: sin --profile no cuestan ni el tiempo de importarlos
+    import cProfile
+    import tracemalloc
+    if modo == "memoria":
+        tracemalloc.start()
+
+    espacio = globals()
+    for nombres in FUNCIONES_INSTRUMENTADAS.values():
+        for nombre in nombres:
+            # Los métodos se reemplazan en su clase; las funciones, en el módulo
+            clase, _, metodo = nombre.rpartition(".")
+            contenedor = espacio[clase].__dict__ if clase else espacio
+            instrumentada = instrumentar(contenedor[metodo], nombre)
+            if clase:
+                setattr(espacio[clase], metodo, instrumentada)
+            else:
+                espacio[metodo] = instrumentada
+
+    if modo == "cprofile":
+        # Se enciende después de envolver las funciones para no medir la propia instrumentación
+        _perfil["perfilador"] = cProfile.Profile()
+        _perfil["perfilador"].enable()
+    atexit.register(mostrar_perfil)
+    if hasattr(signal, "SIGUSR1"):
+        # kill -USR1 <pid> muestra el resumen sin cortar el programa
+        signal.signal(signal.SIGUSR1, lambda *_: mostrar_perfil())
+
+#Arma el resumen de la instrumentacion
+def resumen_perfil():
+    """
+    Devuelve los contadores agrupados por operación, sin las funciones que
+    no se llamaron.
+
+    Returns:
+        dict: operación -> lista de {"funcion", "llamadas", "segundos", "segundos_por_llamada", "bytes"}.
+    """
+    resumen = {}
+    for operacion, nombres in FUNCIONES_INSTRUMENTADAS.items():
+        funciones = []
+        for nombre in nombres:
+            llamadas, segundos, asignados = _perfil["contadores"].get(nombre, (0, 0.0, 0))
+            if llamadas:
+                funciones.append({"funcion": nombre, "llamadas": llamadas, "segundos": segundos,
+                                  "segundos_por_llamada": segundos / llamadas, "bytes": asignados})
+        if funciones:
+            resumen[operacion] = sorted(funciones, key=lambda funcion: funcion["segundos"], reverse=True)
+    return resumen
+
+#Muestra el resumen de la instrumentacion
+def mostrar_perfil(salida=None):
+    """
+    Escribe el resumen de la instrumentación (por la salida de errores, para
+    no mezclarlo con los resultados) y guarda el informe si se pidió archivo.
+
+    Args:
+        salida (file): Donde escribir el resumen (por defecto, sys.stderr).
+    """
+    salida = salida or sys.stderr
+    modo = _perfil["modo"]
+    if modo is None:
+        return
+    import pstats
+    import tracemalloc
+
+    lineas = ["", f"--- Perfil ({modo}) ---",
+              f"{'FUNCION':<38} | {'LLAMADAS':>10} | {'TOTAL (ms)':>12} | {'MEDIA (ms)':>11} | {'MEMORIA (KB)':>12}",
+              "=" * 95]
+    resumen = resumen_perfil()
+    for operacion, funciones in resumen.items():
+        lineas.append(f"[{operacion}]")
+        for funcion in funciones:
+            memoria = f"{funcion['bytes'] / 1024:>12.1f}" if modo == "memoria" else f"{'-':>12}"
+            lineas.append(f"{funcion['funcion']:<38} | {funcion['llamadas']:>10} | {funcion['segundos'] * 1000:>12.3f} | "
+                          f"{funcion['segundos_por_llamada'] * 1000:>11.4f} | {memoria}")
+    if not resumen:
+        lineas.append("No se llamó a ninguna función instrumentada.")
+
+    if modo == "memoria":
+        actual, pico = tracemalloc.get_traced_memory()
+        lineas.append(f"\nMemoria actual: {actual / 2 ** 20:.1f} MB | pico: {pico / 2 ** 20:.1f} MB")
+        lineas.append("Líneas que más memoria tienen asignada:")
+        for estadistica in tracemalloc.take_snapshot().statistics("lineno")[:10]:
+            lineas.append(f"  {estadistica}")
+    elif modo == "cprofile":
+        # El resumen no se mide: el perfilador se pausa mientras se arma
+        _perfil["perfilador"].disable()
+        texto = io.StringIO()
+        pstats.Stats(_perfil["perfilador"], stream=texto).sort_stats("cumulative").print_stats(20)
+        lineas.append(texto.getvalue())
+    salida.write("\n".join(lineas) + "\n")
+    salida.flush()
+
+    if _perfil["archivo"]:
+        if modo == "cprofile":
+            # Se puede abrir con pstats o con herramientas como snakeviz
+            _perfil["perfilador"].dump_stats(_perfil["archivo"])
+        else:
+            with open(_perfil["archivo"], 'w', encoding='utf-8') as archivo:
+                json.dump({"modo": modo, "operaciones": resumen}, archivo, ensure_ascii=False, indent=2)
+    if modo == "cprofile":
+        _perfil["perfilador"].enable()
+
+# Modo no interactivo (línea de comandos)
+# Números de la línea de comandos: entero con decimales y exponente opcionales (ej: 1e6, 2.5e3)
+NUMERO_CLI = re.compile(r"([+-]?)(\d+)(?:\.(\d*))?(?:[eE]([+-]?\d+))?", re.ASCII)
+
+#Interpreta un numero entero de la linea de comandos
+def numero_cli(texto):
+    """
+    Convierte un número de la línea de comandos a entero. Acepta notación
+    científica (ej: 1e6, 2.5e3) porque los rangos de población suelen ser
+    grandes, pero solo si el valor es un entero exacto: se calcula con las
+    cifras escritas, sin pasar por float.
+
+    Args:
+        texto (str): El número escrito por el usuario.
+
+    Returns:
+        int: El número entero (entre 0 y sys.maxsize).
+    """
+    try:
+        coincidencia = NUMERO_CLI.fullmatch(texto.strip())
+        if coincidencia is None:
+            raise ValueError(texto)
+        signo, enteros, decimales, exponente = coincidencia.groups()
+        #Cifras y exponente de la ultima cifra (ej: 2.50e3 -> '25' y 2)
+        decimales = (decimales or "").rstrip("0")
+        cifras = (enteros + decimales).lstrip("0")
+        exponente = int(exponente or 0) - len(decimales)
+        if cifras and exponente < 0:
+            #Las cifras que quedan despues de la coma tienen que ser ceros
+            if -exponente > len(cifras) or cifras[exponente:].strip("0"):
+                raise argparse.ArgumentTypeError(f"'{texto}' no es un número entero")
+            cifras, exponente = cifras[:exponente], 0
+        if cifras and len(cifras) + exponente > len(str(sys.maxsize)):
+            raise OverflowError(texto)
+        numero = int(cifras + "0" * exponente) if cifras else 0
+        if numero > sys.maxsize:
+            raise OverflowError(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{texto}' no es un número")
+    except OverflowError:
+        raise argparse.ArgumentTypeError(f"'{texto}' es demasiado grande (máximo: {sys.maxsize})")
+    if numero and signo == "-":
+        raise argparse.ArgumentTypeError("El número debe ser positivo")
+    return numero
+
+#Interpreta un criterio de ordenamiento de la linea de comandos
+def orden_cli(texto):
+    """
+    Convierte 'CLAVE[:asc|desc][,CLAVE[:asc|desc]...]' en las claves y
+    direcciones que espera ordenar_lista.
+
+    Args:
+        texto (str): El criterio, ej: 'CONTINENTE,POBLACION:desc'.
+
+    Returns:
+        tuple: (tupla de claves, tupla de reversas)
+    """
+    claves = []
+    reversas = []
+    for parte in texto.split(","):
+        clave, _, direccion = parte.strip().partition(":")
+        clave = clave.upper()
+        direccion = direccion.lower() or "asc"
+        if clave not in CLAVES_PAIS or direccion not in ("asc", "desc"):
+            raise argparse.ArgumentTypeError(f"Orden inválido: '{parte}' (use CLAVE[:asc|desc] con CLAVE en {', '.join(CLAVES_PAIS)})")
+        claves.append(clave)
+        reversas.append(direccion == "desc")
+    return tuple(claves), tuple(reversas)
+
+#Interpreta el criterio de un ranking de la linea de comandos
+def ranking_cli(texto):
+    """
+    Convierte 'CLAVE[:desc|asc]' en la clave y la dirección que espera
+    ranking_paises. Sin dirección da los mayores (desc).
+
+    Args:
+        texto (str): El criterio, ej: 'SUPERFICIE:asc'.
+
+    Returns:
+        tuple: (clave, mayores)
+    """
+    clave, _, direccion = texto.strip().partition(":")
+    clave = clave.upper()
+    direccion = direccion.lower() or "desc"
+    if clave not in CLAVES_NUMERICAS or direccion not in ("asc", "desc"):
+        raise argparse.ArgumentTypeError(f"Ranking inválido: '{texto}' (use CLAVE[:desc|asc] con CLAVE en {', '.join(CLAVES_NUMERICAS)})")
+    return clave, direccion == "desc"
+
+#Crea el interprete de argumentos
+def crear_parser():
+    """
+    Crea el intérprete de argumentos del programa.
+
+    Returns:
+        argparse.ArgumentParser: El intérprete con los subcomandos search,
+                                 filter, sort, top, stats, import, serve y batch
+                                 (sin subcomando se abre el menú).
+    """
+    parser = argparse.ArgumentParser(prog="main.py", description="Consultas de países sin menú interactivo. Sin subcomando se abre el menú.")
+    parser.add_argument("--data", default="datos_paises.csv", help="Archivo de países: CSV, o SQLite si termina en .db, .sqlite o .sqlite3 (por defecto: datos_paises.csv)")
+    parser.add_argument("--format", choices=("table", "json", "csv"), default="table", help="Formato de salida")
+    parser.add_argument("--workers", type=numero_cli, default=1, help="Procesos para filtros y estadísticas (por defecto: 1, sin procesos extra)")
+    parser.add_argument("--no-pause", action="store_true", help="Menú: mostrar los listados completos, sin paginar ni esperar Enter")
+    parser.add_argument("--profile", choices=MODOS_PERFIL, default=os.environ.get("PAISES_PERFIL"),
+                        help="Medir llamadas, tiempo y memoria de las operaciones y mostrar un resumen al salir (o con SIGUSR1); "
+                             "también con la variable de entorno PAISES_PERFIL")
+    parser.add_argument("--profile-output", default=os.environ.get("PAISES_PERFIL_ARCHIVO"),
+                        help="Archivo del informe del perfil: JSON, o el perfil de cProfile en ese modo (variable PAISES_PERFIL_ARCHIVO)")
+    subcomandos = parser.add_subparsers(dest="comando")
+
+    #--format tambien se acepta despues del subcomando (ej: filter ... --format json)
+    comunes = argparse.ArgumentParser(add_help=False)
+    comunes.add_argument("--format", choices=("table", "json", "csv"), default=argparse.SUPPRESS, help="Formato de salida")
+
+    #Opciones comunes a las consultas que devuelven países
+    def agregar_orden_y_limite(subparser):
+        subparser.add_argument("--sort", type=orden_cli, help="Orden del resultado: CLAVE[:asc|desc][,...]")
+        subparser.add_argument("--limit", type=numero_cli, help="Cantidad máxima de países a mostrar")
+        agregar_explicacion(subparser)
+
+    #Muestra el plan en lugar del resultado (search, filter y sort)
+    def agregar_explicacion(subparser):
+        subparser.add_argument("--explain", action="store_true",
+                               help="Mostrar cómo se resuelve la consulta (pasos, países estimados y reales) en lugar de los países")
+
+    #Criterios de filtro (search, filter, top y stats)
+    def agregar_criterios(subparser):
+        subparser.add_argument("--continent", help="Continente (ignora mayúsculas y tildes)")
+        subparser.add_argument("--pop-min", type=numero_cli, default=0, help="Población mínima")
+        subparser.add_argument("--pop-max", type=numero_cli, help="Población máxima")
+        subparser.add_argument("--area-min", type=numero_cli, default=0, help="Superficie mínima")
+        subparser.add_argument("--area-max", type=numero_cli, help="Superficie máxima")
+
+    buscar = subcomandos.add_parser("search", parents=[comunes], help="Buscar países por nombre (coincidencia parcial), con filtros opcionales")
+    buscar.add_argument("termino", help="Nombre o parte del nombre")
+    agregar_criterios(buscar)
+    agregar_orden_y_limite(buscar)
+
+    filtrar = subcomandos.add_parser("filter", parents=[comunes], help="Filtrar países (los criterios se combinan)")
+    agregar_criterios(filtrar)
+    agregar_orden_y_limite(filtrar)
+
+    ordenar = subcomandos.add_parser("sort", parents=[comunes], help="Listar todos los países ordenados")
+    ordenar.add_argument("orden", type=orden_cli, help="CLAVE[:asc|desc][,...], ej: POBLACION:desc")
+    ordenar.add_argument("--limit", type=numero_cli, help="Cantidad máxima de países a mostrar")
+    agregar_explicacion(ordenar)
+
+    ranking = subcomandos.add_parser("top", parents=[comunes], help="Los K países con mayor (o menor) población o superficie, sin ordenar toda la lista")
+    ranking.add_argument("ranking", type=ranking_cli, help="CLAVE[:desc|asc], ej: POBLACION (los mayores) o SUPERFICIE:asc (los menores)")
+    ranking.add_argument("-k", type=numero_cli, default=10, help="Cantidad de países (por defecto: 10)")
+    agregar_criterios(ranking)
+
+    estadisticas = subcomandos.add_parser("stats", parents=[comunes], help="Estadísticas de la lista de países (o de los que cumplen los criterios)")
+    agregar_criterios(estadisticas)
+    estadisticas.add_argument("--by-continent", action="store_true",
+                              help="Por continente: cantidad, total, promedio, mínimo y máximo de población y superficie, y densidad")
+
+    importar = subcomandos.add_parser("import", parents=[comunes], help="Importar países de un archivo CSV o JSON Lines (se guardan una sola vez)")
+    importar.add_argument("origen", help="Archivo con los países a importar")
+    importar.add_argument("--input-format", choices=("csv", "jsonl"), help="Formato del archivo (por defecto, según la extensión)")
+
+    servicio = subcomandos.add_parser("serve", help="Servicio HTTP/JSON de consultas (carga los datos una vez)")
+    servicio.add_argument("--host", default="127.0.0.1", help="Dirección donde escuchar (por defecto: 127.0.0.1)")
+    servicio.add_argument("--port", type=numero_cli, default=8000, help="Puerto (por defecto: 8000; 0 elige uno libre)")
+
+    lote = subcomandos.add_parser("batch", parents=[comunes], help="Ejecutar un archivo de consultas (una por línea, '-' para la entrada estándar)")
+    lote.add_argument("archivo", help="Archivo con una consulta por línea, ej: filter --continent asia")
+
+    return parser
+
+#Obtiene los criterios de filtro de la linea de comandos
+def criterios_de_argumentos(argumentos):
+    """
+    Convierte las opciones --continent, --pop-* y --area-* en los
+    criterios de Almacenamiento.consultar. Un rango sin máximo no tiene tope.
+
+    Args:
+        argumentos (argparse.Namespace): La consulta (search, filter, top o stats).
+
+    Returns:
+        dict: 'continente', 'poblacion' y 'superficie' (None si no se filtra).
+    """
+    poblacion = superficie = None
+    if argumentos.pop_min or argumentos.pop_max is not None:
+        poblacion = (argumentos.pop_min, argumentos.pop_max if argumentos.pop_max is not None else sys.maxsize)
+    if argumentos.area_min or argumentos.area_max is not None:
+        superficie = (argumentos.area_min, argumentos.area_max if argumentos.area_max is not None else sys.maxsize)
+    return {"continente": argumentos.continent, "poblacion": poblacion, "superficie": superficie}
+
+#Ejecuta una consulta de la linea de comandos
+def ejecutar_consulta(almacenamiento, argumentos):
+    """
+    Ejecuta una consulta ya interpretada sobre el almacenamiento.
+
+    Args:
+        almacenamiento (Almacenamiento): Donde están los países.
+        argumentos (argparse.Namespace): La consulta (search, filter, sort, top o stats).
+
+    Returns:
+        list | dict: Los países encontrados, el diccionario de estadísticas
+                     ({'grupos': ...} con --by-continent) o, con --explain,
+                     el plan de la consulta.
+    """
+    if argumentos.comando == "stats" and argumentos.by_continent:
+        return {"grupos": almacenamiento.agrupar(**criterios_de_argumentos(argumentos))}
+    if argumentos.comando == "stats":
+        return almacenamiento.estadisticas(**criterios_de_argumentos(argumentos))
+    if argumentos.comando == "top":
+        clave, mayores = argumentos.ranking
+        return almacenamiento.ranking(clave, argumentos.k, mayores, **criterios_de_argumentos(argumentos))
+
+    if argumentos.comando == "search":
+        consulta = {"termino": argumentos.termino, "orden": argumentos.sort, "limite": argumentos.limit, **criterios_de_argumentos(argumentos)}
+    elif argumentos.comando == "filter":
+        consulta = {"orden": argumentos.sort, "limite": argumentos.limit, **criterios_de_argumentos(argumentos)}
+    else:
+        consulta = {"orden": argumentos.orden, "limite": argumentos.limit}
+    if argumentos.explain:
+        return almacenamiento.explicar(**consulta)
+    return almacenamiento.consultar(**consulta)
+
+#Convierte el resultado de una consulta en texto
+def formatear_resultado(resultado, formato):
+    """
+    Convierte el resultado de ejecutar_consulta al formato pedido.
+
+    Args:
+        resultado (list | dict): Los países o las estadísticas.
+        formato (str): 'table', 'json' o 'csv'.
+
+    Returns:
+        str: El resultado listo para escribir.
+    """
+    if isinstance(resultado, dict) and "plan" in resultado:
+        return formatear_plan(resultado, formato)
+    if isinstance(resultado, dict) and "grupos" in resultado:
+        return formatear_grupos(resultado["grupos"], formato)
+    if isinstance(resultado, dict):
+        #Estadisticas: los paises extremos se pasan a diccionarios comunes
+        datos = {clave: dict(valor) if isinstance(valor, Mapping) and clave.endswith("_poblacion") else valor
+                 for clave, valor in resultado.items()}
+        if formato == "json":
+            return json.dumps(datos, ensure_ascii=False)
+        lineas = []
+        for clave, valor in datos.items():
+            if isinstance(valor, dict) and clave == "por_continente":
+                lineas.extend(f"por_continente.{continente},{cantidad}" if formato == "csv" else f"{continente}: {cantidad} país/es"
+                              for continente, cantidad in valor.items())
+            elif isinstance(valor, dict):
+                lineas.append(f"{clave},{valor['NOMBRE']},{valor['POBLACION']}" if formato == "csv" else f"{clave}: {valor['NOMBRE']} --> {valor['POBLACION']}")
+            else:
+                lineas.append(f"{clave},{valor}" if formato == "csv" else f"{clave}: {valor}")
+        return "\n".join(lineas)
+
+    if formato == "json":
+        return json.dumps([dict(pais) for pais in resultado], ensure_ascii=False)
+    if formato == "csv":
+        salida = io.StringIO()
+        escritor = csv.DictWriter(salida, fieldnames=list(CLAVES_PAIS), lineterminator="\n")
+        escritor.writeheader()
+        escritor.writerows(resultado)
+        return salida.getvalue().rstrip("\n")
+    return formatear_tabla(resultado) if resultado else "No se encontraron países que cumplan con el requisito"
+
+#Convierte el plan de una consulta en texto
+def formatear_plan(explicacion, formato):
+    """
+    Convierte el resultado de Almacenamiento.explicar al formato pedido.
+
+    Args:
+        explicacion (dict): El plan de la consulta.
+        formato (str): 'table', 'json' o 'csv'.
+
+    Returns:
+        str: El plan listo para escribir.
+    """
+    if formato == "json":
+        return json.dumps(explicacion, ensure_ascii=False)
+
+    #Descripcion de cada paso (los de SQLite solo tienen la estrategia)
+    def criterio(paso):
+        if "clave" not in paso:
+            return ""
+        if paso["clave"] == "NOMBRE":
+            return f"NOMBRE contiene '{paso['valor']}'"
+        if paso["clave"] == "CONTINENTE":
+            return f"CONTINENTE = {paso['valor']}"
+        return f"{paso['clave']} entre {paso['valor'][0]} y {paso['valor'][1]}"
+
+    pasos = explicacion["plan"]
+    if formato == "csv":
+        salida = io.StringIO()
+        escritor = csv.writer(salida, lineterminator="\n")
+        escritor.writerow(["PASO", "CRITERIO", "ESTRATEGIA", "ESTIMADO", "FILAS"])
+        escritor.writerows([numero, criterio(paso), paso["estrategia"], paso.get("estimado", ""), "" if paso.get("filas") is None else paso["filas"]]
+                           for numero, paso in enumerate(pasos, start=1))
+        if explicacion["orden"] is not None:
+            escritor.writerow(["orden", explicacion["orden"], explicacion["estrategia_orden"] or "", "", explicacion["resultado"]])
+        return salida.getvalue().rstrip("\n")
+
+    lineas = [f"Plan de la consulta ({explicacion['motor']}, {explicacion['paises']} países):"]
+    if not pasos:
+        lineas.append("  Sin criterios: toda la lista")
+    for numero, paso in enumerate(pasos, start=1):
+        if "clave" not in paso:
+            lineas.append(f"  {numero}. {paso['estrategia']}")
+            continue
+        filas = "" if paso.get("filas") is None else f", quedan {paso['filas']}"
+        lineas.append(f"  {numero}. {criterio(paso)}: {paso['estrategia']} (estimado {paso['estimado']}{filas})")
+    if explicacion["orden"] is not None:
+        estrategia = f" ({explicacion['estrategia_orden']})" if explicacion["estrategia_orden"] else ""
+        lineas.append(f"  Orden: {explicacion['orden']}{estrategia}")
+    limite = "" if explicacion["limite"] is None else f" (límite {explicacion['limite']})"
+    lineas.append(f"  Resultado: {explicacion['resultado']} país/es{limite} en {explicacion['segundos'] * 1000:.2f} ms")
+    return "\n".join(lineas)
+
+#Convierte los agregados por continente en texto
+def formatear_grupos(grupos, formato):
+    """
+    Convierte el resultado de agrupar_por_continente (o de
+    Almacenamiento.agrupar) al formato pedido: JSON con un objeto por
+    continente, CSV con una fila por continente y una columna por
+    agregado, o un bloque legible por continente.
+
+    Args:
+        grupos (dict): continente -> agregados (ver resumen_grupo).
+        formato (str): 'table', 'json' o 'csv'.
+
+    Returns:
+        str: Los agregados listos para escribir.
+    """
+    if formato == "json":
+        return json.dumps(grupos, ensure_ascii=False)
+    if formato == "csv":
+        salida = io.StringIO()
+        escritor = csv.writer(salida, lineterminator="\n")
+        claves = list(resumen_grupo(1, 0, 0, 0, 0, 0, 0))
+        escritor.writerow(["CONTINENTE"] + [clave.upper() for clave in claves])
+        escritor.writerows([continente] + ["" if agregados[clave] is None else agregados[clave] for clave in claves]
+                           for continente, agregados in grupos.items())
+        return salida.getvalue().rstrip("\n")
+
+    if not grupos:
+        return "No se encontraron países que cumplan con el requisito"
+    lineas = []
+    for continente, agregados in grupos.items():
+        densidad = "sin superficie" if agregados["densidad"] is None else f"{agregados['densidad']:.2f} habitantes/km²"
+        lineas += [f"{continente}: {agregados['cantidad']} país/es",
+                   f"  Población:  total {agregados['total_poblacion']} | promedio {int(agregados['promedio_poblacion'])} | "
+                   f"mínima {agregados['minimo_poblacion']} | máxima {agregados['maximo_poblacion']} habitantes",
+                   f"  Superficie: total {agregados['total_superficie']} | promedio {int(agregados['promedio_superficie'])} | "
+                   f"mínima {agregados['minimo_superficie']} | máxima {agregados['maximo_superficie']} km²",
+                   f"  Densidad:   {densidad}"]
+    return "\n".join(lineas)
+
+#Convierte el informe de una importacion en texto
+def formatear_importacion(resultado, formato):
+    """
+    Convierte el informe de importar_paises al formato pedido.
+
+    Args:
+        resultado (dict): El informe de la importación.
+        formato (str): 'table', 'json' o 'csv'.
+
+    Returns:
+        str: El informe listo para escribir.
+    """
+    if formato == "json":
+        return json.dumps({"agregados": resultado["agregados"], "duplicados": resultado["duplicados"],
+                           "errores": [{"fila": fila, "error": motivo} for fila, motivo in resultado["errores"]]}, ensure_ascii=False)
+    if formato == "csv":
+        lineas = ["FILA,ERROR"] + [f"{fila},{motivo}" for fila, motivo in resultado["errores"]]
+        return "\n".join(lineas)
+    lineas = [f"Países agregados: {resultado['agregados']}", f"Duplicados salteados: {resultado['duplicados']}",
+              f"Filas con error: {len(resultado['errores'])}"]
+    lineas += [f"  Fila {fila}: {motivo}" for fila, motivo in resultado["errores"]]
+    return "\n".join(lineas)
+
+#Carga los datos para consultas de solo lectura
+def cargar_para_consultas(nombre_archivo):
+    """
+    Carga los países para hacer consultas. Si el snapshot está al día y no
+    hay cambios pendientes en el journal, lo abre mapeado en memoria (no
+    lee los datos); si no, usa cargar_datos_csv.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo CSV.
+
+    Returns:
+        ListaPaises: La lista de países.
+    """
+    hay_journal = any(os.path.exists(nombre_archivo + extension) for extension in (".journal", ".compactando"))
+    if not hay_journal:
+        lista_paises = abrir_snapshot_mapeado(nombre_archivo)
+        if lista_paises is not None:
+            return lista_paises
+    return cargar_datos_csv(nombre_archivo)
+
+#Ejecuta un archivo de consultas
+def ejecutar_lote(almacenamiento, parser, archivo, formato, salida):
+    """
+    Ejecuta un archivo de consultas, una por línea con la misma sintaxis que
+    la línea de comandos (ej: 'filter --continent asia --sort POBLACION:desc').
+    Los datos se cargan una sola vez para todo el lote. Las líneas vacías o
+    que empiezan con # se ignoran; una consulta inválida se informa y el
+    lote sigue. Con formato json cada resultado es una línea (JSON Lines).
+
+    Args:
+        almacenamiento (Almacenamiento): Donde están los países.
+        parser (argparse.ArgumentParser): El intérprete de argumentos.
+        archivo (str): Ruta del archivo de consultas, o '-' para la entrada estándar.
+        formato (str): 'table', 'json' o 'csv'.
+        salida (file): Donde se escriben los resultados.
+
+    Returns:
+        int: Cantidad de consultas con error.
+    """
+    errores = 0
+    entrada = sys.stdin if archivo == "-" else open(archivo, 'r', encoding='utf-8')
+    try:
+        for numero_linea, linea in enumerate(entrada, start=1):
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            try:
+                argumentos = parser.parse_args(["--format", formato] + shlex.split(linea))
+                if argumentos.comando is None:
+                    raise ValueError("falta el subcomando")
+                if argumentos.comando in ("batch", "import", "serve"):
+                    raise ValueError(f"'{argumentos.comando}' no se puede usar dentro de un lote")
+                texto = formatear_resultado(ejecutar_consulta(almacenamiento, argumentos), argumentos.format)
+            except (SystemExit, ValueError) as error:
+                # argparse termina con SystemExit ante una consulta inválida
+                errores += 1
+                mensaje = str(error) if isinstance(error, ValueError) else "consulta inválida"
+                texto = json.dumps({"error": mensaje, "linea": numero_linea}, ensure_ascii=False) if formato == "json" else f"Error en la línea {numero_linea}: {mensaje}"
+            salida.write(texto + "\n")
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+    return errores
+
+# Servicio HTTP/JSON
+# Tamaño máximo del cuerpo de una petición (las escrituras son de un solo país)
+LIMITE_CUERPO_HTTP = 64 * 1024
+
+# Hilos que resuelven las consultas del servicio (varias a la vez, sin frenar el bucle de eventos)
+HILOS_LECTURA_HTTP = 4
+
+# Parámetros que aceptan las consultas HTTP (los mismos nombres que las opciones de la línea de comandos)
+PARAMETROS_HTTP = ("q", "continent", "pop_min", "pop_max", "area_min", "area_max", "sort", "limit")
+
+#Interpreta los parametros de una consulta HTTP
+def criterios_http(parametros):
+    """
+    Convierte los parámetros de la URL en los argumentos de consultar_lista,
+    con las mismas reglas que la línea de comandos (--pop-min es pop_min,
+    --sort es sort, etc.).
+
+    Args:
+        parametros (dict): Parámetro -> valor.
+
+    Returns:
+        dict: 'termino', 'continente', 'poblacion', 'superficie', 'orden' y 'limite'.
+
+    Raises:
+        ValueError: Si hay un parámetro desconocido o un número u orden inválido.
+    """
+    desconocidos = sorted(set(parametros) - set(PARAMETROS_HTTP))
+    if desconocidos:
+        raise ValueError(f"Parámetro desconocido: {', '.join(desconocidos)} (opciones: {', '.join(PARAMETROS_HTTP)})")
+    try:
+        numeros = {clave: numero_cli(parametros[clave])
+                   for clave in ("pop_min", "pop_max", "area_min", "area_max", "limit") if clave in parametros}
+        orden = orden_cli(parametros["sort"]) if "sort" in parametros else None
+    except argparse.ArgumentTypeError as error:
+        raise ValueError(str(error))
+    argumentos = argparse.Namespace(continent=parametros.get("continent"),
+                                    pop_min=numeros.get("pop_min", 0), pop_max=numeros.get("pop_max"),
+                                    area_min=numeros.get("area_min", 0), area_max=numeros.get("area_max"))
+    return {"termino": parametros.get("q"), "orden": orden, "limite": numeros.get("limit"), **criterios_de_argumentos(argumentos)}
+
+#Arma una respuesta HTTP
+def respuesta_http(estado, cuerpo, mantener=True):
+    """
+    Args:
+        estado (int): El código HTTP.
+        cuerpo (str): El JSON de la respuesta.
+        mantener (bool): Si la conexión sigue abierta para otra petición.
+
+    Returns:
+        bytes: La respuesta completa.
+    """
+    datos = cuerpo.encode("utf-8")
+    encabezado = (f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}\r\n"
+                  f"Content-Type: application/json; charset=utf-8\r\n"
+                  f"Content-Length: {len(datos)}\r\n"
+                  f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+    return encabezado.encode("latin-1") + datos
+
+#Lee una peticion HTTP de una conexion
+async def leer_peticion(lector):
+    """
+    Lee una petición HTTP/1.1 (línea inicial, encabezados y cuerpo según
+    Content-Length).
+
+    Args:
+        lector (asyncio.StreamReader): La conexión.
+
+    Returns:
+        tuple: (método, ruta, parámetros, encabezados, cuerpo), o None si
+               el cliente cerró la conexión.
+
+    Raises:
+        ValueError: Si la petición está mal formada o el cuerpo es demasiado grande.
+    """
+    linea = await lector.readline()
+    if not linea:
+        return None
+    try:
+        metodo, destino, _ = linea.decode("latin-1").split()
+    except ValueError:
+        raise ValueError("Petición mal formada")
+
+    encabezados = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        encabezados[nombre.strip().lower()] = valor.strip()
+
+    largo = int(encabezados.get("content-length") or 0)
+    if largo > LIMITE_CUERPO_HTTP:
+        raise ValueError(f"El cuerpo supera los {LIMITE_CUERPO_HTTP} bytes")
+    cuerpo = await lector.readexactly(largo) if largo else b""
+
+    partes = urlsplit(destino)
+    # Si un parámetro se repite, vale el último
+    parametros = dict(parse_qsl(partes.query, keep_blank_values=True))
+    return metodo.upper(), unquote(partes.path), parametros, encabezados, cuerpo
+
+# Servicio de consultas sobre la lista en memoria
+class ServicioPaises:
+    """
+    Servicio HTTP/JSON sobre una lista de países que se carga una sola vez.
+
+    Las consultas se resuelven en un grupo de hilos de lectura con los
+    índices de la lista: el bucle de eventos sigue atendiendo las demás
+    conexiones mientras tanto (también cuando un filtro espera a los
+    procesos de un EjecutorParalelo) y una lectura nunca espera a que se
+    guarde una escritura. Las escrituras se hacen de a una (con un candado):
+    esperan a que terminen las lecturas en curso (las nuevas esperan a la
+    escritura), cambian la lista en el bucle y la guardan en un hilo aparte
+    que es el único que usa el almacenamiento (la conexión de SQLite solo se
+    puede usar desde el hilo que la abrió).
+
+    Rutas (las respuestas son JSON, los errores {"error": motivo}):
+        GET /search?q=...       Búsqueda por nombre (admite los filtros, sort y limit)
+        GET /filter?...         continent, pop_min, pop_max, area_min, area_max, sort, limit
+        GET /sort?sort=...      Todos los países ordenados (admite limit)
+        GET /top?by=...         Los k (k=10) con mayor población o superficie; by=CLAVE:asc para los menores (admite los filtros)
+        GET /stats?...          Estadísticas (admite los filtros)
+        GET /groups?...         Agregados por continente (admite los filtros)
+        GET /explain?...        Cómo se resuelve una consulta de /search, /filter o /sort (mismos parámetros)
+        GET /countries/NOMBRE   Un país
+        GET /cache              Aciertos, fallos e invalidaciones de la caché de consultas
+        POST /countries         Alta: {"NOMBRE", "POBLACION", "SUPERFICIE", "CONTINENTE"}
+        PUT /countries/NOMBRE   Modificación: {"POBLACION", "SUPERFICIE"}
+
+    Attributes:
+        nombre_archivo (str): Ruta del archivo de datos.
+        procesos (int): Si es mayor a 1, los filtros y estadísticas usan un EjecutorParalelo.
+        lista (ListaPaises): Los países (None hasta iniciar).
+        almacenamiento (Almacenamiento): Donde se guardan las escrituras (lo usa solo el hilo de escrituras).
+    """
+    def __init__(self, nombre_archivo, procesos=1):
+        self.nombre_archivo = nombre_archivo
+        self.procesos = procesos
+        self.lista = None
+        self.almacenamiento = None
+        self._candado = asyncio.Lock()
+        self._hilo_escrituras = ThreadPoolExecutor(max_workers=1, thread_name_prefix="escrituras")
+        self._hilos_lectura = ThreadPoolExecutor(max_workers=HILOS_LECTURA_HTTP, thread_name_prefix="lecturas")
+        # Lecturas en curso en los hilos, y si una escritura espera para cambiar la lista
+        self._lecturas = 0
+        self._sin_lecturas = asyncio.Event()
+        self._sin_lecturas.set()
+        self._sin_cambios = asyncio.Event()
+        self._sin_cambios.set()
+
+    async def _en_hilo_escrituras(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._hilo_escrituras, funcion, *args)
+
+    async def _en_hilo_lectura(self, funcion, *args):
+        """
+        Ejecuta una lectura de la lista en un hilo de lectura. Si una
+        escritura está esperando para cambiar la lista, espera a que termine.
+        """
+        while not self._sin_cambios.is_set():
+            await self._sin_cambios.wait()
+        self._lecturas += 1
+        self._sin_lecturas.clear()
+        futuro = asyncio.get_running_loop().run_in_executor(self._hilos_lectura, funcion, *args)
+        # La lectura se da por terminada cuando termina el hilo (aunque se cancele la petición)
+        futuro.add_done_callback(self._terminar_lectura)
+        return await futuro
+
+    def _terminar_lectura(self, futuro):
+        self._lecturas -= 1
+        if not self._lecturas:
+            self._sin_lecturas.set()
+
+    async def _detener_lecturas(self):
+        """
+        Frena las lecturas nuevas y espera a que terminen las que están en
+        curso: desde que vuelve y hasta _reanudar_lecturas se puede cambiar
+        la lista en el bucle (sin await de por medio).
+        """
+        self._sin_cambios.clear()
+        while self._lecturas:
+            await self._sin_lecturas.wait()
+
+    def _reanudar_lecturas(self):
+        self._sin_cambios.set()
+
+    def _abrir(self):
+        self.almacenamiento = abrir_almacenamiento(self.nombre_archivo)
+        lista = self.almacenamiento.cargar()
+        if self.procesos > 1:
+            lista.ejecutor = EjecutorParalelo(lista, self.procesos)
+        # Los índices se arman antes de atender, para que ninguna consulta pague su construcción
+        lista.indice_nombres
+        lista.indice_trigramas
+        for clave in CLAVES_NUMERICAS:
+            lista.indice_ordenado(clave)
+        return lista
+
+    def _cerrar(self):
+        self.almacenamiento.cerrar()
+        if self.lista.ejecutor is not None:
+            self.lista.ejecutor.cerrar()
+
+    async def iniciar(self):
+        """
+        Abre el almacenamiento y carga la lista (en el hilo de escrituras).
+        """
+        self.lista = await self._en_hilo_escrituras(self._abrir)
+
+    async def cerrar(self):
+        """
+        Cierra el almacenamiento y el ejecutor paralelo.
+        """
+        if self.almacenamiento is not None:
+            await self._en_hilo_escrituras(self._cerrar)
+        self._hilo_escrituras.shutdown()
+        self._hilos_lectura.shutdown()
+
+    def consultar(self, ruta, parametros):
+        """
+        Resuelve una consulta de solo lectura.
+
+        Args:
+            ruta (str): '/search', '/filter', '/sort', '/top', '/stats', '/groups' o '/explain'.
+            parametros (dict): Los parámetros de la URL.
+
+        Returns:
+            list | dict: Los países o las estadísticas.
+
+        Raises:
+            ValueError: Si faltan parámetros o son inválidos.
+        """
+        if ruta == "/top":
+            # El ranking tiene sus propios parámetros: by (como en 'main.py top') y k
+            parametros = dict(parametros)
+            if "by" not in parametros:
+                raise ValueError("Falta el parámetro 'by'")
+            try:
+                clave, mayores = ranking_cli(parametros.pop("by"))
+                k = numero_cli(parametros.pop("k", "10"))
+            except argparse.ArgumentTypeError as error:
+                raise ValueError(str(error))
+            criterios = criterios_http(parametros)
+            if criterios["termino"] is not None or criterios["orden"] is not None or criterios["limite"] is not None:
+                raise ValueError("/top solo admite by, k, continent, pop_min, pop_max, area_min y area_max")
+            return ranking_lista(self.lista, clave, k, mayores, criterios["continente"], criterios["poblacion"], criterios["superficie"])
+
+        criterios = criterios_http(parametros)
+        if ruta in ("/stats", "/groups"):
+            if criterios["termino"] is not None or criterios["orden"] is not None or criterios["limite"] is not None:
+                raise ValueError(f"{ruta} solo admite continent, pop_min, pop_max, area_min y area_max")
+            if ruta == "/groups":
+                return {"grupos": agrupar_lista(self.lista, criterios["continente"], criterios["poblacion"], criterios["superficie"])}
+            return estadisticas_lista(self.lista, criterios["continente"], criterios["poblacion"], criterios["superficie"])
+        if ruta == "/search" and not criterios["termino"]:
+            raise ValueError("Falta el parámetro 'q'")
+        if ruta == "/sort" and criterios["orden"] is None:
+            raise ValueError("Falta el parámetro 'sort'")
+        if ruta == "/explain":
+            return explicar_consulta(self.lista, **criterios)
+        return consultar_lista(self.lista, **criterios)
+
+    async def agregar(self, datos):
+        """
+        Agrega un país y lo guarda.
+
+        Args:
+            datos (dict): El país recibido.
+
+        Returns:
+            tuple: (código HTTP, país agregado o error)
+        """
+        pais = validar_pais(datos)
+        async with self._candado:
+            await self._detener_lecturas()
+            try:
+                existente = buscar_pais_lista(self.lista, pais["NOMBRE"])
+                if existente:
+                    return 409, {"error": f"El país '{existente['NOMBRE']}' ya existe en la lista."}
+                self.lista.append(pais)
+            finally:
+                self._reanudar_lecturas()
+            await self._en_hilo_escrituras(self.almacenamiento.guardar_cambio, self.lista, "ALTA", pais)
+        return 201, pais
+
+    async def actualizar(self, nombre, datos):
+        """
+        Actualiza la población y la superficie de un país y lo guarda.
+
+        Args:
+            nombre (str): El nombre del país (ignora mayúsculas y tildes).
+            datos (dict): Los datos nuevos.
+
+        Returns:
+            tuple: (código HTTP, país actualizado o error)
+        """
+        nuevos = validar_pais(datos, claves=CLAVES_NUMERICAS)
+        async with self._candado:
+            await self._detener_lecturas()
+            try:
+                pais = buscar_pais_lista(self.lista, nombre)
+                if not pais:
+                    return 404, {"error": f"El país '{nombre}' no se encontró en la lista."}
+                modificar_pais(self.lista, pais, nuevos["POBLACION"], nuevos["SUPERFICIE"])
+            finally:
+                self._reanudar_lecturas()
+            await self._en_hilo_escrituras(self.almacenamiento.guardar_cambio, self.lista, "MODIFICACION", pais)
+        return 200, dict(pais)
+
+    async def responder(self, metodo, ruta, parametros, cuerpo):
+        """
+        Resuelve una petición.
+
+        Returns:
+            tuple: (código HTTP, texto JSON)
+        """
+        try:
+            if ruta in ("/search", "/filter", "/sort", "/top", "/stats", "/groups", "/explain"):
+                if metodo != "GET":
+                    return 405, json.dumps({"error": f"{ruta} solo admite GET"}, ensure_ascii=False)
+                # El JSON se arma en el hilo: los países del resultado leen la lista
+                return 200, await self._en_hilo_lectura(lambda: formatear_resultado(self.consultar(ruta, parametros), "json"))
+
+            if ruta == "/cache" and metodo == "GET":
+                return 200, json.dumps(self.lista.cache_consultas.estadisticas())
+
+            if ruta == "/countries" or ruta.startswith("/countries/"):
+                nombre = ruta[len("/countries/"):]
+                if metodo == "GET" and nombre:
+                    pais = buscar_pais_lista(self.lista, nombre)
+                    if not pais:
+                        return 404, json.dumps({"error": f"El país '{nombre}' no se encontró en la lista."}, ensure_ascii=False)
+                    return 200, json.dumps(dict(pais), ensure_ascii=False)
+                if metodo in ("POST", "PUT") and bool(nombre) == (metodo == "PUT"):
+                    try:
+                        datos = json.loads(cuerpo or b"{}")
+                    except ValueError:
+                        raise ValueError("El cuerpo no es un JSON válido")
+                    if not isinstance(datos, dict):
+                        raise ValueError("El cuerpo tiene que ser un objeto JSON")
+                    estado, resultado = await (self.actualizar(nombre, datos) if nombre else self.agregar(datos))
+                    return estado, json.dumps(resultado, ensure_ascii=False)
+                return 405, json.dumps({"error": f"Método {metodo} no admitido en {ruta}"}, ensure_ascii=False)
+
+            return 404, json.dumps({"error": f"Ruta desconocida: {ruta}"}, ensure_ascii=False)
+        except (ValueError, OverflowError) as error:
+            # OverflowError: un número que no entra en las columnas o en SQLite
+            return 400, json.dumps({"error": str(error)}, ensure_ascii=False)
+
+    async def atender(self, lector, escritor):
+        """
+        Atiende una conexión: responde peticiones hasta que el cliente la
+        cierre (HTTP/1.1 mantiene la conexión abierta entre peticiones).
+
+        Args:
+            lector (asyncio.StreamReader): Lo que envía el cliente.
+            escritor (asyncio.StreamWriter): Lo que se le responde.
+        """
+        try:
+            while True:
+                try:
+                    peticion = await leer_peticion(lector)
+                except ValueError as error:
+                    escritor.write(respuesta_http(400, json.dumps({"error": str(error)}, ensure_ascii=False), mantener=False))
+                    break
+                if peticion is None:
+                    break
+                metodo, ruta, parametros, encabezados, cuerpo = peticion
+                estado, texto = await self.responder(metodo, ruta, parametros, cuerpo)
+                mantener = encabezados.get("connection", "").lower() != "close"
+                escritor.write(respuesta_http(estado, texto, mantener))
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # El cliente se fue a mitad de una petición
+            pass
+        finally:
+            escritor.close()
+
+#Inicia el servicio HTTP
+async def servir(nombre_archivo, host="127.0.0.1", puerto=8000, procesos=1):
+    """
+    Carga los países y atiende peticiones HTTP hasta recibir Ctrl+C o SIGTERM.
+
+    Args:
+        nombre_archivo (str): Ruta del archivo de datos (CSV o SQLite).
+        host (str): Dirección donde escuchar.
+        puerto (int): Puerto donde escuchar (0 elige uno libre).
+        procesos (int): Procesos para filtros y estadísticas (ver EjecutorParalelo).
+    """
+    servicio = ServicioPaises(nombre_archivo, procesos)
+    await servicio.iniciar()
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+
+    detener = asyncio.Event()
+    bucle = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            bucle.add_signal_handler(senal, detener.set)
+        except (NotImplementedError, RuntimeError):
+            # En Windows no hay manejadores de señales en el bucle: Ctrl+C corta asyncio.run
+            pass
+
+    direccion = servidor.sockets[0].getsockname()
+    print(f"Servicio escuchando en http://{direccion[0]}:{direccion[1]} ({len(servicio.lista)} países de {nombre_archivo})", flush=True)
+    try:
+        async with servidor:
+            await detener.wait()
+    finally:
+        await servicio.cerrar()
+    print("Servicio detenido.")
+
+#Punto de entrada del modo no interactivo
+def cli(argv):
+    """
+    Interpreta los argumentos; sin subcomando abre el menú. Si no, carga
+    los datos una vez, ejecuta la consulta (o el lote) y escribe el resultado.
+
+    Args:
+        argv (list): Los argumentos de la línea de comandos (sin el programa).
+
+    Returns:
+        int: Código de salida (0 si todo salió bien).
+    """
+    parser = crear_parser()
+    argumentos = parser.parse_args(argv)
+
+    # La instrumentación se activa antes de cargar los datos para medir también la carga
+    if argumentos.profile:
+        activar_perfil(argumentos.profile, argumentos.profile_output)
+
+    # Sin subcomando se abre el menú interactivo
+    if argumentos.comando is None:
+        main(argumentos.data, pausar=not argumentos.no_pause)
+        return 0
+
+    # El servicio abre su propio almacenamiento (en el hilo que guarda las escrituras)
+    if argumentos.comando == "serve":
+        asyncio.run(servir(argumentos.data, argumentos.host, argumentos.port, argumentos.workers))
+        return 0
+
+    # Con --workers los filtros y las estadísticas del CSV se reparten entre procesos (un solo grupo para todo el lote)
+    with abrir_almacenamiento(argumentos.data, argumentos.workers) as almacenamiento:
+        if argumentos.comando == "import":
+            # La importación modifica los datos: se cargan completos (con el journal)
+            lista_paises = almacenamiento.cargar()
+            try:
+                resultado = importar_paises(lista_paises, argumentos.origen, almacenamiento, formato=argumentos.input_format)
+            except OSError as error:
+                parser.error(f"No se pudo importar '{argumentos.origen}': {error.strerror}")
+            sys.stdout.write(formatear_importacion(resultado, argumentos.format) + "\n")
+            return 1 if resultado["errores"] else 0
+
+        if argumentos.comando == "batch":
+            try:
+                errores = ejecutar_lote(almacenamiento, parser, argumentos.archivo, argumentos.format, sys.stdout)
+            except OSError as error:
+                parser.error(f"No se pudo leer el lote '{argumentos.archivo}': {error.strerror}")
+            return 1 if errores else 0
+
+        resultado = ejecutar_consulta(almacenamiento, argumentos)
+        if argumentos.format == "table" and isinstance(resultado, list) and resultado:
+            # Las tablas grandes se escriben por bloques, sin armar todo el texto
+            escribir_tabla(resultado, sys.stdout)
+        else:
+            sys.stdout.write(formatear_resultado(resultado, argumentos.format) + "\n")
+        return 0
+
 # Llamado a función principal del programa
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    # Con un subcomando se ejecuta una consulta; sin subcomando, el menú
+    sys.exit(cli(sys.argv[1:]))
\ No newline at end of file
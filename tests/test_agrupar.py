@@ -0,0 +1,105 @@
+# Pruebas de los agregados por continente contra un cálculo directo
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+from utilidades import criterios_al_azar, main, paises_al_azar
+
+
+#Agregados de referencia: un diccionario por continente, país por país
+def agrupar_directo(paises):
+    """
+    Returns:
+        dict: continente -> agregados, con las mismas claves que resumen_grupo.
+    """
+    grupos = {}
+    for pais in paises:
+        grupos.setdefault(pais["CONTINENTE"], []).append(pais)
+    resultado = {}
+    for continente, lista in grupos.items():
+        poblaciones = [pais["POBLACION"] for pais in lista]
+        superficies = [pais["SUPERFICIE"] for pais in lista]
+        resultado[continente] = {
+            "cantidad": len(lista),
+            "total_poblacion": sum(poblaciones), "promedio_poblacion": sum(poblaciones) / len(lista),
+            "minimo_poblacion": min(poblaciones), "maximo_poblacion": max(poblaciones),
+            "total_superficie": sum(superficies), "promedio_superficie": sum(superficies) / len(lista),
+            "minimo_superficie": min(superficies), "maximo_superficie": max(superficies),
+            "densidad": sum(poblaciones) / sum(superficies) if sum(superficies) else None,
+        }
+    return resultado
+
+
+class PruebasAgrupar(unittest.TestCase):
+    """
+    agrupar_por_continente y agrupar_lista (columnas, posiciones e iterables)
+    dan lo mismo que agrupar país por país.
+    """
+    def test_al_azar(self):
+        generador = random.Random(25)
+        for cantidad in (0, 1, 30, 400):
+            paises = paises_al_azar(generador, cantidad)
+            lista = main.ListaPaises(paises)
+            self.assertEqual(main.agrupar_por_continente(lista), agrupar_directo(paises))
+            self.assertEqual(main.agrupar_por_continente(iter(paises)), agrupar_directo(paises))
+            for _ in range(40):
+                criterios = criterios_al_azar(generador, paises)
+                del criterios["termino"]
+                posiciones = main.filtrar_posiciones(lista, criterios["continente"], criterios["poblacion"], criterios["superficie"])
+                esperado = agrupar_directo([paises[i] for i in posiciones])
+                self.assertEqual(main.agrupar_lista(lista, **criterios), esperado, criterios)
+                self.assertEqual(main.agrupar_por_continente(lista, posiciones), esperado, criterios)
+
+    def test_orden_de_los_continentes(self):
+        paises = [{"NOMBRE": nombre, "POBLACION": 1, "SUPERFICIE": 0, "CONTINENTE": continente}
+                  for nombre, continente in (("A", "Asia"), ("B", "Europa"), ("C", "Asia"), ("D", "África"))]
+        grupos = main.agrupar_por_continente(main.ListaPaises(paises))
+        self.assertEqual(list(grupos), ["Asia", "Europa", "África"])
+        self.assertIsNone(grupos["Asia"]["densidad"])
+
+
+class PruebasMenu(unittest.TestCase):
+    """
+    El resumen del menú no pide nada con --no-pause; la exportación es una
+    opción aparte.
+    """
+    def setUp(self):
+        self.pausar = main._pantalla["pausar"]
+        self.paises = paises_al_azar(random.Random(26), 20)
+
+    def tearDown(self):
+        main._pantalla["pausar"] = self.pausar
+
+    def ejecutar(self, funcion, entrada):
+        entrada_original = sys.stdin
+        sys.stdin = io.StringIO(entrada)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) as salida:
+                funcion(main.ListaPaises(self.paises))
+        finally:
+            sys.stdin = entrada_original
+        return salida.getvalue()
+
+    def test_resumen_sin_pausa(self):
+        main._pantalla["pausar"] = False
+        # Sin entrada: cualquier input() terminaría con EOFError
+        salida = self.ejecutar(main.paises_por_continente, "")
+        self.assertIn("Resumen por continente", salida)
+
+    def test_exportar(self):
+        main._pantalla["pausar"] = False
+        with tempfile.TemporaryDirectory() as carpeta:
+            nombre_archivo = os.path.join(carpeta, "resumen.json")
+            self.ejecutar(main.exportar_resumen_continentes, nombre_archivo + "\n")
+            with open(nombre_archivo, encoding='utf-8') as archivo:
+                self.assertEqual(json.load(archivo), json.loads(json.dumps(agrupar_directo(self.paises))))
+        self.assertIn("cancelada", self.ejecutar(main.exportar_resumen_continentes, "\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
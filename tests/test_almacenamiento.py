@@ -0,0 +1,122 @@
+# Pruebas de los almacenamientos: la interfaz y SQLite contra las consultas en memoria
+import os
+import random
+import tempfile
+import unittest
+
+from utilidades import ORDENES, criterios_al_azar, main, paises_al_azar
+
+
+class PruebasInterfaz(unittest.TestCase):
+    """
+    Un almacenamiento al que le falta un método no se puede crear.
+    """
+    def test_metodos_abstractos(self):
+        metodos = {"cargar", "guardar", "guardar_cambio", "importar", "consultar",
+                   "estadisticas", "agrupar", "explicar", "ranking"}
+        self.assertEqual(main.Almacenamiento.__abstractmethods__, metodos)
+
+        class Incompleto(main.Almacenamiento):
+            def cargar(self):
+                return main.ListaPaises()
+        with self.assertRaises(TypeError):
+            Incompleto("paises.csv")
+        # Los dos motores implementan todo
+        with tempfile.TemporaryDirectory() as carpeta:
+            for nombre in ("paises.csv", "paises.db"):
+                with main.abrir_almacenamiento(os.path.join(carpeta, nombre)) as almacenamiento:
+                    self.assertIsInstance(almacenamiento, main.Almacenamiento)
+
+
+class PruebasSQLite(unittest.TestCase):
+    """
+    AlmacenamientoSQLite.consultar (resuelto con SQL) contra consultar_lista.
+    """
+    def test_consultas_al_azar(self):
+        generador = random.Random(6)
+        paises = paises_al_azar(generador, 300)
+        lista = main.ListaPaises(paises)
+        with tempfile.TemporaryDirectory() as carpeta:
+            with main.abrir_almacenamiento(os.path.join(carpeta, "paises.db")) as almacenamiento:
+                almacenamiento.guardar(lista)
+                for _ in range(300):
+                    consulta = {**criterios_al_azar(generador, paises), "orden": generador.choice(ORDENES),
+                                "limite": generador.choice((None, 0, 1, 5, 50))}
+                    esperado = [dict(pais) for pais in main.consultar_lista(lista, **consulta)]
+                    self.assertEqual(almacenamiento.consultar(**consulta), esperado, consulta)
+
+    def test_estadisticas_y_agregados(self):
+        generador = random.Random(7)
+        paises = paises_al_azar(generador, 200)
+        lista = main.ListaPaises(paises)
+        with tempfile.TemporaryDirectory() as carpeta:
+            with main.abrir_almacenamiento(os.path.join(carpeta, "paises.db")) as almacenamiento:
+                almacenamiento.guardar(lista)
+                for _ in range(50):
+                    criterios = criterios_al_azar(generador, paises)
+                    del criterios["termino"]
+                    estadisticas = main.estadisticas_lista(lista, **criterios)
+                    estadisticas = {clave: dict(valor) if isinstance(valor, main.Mapping) else valor for clave, valor in estadisticas.items()}
+                    self.assertEqual(almacenamiento.estadisticas(**criterios), estadisticas, criterios)
+                    self.assertEqual(almacenamiento.agrupar(**criterios), main.agrupar_lista(lista, **criterios), criterios)
+
+
+class PruebasCerrar(unittest.TestCase):
+    """
+    Cerrar el almacenamiento CSV libera la lista que abrió para consultar.
+    """
+    def test_cierra_el_snapshot_mapeado(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            nombre_archivo = os.path.join(carpeta, "paises.csv")
+            paises = paises_al_azar(random.Random(8), 30)
+            main.escribir_csv_atomico(paises, nombre_archivo)
+            main.escribir_snapshot(main.ListaPaises(paises), nombre_archivo)
+            with main.abrir_almacenamiento(nombre_archivo) as almacenamiento:
+                lista = almacenamiento.lista_consultas()
+                self.assertIsInstance(lista, main.ListaPaisesMapeada)
+                self.assertEqual(almacenamiento.consultar(), paises)
+            self.assertTrue(lista._mapa.closed)
+
+
+class PruebasNombresRepetidos(unittest.TestCase):
+    """
+    La lista y el CSV aceptan nombres repetidos (con otras mayúsculas o
+    tildes): SQLite los guarda igual y modifica el primero.
+    """
+    PAISES = [{"NOMBRE": "Argentina", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "América"},
+              {"NOMBRE": "ARGENTINA", "POBLACION": 2, "SUPERFICIE": 2, "CONTINENTE": "América"},
+              {"NOMBRE": "Japón", "POBLACION": 3, "SUPERFICIE": 3, "CONTINENTE": "Asia"}]
+
+    def test_csv_a_sqlite(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            nombre_csv = os.path.join(carpeta, "paises.csv")
+            main.escribir_csv_atomico(self.PAISES, nombre_csv)
+            lista = main.cargar_datos_csv(nombre_csv)
+            with main.abrir_almacenamiento(os.path.join(carpeta, "paises.db")) as almacenamiento:
+                almacenamiento.guardar(lista)
+                pais = main.buscar_pais_lista(lista, "argentina")
+                main.modificar_pais(lista, pais, 10, 20)
+                almacenamiento.guardar_cambio(lista, "MODIFICACION", pais)
+                self.assertEqual([dict(pais) for pais in almacenamiento.cargar()], [dict(pais) for pais in lista])
+                self.assertEqual(lista[0]["POBLACION"], 10)
+
+    def test_base_con_nombre_unico(self):
+        # Una base creada cuando el nombre normalizado era UNIQUE se convierte al abrirla
+        with tempfile.TemporaryDirectory() as carpeta:
+            nombre_base = os.path.join(carpeta, "paises.db")
+            conexion = main.sqlite3.connect(nombre_base)
+            conexion.executescript("""
+                CREATE TABLE paises (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL, nombre_normalizado TEXT NOT NULL UNIQUE,
+                                     poblacion INTEGER NOT NULL, superficie INTEGER NOT NULL,
+                                     continente TEXT NOT NULL, continente_normalizado TEXT NOT NULL);
+                INSERT INTO paises VALUES (7, 'Chile', 'chile', 5, 6, 'América', 'america');
+            """)
+            conexion.close()
+            with main.abrir_almacenamiento(nombre_base) as almacenamiento:
+                self.assertEqual(almacenamiento.consultar(), [{"NOMBRE": "Chile", "POBLACION": 5, "SUPERFICIE": 6, "CONTINENTE": "América"}])
+                almacenamiento.guardar(main.ListaPaises(self.PAISES))
+                self.assertEqual(almacenamiento.consultar(termino="argentina"), self.PAISES[:2])
+
+
+if __name__ == "__main__":
+    unittest.main()
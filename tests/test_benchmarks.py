@@ -0,0 +1,56 @@
+# Pruebas de la suite de benchmarks: corre todas las operaciones y detecta regresiones
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# La suite, para ejecutarla como desde la terminal
+SUITE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "benchmark_suite.py")
+
+
+class PruebasSuite(unittest.TestCase):
+    """
+    Una corrida corta de benchmark_suite.py mide todas las operaciones del
+    menú sin pedir entrada, y --comparar termina con código 1 si alguna
+    operación empeoró más que el umbral.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.salida = os.path.join(self.carpeta.name, "resultados.json")
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def ejecutar(self, *argumentos):
+        return subprocess.run([sys.executable, SUITE, "--cantidades", "200", "--presupuesto", "0", "--minimo", "1",
+                               "--maximo", "1", "--salida", self.salida, *argumentos],
+                              capture_output=True, text=True, encoding="utf-8", stdin=subprocess.DEVNULL, timeout=120)
+
+    def test_corrida_y_regresiones(self):
+        resultado = self.ejecutar()
+        self.assertEqual(resultado.returncode, 0, resultado.stderr)
+        with open(self.salida, encoding='utf-8') as archivo:
+            informe = json.load(archivo)
+        operaciones = [r["operacion"] for r in informe["resultados"]]
+        self.assertEqual(len(operaciones), len(set(operaciones)))
+        for nombre in ("cargar_datos_csv", "buscar_pais", "filtro_combinado", "ordenar_lista", "promedio_poblacion"):
+            self.assertTrue(any(nombre in operacion for operacion in operaciones), nombre)
+        for r in informe["resultados"]:
+            self.assertEqual((r["cantidad"], r["repeticiones"]), (200, 1), r["operacion"])
+            self.assertTrue(r["min_s"] <= r["p50_s"] <= r["max_s"], r["operacion"])
+
+        # Una corrida anterior mucho más rápida: todas las operaciones son regresiones
+        anterior = os.path.join(self.carpeta.name, "anterior.json")
+        for r in informe["resultados"]:
+            r["p50_s"] /= 1000
+        with open(anterior, 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo)
+        resultado = self.ejecutar("--comparar", anterior)
+        self.assertEqual(resultado.returncode, 1, resultado.stderr)
+        self.assertIn("regresión", resultado.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
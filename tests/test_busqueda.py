@@ -0,0 +1,76 @@
+# Pruebas de la búsqueda por nombre: normalización, índice de nombres e índice de trigramas
+import random
+import unittest
+
+from utilidades import main, paises_al_azar
+
+
+#Normalización de referencia: un reemplazo por letra, como la versión original
+def normalizar_directo(texto):
+    texto = texto.lower()
+    for letras, letra in (("áàäâ", "a"), ("éèëê", "e"), ("íìïî", "i"), ("óòöô", "o"), ("úùüû", "u"), ("ñ", "n")):
+        for marcada in letras:
+            texto = texto.replace(marcada, letra)
+    return texto
+
+
+class PruebasNormalizacion(unittest.TestCase):
+    """
+    normalizar_texto con la tabla de str.translate da lo mismo que
+    reemplazar letra por letra, con textos ASCII y no ASCII.
+    """
+    def test_contra_reemplazos(self):
+        generador = random.Random(10)
+        letras = "aAzZ09 -'" + "áéíóúàèìòùäëïöüâêîôûñ" + "ÁÉÍÓÚÀÈÌÒÙÄËÏÖÜÂÊÎÔÛÑ" + "çÇøßİ€中"
+        for _ in range(2000):
+            texto = "".join(generador.choices(letras, k=generador.randrange(12)))
+            self.assertEqual(main.normalizar_texto(texto), normalizar_directo(texto), texto)
+        self.assertEqual(main.normalizar_texto("Perú"), main.normalizar_texto("PERU"))
+
+
+class PruebasBuscarPais(unittest.TestCase):
+    """
+    buscar_pais_lista con el índice de una ListaPaises devuelve el mismo
+    país que el recorrido de una lista común, también con nombres
+    repetidos y después de agregar países.
+    """
+    def test_contra_recorrido(self):
+        generador = random.Random(2)
+        paises = paises_al_azar(generador, 300)
+        # Nombres repetidos con otras mayúsculas y tildes: gana el primero
+        paises += [{**pais, "NOMBRE": pais["NOMBRE"].upper(), "POBLACION": -1} for pais in paises[:20]]
+        lista = main.ListaPaises(paises[:150])
+        lista.indice_nombres
+        for pais in paises[150:]:
+            lista.append(pais)
+
+        buscados = [pais["NOMBRE"] for pais in generador.sample(paises, 100)] + ["Marte", "", "ARGENTI"]
+        for nombre in buscados + [main.normalizar_texto(nombre).upper() for nombre in buscados]:
+            esperado = main.buscar_pais_lista(paises, nombre)
+            encontrado = main.buscar_pais_lista(lista, nombre)
+            self.assertEqual(None if encontrado is None else dict(encontrado), esperado, nombre)
+
+
+class PruebasBuscarPorNombre(unittest.TestCase):
+    """
+    buscar_por_nombre con el índice de trigramas (y la caché de búsquedas)
+    da lo mismo que normalizar y buscar en cada nombre, intercalando altas.
+    """
+    def test_contra_recorrido(self):
+        generador = random.Random(3)
+        paises = paises_al_azar(generador, 400)
+        lista = main.ListaPaises(paises[:200])
+        for paso in range(300):
+            if paso % 3 == 0 and len(lista) < len(paises):
+                lista.append(paises[len(lista)])
+            nombre = generador.choice(paises[:len(lista)])["NOMBRE"]
+            inicio = generador.randrange(len(nombre))
+            termino = generador.choice((nombre[inicio:inicio + generador.randint(1, 6)], nombre.upper(), "ÑA", "zzz", " "))
+            esperado = [pais for pais in paises[:len(lista)]
+                        if main.normalizar_texto(termino) in main.normalizar_texto(pais["NOMBRE"])]
+            self.assertEqual([dict(pais) for pais in main.buscar_por_nombre(lista, termino)], esperado, termino)
+            self.assertEqual(main.buscar_por_nombre(paises[:len(lista)], termino), esperado, termino)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# Pruebas de la caché de consultas: lo que queda guardado tiene que coincidir con volver a calcular
+import random
+import unittest
+
+from utilidades import consulta_lineal, criterios_al_azar, main, paises_al_azar
+
+
+class PruebasInvalidacion(unittest.TestCase):
+    """
+    Después de cada append o actualizar, las consultas (que pueden salir de
+    la caché) dan lo mismo que un recorrido de los datos actuales.
+    """
+    def consultar(self, lista, criterios, orden):
+        termino = criterios["termino"]
+        filtros = (criterios["continente"], criterios["poblacion"], criterios["superficie"])
+        if termino is not None and not any(filtro is not None for filtro in filtros):
+            # Búsqueda por nombre sola: clave 'nombre'
+            return [pais.posicion for pais in main.buscar_por_nombre(lista, termino)], consulta_lineal(self.paises, termino)
+        if orden is not None and termino is None and not any(filtro is not None for filtro in filtros):
+            # Ordenamiento de toda la lista: clave 'orden'
+            obtenido = [pais.posicion for pais in main.ordenar_lista(lista, *orden)]
+            return obtenido, consulta_lineal(self.paises, orden=orden)
+        # Filtros, con o sin nombre: claves 'filtro' y 'consulta'
+        return list(main.filtrar_posiciones(lista, *filtros, termino)), consulta_lineal(self.paises, **criterios)
+
+    def comprobar_grupos(self, cache):
+        """
+        Cada resultado guardado está en un solo grupo de claves, y los grupos
+        no tienen claves de más.
+        """
+        grupos = [cache._ordenes, cache._ordenes_numericos, cache._nombres, *cache._filtros_por_continente.values()]
+        claves = [clave for grupo in grupos for clave in grupo]
+        self.assertEqual(sorted(map(repr, claves)), sorted(map(repr, cache._resultados)))
+        self.assertTrue(all(cache._filtros_por_continente.values()))
+
+    def test_cambios_al_azar(self):
+        generador = random.Random(11)
+        self.paises = paises_al_azar(generador, 300)
+        lista = main.ListaPaises(self.paises)
+        # Pocos lugares: también se prueba el descarte por LRU
+        lista.cache_consultas.capacidad = 25
+        ordenes = ((("NOMBRE",), (False,)), (("CONTINENTE", "SUPERFICIE"), (True, False)), (("POBLACION", "NOMBRE"), (False, True)))
+
+        for paso in range(3000):
+            eleccion = generador.random()
+            if eleccion < 0.05:
+                pais = paises_al_azar(generador, 1)[0]
+                pais["NOMBRE"] += f" nuevo {paso}"
+                lista.append(pais)
+                self.paises.append(dict(pais))
+            elif eleccion < 0.25:
+                posicion = generador.randrange(len(self.paises))
+                poblacion, superficie = generador.randrange(10), generador.randrange(10)
+                lista.actualizar(posicion, poblacion, superficie)
+                self.paises[posicion].update(POBLACION=poblacion, SUPERFICIE=superficie)
+            else:
+                criterios = criterios_al_azar(generador, self.paises)
+                orden = generador.choice(ordenes) if generador.random() < 0.3 else None
+                if orden is not None:
+                    criterios = {"termino": None, "continente": None, "poblacion": None, "superficie": None}
+                obtenido, esperado = self.consultar(lista, criterios, orden)
+                self.assertEqual(obtenido, esperado, (paso, criterios, orden))
+            self.comprobar_grupos(lista.cache_consultas)
+
+        estadisticas = lista.cache_consultas.estadisticas()
+        # La prueba solo vale si la caché respondió y descartó resultados
+        self.assertGreater(estadisticas["aciertos"], 0)
+        self.assertGreater(estadisticas["invalidaciones"], 0)
+
+    def test_invalidar_solo_lo_que_depende_de_la_fila(self):
+        paises = [{"NOMBRE": "Argentina", "POBLACION": 5, "SUPERFICIE": 5, "CONTINENTE": "América"},
+                  {"NOMBRE": "Japón", "POBLACION": 7, "SUPERFICIE": 1, "CONTINENTE": "Asia"}]
+        lista = main.ListaPaises(paises)
+        main.filtrar_posiciones(lista, "asia", None, None)
+        main.filtrar_posiciones(lista, None, (0, 6), None)
+        main.buscar_por_nombre(lista, "jap")
+
+        # Japón sigue fuera de (0, 6) y sigue en Asia: solo el filtro de población podría cambiar y no cambia
+        lista.actualizar(1, 8, 1)
+        self.assertEqual(lista.cache_consultas.invalidaciones, 0)
+        # Japón entra en el rango: ese resultado se descarta y se recalcula
+        lista.actualizar(1, 3, 1)
+        self.assertEqual(list(main.filtrar_posiciones(lista, None, (0, 6), None)), [0, 1])
+        self.assertEqual(list(main.filtrar_posiciones(lista, "asia", None, None)), [1])
+
+    def test_cambio_en_otro_continente(self):
+        paises = [{"NOMBRE": "Argentina", "POBLACION": 5, "SUPERFICIE": 5, "CONTINENTE": "América"},
+                  {"NOMBRE": "Japón", "POBLACION": 7, "SUPERFICIE": 1, "CONTINENTE": "Asia"}]
+        lista = main.ListaPaises(paises)
+        main.filtrar_posiciones(lista, "america", (0, 100), None)
+        main.filtrar_posiciones(lista, "asia", (0, 100), None)
+        main.filtrar_posiciones(lista, None, (6, 100), None)
+        main.ordenar_lista(lista, "NOMBRE")
+        main.ordenar_lista(lista, ["CONTINENTE", "POBLACION"], [False, True])
+        # Japón sale de los rangos: se descartan el filtro de Asia, el sin continente y el orden con población
+        lista.actualizar(1, 500, 1)
+        cache = lista.cache_consultas
+        self.assertEqual(cache.invalidaciones, 3)
+        self.assertEqual(set(cache._resultados), {("filtro", "america", (0, 100), None), ("orden", ("NOMBRE",), (False,))})
+        self.comprobar_grupos(cache)
+        # Un alta descarta también los ordenamientos por nombre
+        lista.append({"NOMBRE": "Chile", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "América"})
+        self.assertEqual(len(cache), 0)
+        self.comprobar_grupos(cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# Pruebas del modo no interactivo: números de la línea de comandos, consultas y lotes
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from utilidades import consulta_lineal, main, paises_al_azar
+
+# El programa, para ejecutarlo como desde la terminal
+PROGRAMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+class PruebasNumeros(unittest.TestCase):
+    """
+    numero_cli acepta enteros y notación científica exacta, y todo lo demás
+    es un error de argparse (nunca otra excepción).
+    """
+    def test_enteros_exactos(self):
+        for texto, numero in (("0", 0), ("12", 12), (" 7 ", 7), ("+7", 7), ("-0", 0), ("1e6", 10**6), ("2.5e3", 2500),
+                              ("2.50e3", 2500), ("100e-2", 1), ("1.0", 1), ("0e99999", 0),
+                              (str(sys.maxsize), sys.maxsize), ("9.223372036854775807e18", sys.maxsize),
+                              ("123456789012345678", 123456789012345678)):
+            self.assertEqual(main.numero_cli(texto), numero, texto)
+
+    def test_invalidos(self):
+        for texto in ("", "abc", "1e", "1.9", "1.5e0", "1e-400", "-3", "1e400", "1e99999999",
+                      str(sys.maxsize + 1), "nan", "inf", "٣"):
+            with self.assertRaises(argparse.ArgumentTypeError, msg=texto):
+                main.numero_cli(texto)
+
+    def test_error_de_uso_y_no_traceback(self):
+        resultado = subprocess.run([sys.executable, PROGRAMA, "filter", "--pop-min", "1e400"],
+                                   capture_output=True, text=True)
+        self.assertEqual(resultado.returncode, 2)
+        self.assertIn("demasiado grande", resultado.stderr)
+        self.assertNotIn("Traceback", resultado.stderr)
+
+
+class PruebasConsultas(unittest.TestCase):
+    """
+    Las consultas de la línea de comandos y las de un lote dan lo mismo que
+    un recorrido de la lista.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+        self.paises = paises_al_azar(random.Random(13), 120)
+        main.escribir_csv_atomico(self.paises, self.nombre_archivo)
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def ejecutar(self, *argumentos):
+        resultado = subprocess.run([sys.executable, PROGRAMA, "--data", self.nombre_archivo, "--format", "json", *argumentos],
+                                   capture_output=True, text=True, encoding="utf-8")
+        self.assertEqual(resultado.returncode, 0, resultado.stderr)
+        return json.loads(resultado.stdout)
+
+    def test_filtro_ordenado(self):
+        obtenido = self.ejecutar("filter", "--continent", "asia", "--pop-min", "2", "--pop-max", "7",
+                                 "--sort", "POBLACION:desc,NOMBRE", "--limit", "20")
+        esperado = consulta_lineal(self.paises, continente="asia", poblacion=(2, 7),
+                                   orden=(("POBLACION", "NOMBRE"), (True, False)), limite=20)
+        self.assertEqual(obtenido, [self.paises[i] for i in esperado])
+
+    def test_lote_igual_a_consultas_sueltas(self):
+        consultas = ["filter --continent europa --sort SUPERFICIE", "search a --limit 5",
+                     "sort NOMBRE:desc --limit 3", "top POBLACION -k 4", "stats --continent asia"]
+        lote = os.path.join(self.carpeta.name, "consultas.txt")
+        with open(lote, 'w', encoding='utf-8') as archivo:
+            archivo.write("# Comentario\n\n" + "\n".join(consultas) + "\nfilter --pop-min 1e400\n")
+
+        salida = io.StringIO()
+        with main.abrir_almacenamiento(self.nombre_archivo) as almacenamiento, contextlib.redirect_stderr(io.StringIO()):
+            errores = main.ejecutar_lote(almacenamiento, main.crear_parser(), lote, "json", salida)
+        lineas = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+        self.assertEqual(errores, 1)
+        self.assertEqual(lineas[-1]["linea"], 8)
+        for consulta, linea in zip(consultas, lineas):
+            self.assertEqual(linea, self.ejecutar(*consulta.split()), consulta)
+
+
+if __name__ == "__main__":
+    unittest.main()
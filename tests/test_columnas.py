@@ -0,0 +1,79 @@
+# Pruebas de ListaPaises por columnas: se usa como una lista de diccionarios
+import os
+import random
+import tempfile
+import unittest
+
+from utilidades import main, paises_al_azar
+
+
+class PruebasListaPaises(unittest.TestCase):
+    """
+    ListaPaises guarda por columnas pero se lee, recorre, agrega y
+    actualiza igual que una lista de diccionarios.
+    """
+    def test_como_lista_de_diccionarios(self):
+        generador = random.Random(6)
+        paises = paises_al_azar(generador, 200)
+        lista = main.ListaPaises(paises[:100])
+        for pais in paises[100:]:
+            lista.append(pais)
+        for _ in range(100):
+            posicion = generador.randrange(len(paises))
+            poblacion, superficie = generador.randrange(10**12), generador.randrange(10**6)
+            lista.actualizar(posicion, poblacion, superficie)
+            paises[posicion].update(POBLACION=poblacion, SUPERFICIE=superficie)
+
+        self.assertEqual(len(lista), len(paises))
+        self.assertEqual([dict(pais) for pais in lista], paises)
+        self.assertEqual(lista[-1], paises[-1])
+        self.assertEqual([dict(pais) for pais in lista.copiar()], paises)
+        # Los agregados se mantienen con cada cambio
+        self.assertEqual(lista.total_poblacion, sum(pais["POBLACION"] for pais in paises))
+        self.assertEqual(lista.total_superficie, sum(pais["SUPERFICIE"] for pais in paises))
+
+    def test_mas_de_256_continentes(self):
+        lista = main.ListaPaises({"NOMBRE": f"P{i}", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": f"C{i}"} for i in range(256))
+        with self.assertRaises(ValueError):
+            lista.append({"NOMBRE": "Otro", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "C256"})
+        # La lista queda como estaba
+        self.assertEqual(len(lista), 256)
+        self.assertEqual(len(lista.nombres), lista.desplazamientos_nombres[-1])
+
+
+class PruebasContinentesDelCSV(unittest.TestCase):
+    """
+    Al cargar el CSV los continentes se validan contra CONTINENTES y quedan
+    con su formato, en serie y en paralelo.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+
+    def tearDown(self):
+        main._entradas_journal.pop(self.nombre_archivo, None)
+        self.carpeta.cleanup()
+
+    def escribir(self, continentes):
+        with open(self.nombre_archivo, 'w', encoding='utf-8', newline='') as archivo:
+            archivo.write("NOMBRE,POBLACION,SUPERFICIE,CONTINENTE\n")
+            archivo.writelines(f"P{i},{i},{i},{continente}\n" for i, continente in enumerate(continentes))
+
+    def test_formato(self):
+        self.escribir(["asia", "ASIA", " America ", "Africa", "Asia"] * 50)
+        esperado = ["Asia", "Asia", "América", "África", "Asia"] * 50
+        self.assertEqual([pais["CONTINENTE"] for pais in main.cargar_datos_csv(self.nombre_archivo)], esperado)
+        paralela = main.cargar_csv_paralelo(self.nombre_archivo, procesos=3)
+        self.assertEqual([pais["CONTINENTE"] for pais in paralela], esperado)
+        self.assertEqual(paralela.continentes, ["Asia", "América", "África"])
+
+    def test_continentes_invalidos(self):
+        # Antes, más de 256 continentes distintos cortaba la carga con OverflowError
+        self.escribir(["Asia"] + [f"Continente {i}" for i in range(300)])
+        self.assertIsNone(main.cargar_csv_paralelo(self.nombre_archivo, procesos=2))
+        with self.assertRaisesRegex(ValueError, "línea 3: continente no válido 'Continente 0'"):
+            main.cargar_datos_csv(self.nombre_archivo)
+
+
+if __name__ == "__main__":
+    unittest.main()
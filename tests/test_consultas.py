@@ -0,0 +1,56 @@
+# Pruebas de los filtros por columnas y de consultar_lista contra un recorrido de la lista
+import random
+import unittest
+
+from utilidades import ORDENES, consulta_lineal, criterios_al_azar, main, paises_al_azar
+
+
+class PruebasFiltros(unittest.TestCase):
+    """
+    filtrar_posiciones (columnas, caché y lista común) devuelve las mismas
+    posiciones que un recorrido, también después de cambiar la lista.
+    """
+    def test_filtros_al_azar(self):
+        generador = random.Random(7)
+        for cantidad in (0, 1, 50, 500):
+            paises = paises_al_azar(generador, cantidad)
+            lista = main.ListaPaises(paises)
+            for _ in range(200):
+                criterios = criterios_al_azar(generador, paises)
+                esperado = consulta_lineal(paises, **criterios)
+                self.assertEqual(list(main.filtrar_posiciones(lista, **criterios)), esperado, criterios)
+                self.assertEqual(list(main.filtrar_posiciones(paises, **criterios)), esperado, criterios)
+
+    def test_despues_de_cambios(self):
+        generador = random.Random(8)
+        paises = paises_al_azar(generador, 200)
+        lista = main.ListaPaises(paises)
+        criterios = [criterios_al_azar(generador, paises) for _ in range(20)]
+        for _ in range(100):
+            posicion = generador.randrange(len(paises))
+            poblacion, superficie = generador.randrange(10), generador.randrange(10)
+            lista.actualizar(posicion, poblacion, superficie)
+            paises[posicion].update(POBLACION=poblacion, SUPERFICIE=superficie)
+            for criterio in generador.sample(criterios, 5):
+                self.assertEqual(list(main.filtrar_posiciones(lista, **criterio)), consulta_lineal(paises, **criterio), criterio)
+
+
+class PruebasConsultarLista(unittest.TestCase):
+    """
+    consultar_lista (filtros, orden y límite) contra un recorrido con sorted.
+    """
+    def test_consultas_al_azar(self):
+        generador = random.Random(5)
+        for cantidad in (0, 3, 60, 500):
+            paises = paises_al_azar(generador, cantidad)
+            lista = main.ListaPaises(paises)
+            for _ in range(200):
+                consulta = {**criterios_al_azar(generador, paises), "orden": generador.choice(ORDENES),
+                            "limite": generador.choice((None, 0, 1, 5, 50))}
+                obtenido = [pais.posicion for pais in main.consultar_lista(lista, **consulta)]
+                self.assertEqual(obtenido, consulta_lineal(paises, **consulta), consulta)
+                self.assertEqual(main.explicar_consulta(lista, **consulta)["resultado"], len(obtenido))
+
+
+if __name__ == "__main__":
+    unittest.main()
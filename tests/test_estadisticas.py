@@ -0,0 +1,31 @@
+# Pruebas de los agregados que mantiene ListaPaises contra un recorrido de la lista
+import random
+import unittest
+
+from utilidades import main, paises_al_azar
+
+
+class PruebasAgregados(unittest.TestCase):
+    """
+    calcular_estadisticas sobre una ListaPaises (totales, contadores por
+    continente e índice ordenado, sin recorrer) da lo mismo que recorrer
+    la lista, con cada alta y modificación.
+    """
+    def test_altas_y_modificaciones(self):
+        generador = random.Random(9)
+        paises = paises_al_azar(generador, 300)
+        lista = main.ListaPaises()
+        self.assertEqual(main.calcular_estadisticas(lista), main.calcular_estadisticas([]))
+        for paso in range(600):
+            if paso % 2 == 0 and len(lista) < len(paises):
+                lista.append(paises[len(lista)])
+            else:
+                posicion = generador.randrange(len(lista))
+                poblacion, superficie = generador.randrange(10), generador.randrange(10)
+                lista.actualizar(posicion, poblacion, superficie)
+                paises[posicion].update(POBLACION=poblacion, SUPERFICIE=superficie)
+            self.assertEqual(main.calcular_estadisticas(lista), main.calcular_estadisticas(paises[:len(lista)]), paso)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# Pruebas de la importación masiva: validación, duplicados y una sola escritura
+import json
+import os
+import tempfile
+import unittest
+
+from utilidades import main
+
+
+class PruebasImportacion(unittest.TestCase):
+    """
+    importar_paises desde CSV, JSON Lines e iterables: las filas válidas se
+    agregan con el formato del alta por menú y las demás se informan.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+        main.escribir_csv_atomico([{"NOMBRE": "Argentina", "POBLACION": 1, "SUPERFICIE": 2, "CONTINENTE": "América"}], self.nombre_archivo)
+
+    def tearDown(self):
+        main._entradas_journal.pop(self.nombre_archivo, None)
+        self.carpeta.cleanup()
+
+    def importar(self, origen, formato=None):
+        lista = main.cargar_datos_csv(self.nombre_archivo)
+        with main.abrir_almacenamiento(self.nombre_archivo) as almacenamiento:
+            resultado = main.importar_paises(lista, origen, almacenamiento, formato=formato)
+        # Lo importado quedó guardado
+        self.assertEqual([dict(pais) for pais in main.cargar_datos_csv(self.nombre_archivo)], [dict(pais) for pais in lista])
+        return resultado, [pais["NOMBRE"] for pais in lista]
+
+    def test_iterable_con_filas_invalidas(self):
+        filas = [{"NOMBRE": "  nueva zelanda ", "POBLACION": "5", "SUPERFICIE": 7, "CONTINENTE": "oceania"},
+                 ("Chile", 1, 1, "América"),
+                 None,
+                 {"NOMBRE": "ARGENTINA", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "America"},
+                 {"NOMBRE": "Nueva Zelanda", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "Oceanía"},
+                 {"NOMBRE": "123", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "Asia"},
+                 {"NOMBRE": "Japón", "POBLACION": "-1", "SUPERFICIE": 1, "CONTINENTE": "Asia"},
+                 {"NOMBRE": "Japón", "POBLACION": str(10**30), "SUPERFICIE": 1, "CONTINENTE": "Asia"},
+                 {"NOMBRE": "Japón", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "Marte"},
+                 {"NOMBRE": "japón", "POBLACION": 3, "SUPERFICIE": 4, "CONTINENTE": "ASIA"}]
+        resultado, nombres = self.importar(filas)
+        self.assertEqual(resultado["agregados"], 2)
+        self.assertEqual(resultado["duplicados"], 2)
+        self.assertEqual([numero for numero, _ in resultado["errores"]], [2, 3, 6, 7, 8, 9])
+        self.assertEqual(nombres, ["Argentina", "Nueva Zelanda", "Japón"])
+
+    def test_archivos(self):
+        origen_csv = os.path.join(self.carpeta.name, "nuevos.csv")
+        with open(origen_csv, 'w', encoding='utf-8') as archivo:
+            archivo.write("NOMBRE,POBLACION,SUPERFICIE,CONTINENTE\nperú,3,4,America\nPerú,5,6,América\n,1,1,Asia\n")
+        resultado, nombres = self.importar(origen_csv)
+        self.assertEqual((resultado["agregados"], resultado["duplicados"], resultado["errores"][0][0]), (1, 1, 4))
+
+        origen_jsonl = os.path.join(self.carpeta.name, "nuevos.jsonl")
+        with open(origen_jsonl, 'w', encoding='utf-8') as archivo:
+            archivo.write(json.dumps({"NOMBRE": "india", "POBLACION": 8, "SUPERFICIE": 9, "CONTINENTE": "asia"}) + "\n[1, 2]\n{roto\n")
+        resultado, nombres = self.importar(origen_jsonl)
+        self.assertEqual(resultado["agregados"], 1)
+        self.assertEqual([numero for numero, _ in resultado["errores"]], [2, 3])
+        self.assertEqual(nombres, ["Argentina", "Perú", "India"])
+
+    def test_ruta_de_sqlite(self):
+        # Con una ruta, importar_paises abre el almacenamiento y lo cierra
+        nombre_base = os.path.join(self.carpeta.name, "paises.db")
+        lista = main.ListaPaises()
+        resultado = main.importar_paises(lista, [{"NOMBRE": "Chile", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "América"}], nombre_base)
+        self.assertEqual(resultado["agregados"], 1)
+        # Al cerrar la última conexión, SQLite pasa el WAL a la base y lo borra
+        self.assertFalse(os.path.exists(nombre_base + "-wal"))
+        with main.abrir_almacenamiento(nombre_base) as almacenamiento:
+            self.assertEqual(almacenamiento.consultar(), [dict(pais) for pais in lista])
+
+
+if __name__ == "__main__":
+    unittest.main()
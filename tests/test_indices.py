@@ -0,0 +1,58 @@
+# Pruebas de los índices ordenados de POBLACION y SUPERFICIE
+import random
+import unittest
+
+from utilidades import main, paises_al_azar
+
+
+class PruebasIndiceOrdenado(unittest.TestCase):
+    """
+    El índice ordenado de cada clave numérica sigue igual a un sorted
+    estable de las posiciones con cada alta y modificación, y los rangos,
+    extremos y el recorrido descendente salen bien de él.
+    """
+    def comprobar(self, lista, paises):
+        for clave in main.CLAVES_NUMERICAS:
+            self.assertEqual(list(lista.indice_ordenado(clave)), sorted(range(len(paises)), key=lambda i: paises[i][clave]))
+            self.assertEqual(list(lista.descendente(clave)),
+                             sorted(range(len(paises)), key=lambda i: paises[i][clave], reverse=True))
+            for minimo, maximo in ((-1, 3), (4, 4), (5, 2), (0, main.sys.maxsize)):
+                self.assertEqual(sorted(main.posiciones_en_rango(lista, clave, minimo, maximo)),
+                                 [i for i, pais in enumerate(paises) if minimo <= pais[clave] <= maximo])
+            if paises:
+                valores = [pais[clave] for pais in paises]
+                self.assertEqual(lista.extremos(clave), (valores.index(min(valores)), valores.index(max(valores))))
+
+    def test_altas_y_modificaciones(self):
+        generador = random.Random(8)
+        paises = paises_al_azar(generador, 300)
+        lista = main.ListaPaises(paises[:1])
+        for clave in main.CLAVES_NUMERICAS:
+            lista.indice_ordenado(clave)
+        for paso in range(700):
+            if paso % 2 and len(lista) < len(paises):
+                lista.append(paises[len(lista)])
+            else:
+                posicion = generador.randrange(len(lista))
+                poblacion, superficie = generador.randrange(10), generador.randrange(10)
+                lista.actualizar(posicion, poblacion, superficie)
+                paises[posicion].update(POBLACION=poblacion, SUPERFICIE=superficie)
+            if paso % 20 == 0:
+                self.comprobar(lista, paises[:len(lista)])
+        self.comprobar(lista, paises[:len(lista)])
+        self.assertEqual(main.ListaPaises().extremos("POBLACION"), (None, None))
+
+    def test_filtro_no_cambia_el_orden_de_los_empates(self):
+        paises = [{"NOMBRE": nombre, "POBLACION": poblacion, "SUPERFICIE": 1, "CONTINENTE": "Asia"}
+                  for nombre, poblacion in (("A", 5), ("B", 5), ("C", 1), ("D", 5))]
+        lista = main.ListaPaises(paises)
+        orden = (["POBLACION"], [True])
+        sin_filtro = [pais["NOMBRE"] for pais in main.consultar_lista(lista, orden=orden)]
+        con_filtro = [pais["NOMBRE"] for pais in main.consultar_lista(lista, continente="asia", orden=orden)]
+        self.assertEqual(sin_filtro, ["A", "B", "D", "C"])
+        self.assertEqual(con_filtro, sin_filtro)
+        self.assertEqual([pais["NOMBRE"] for pais in main.ordenar_lista(paises, "POBLACION", True)], sin_filtro)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# Pruebas del journal: un cambio es una línea, compactación y recuperación después de un corte
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from utilidades import main, paises_al_azar
+
+
+class PruebasJournal(unittest.TestCase):
+    """
+    Se simulan cortes dejando los archivos como quedarían y se comprueba que
+    cargar_datos_csv (y cargar_para_consultas) recuperen todos los cambios
+    confirmados, sin perder ni duplicar países.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.nombre_archivo = os.path.join(self.carpeta, "datos_paises.csv")
+        self.generador = random.Random(21)
+        self.esperado = paises_al_azar(self.generador, 50, valores=1000)
+        main.escribir_csv_atomico(self.esperado, self.nombre_archivo)
+        self.lista = main.cargar_datos_csv(self.nombre_archivo)
+
+    def tearDown(self):
+        main._entradas_journal.pop(self.nombre_archivo, None)
+        shutil.rmtree(self.carpeta)
+
+    def cambios_al_azar(self, cantidad):
+        """
+        Guarda altas y modificaciones en el journal (como el menú) y las
+        aplica también a la lista esperada.
+        """
+        for _ in range(cantidad):
+            if self.generador.random() < 0.3:
+                pais = paises_al_azar(self.generador, 1, valores=1000)[0]
+                pais["NOMBRE"] += f" alta {len(self.esperado)}"
+                self.lista.append(pais)
+                self.esperado.append(dict(pais))
+                main.guardar_cambio_pais(self.lista, self.nombre_archivo, "ALTA", pais)
+            else:
+                posicion = self.generador.randrange(len(self.esperado))
+                poblacion, superficie = self.generador.randrange(1000), self.generador.randrange(1000)
+                pais = self.lista[posicion]
+                main.modificar_pais(self.lista, pais, poblacion, superficie)
+                self.esperado[posicion].update(POBLACION=poblacion, SUPERFICIE=superficie)
+                main.guardar_cambio_pais(self.lista, self.nombre_archivo, "MODIFICACION", pais)
+
+    def comprobar_recuperacion(self):
+        """
+        Carga los datos de nuevo, como al reiniciar el programa.
+        """
+        recuperada = main.cargar_datos_csv(self.nombre_archivo)
+        self.assertEqual([dict(pais) for pais in recuperada], self.esperado)
+        consultas = main.cargar_para_consultas(self.nombre_archivo)
+        self.assertEqual([dict(pais) for pais in consultas], self.esperado)
+        return recuperada
+
+    def test_un_cambio_no_reescribe_el_csv(self):
+        with open(self.nombre_archivo, 'rb') as archivo:
+            contenido = archivo.read()
+        self.cambios_al_azar(30)
+        # El CSV queda igual y el journal tiene una línea por cambio
+        with open(self.nombre_archivo, 'rb') as archivo:
+            self.assertEqual(archivo.read(), contenido)
+        with open(self.nombre_archivo + ".journal", encoding='utf-8') as archivo:
+            self.assertEqual(len(archivo.readlines()), 30)
+        self.comprobar_recuperacion()
+
+    def test_compactacion_al_llegar_al_umbral(self):
+        umbral = main.UMBRAL_COMPACTACION
+        main.UMBRAL_COMPACTACION = 10
+        try:
+            self.cambios_al_azar(10)
+        finally:
+            main.UMBRAL_COMPACTACION = umbral
+        main._hilos_compactacion[self.nombre_archivo].join()
+        # El journal se volcó en el CSV
+        self.assertFalse(os.path.exists(self.nombre_archivo + ".journal"))
+        self.assertFalse(os.path.exists(self.nombre_archivo + ".compactando"))
+        self.assertEqual(list(main.leer_paises_csv(self.nombre_archivo)), self.esperado)
+        self.comprobar_recuperacion()
+
+    def test_ultima_linea_cortada(self):
+        self.cambios_al_azar(20)
+        # Corte en medio de una escritura: la última entrada quedó sin salto de línea
+        with open(self.nombre_archivo + ".journal", 'ab') as archivo:
+            archivo.write("MODIFICACION,Pa".encode('utf-8'))
+
+        self.lista = self.comprobar_recuperacion()
+        with open(self.nombre_archivo + ".journal", 'rb') as archivo:
+            self.assertTrue(archivo.read().endswith(b"\n"))
+
+        # Las entradas nuevas no se pegan a la línea descartada
+        self.cambios_al_azar(10)
+        self.comprobar_recuperacion()
+
+    def test_linea_cortada_con_caracter_multibyte(self):
+        self.cambios_al_azar(5)
+        with open(self.nombre_archivo + ".journal", 'ab') as archivo:
+            archivo.write("ALTA,Ñandú".encode('utf-8')[:-1])
+        self.comprobar_recuperacion()
+
+    def test_compactacion_cortada_antes_de_escribir(self):
+        self.cambios_al_azar(20)
+        # El journal pasó a '.compactando' pero el CSV no se llegó a escribir
+        main.preparar_compactacion(self.lista, self.nombre_archivo)
+        self.assertTrue(os.path.exists(self.nombre_archivo + ".compactando"))
+        # Cambios posteriores, en el journal nuevo
+        self.cambios_al_azar(10)
+
+        self.lista = self.comprobar_recuperacion()
+        # La compactación siguiente incluye el '.compactando' que quedó (el journal actual se vuelve a aplicar sin duplicar)
+        main.compactar_datos(self.lista, self.nombre_archivo)
+        self.assertFalse(os.path.exists(self.nombre_archivo + ".compactando"))
+        self.comprobar_recuperacion()
+
+    def test_compactacion_cortada_despues_de_escribir(self):
+        self.cambios_al_azar(20)
+        # El CSV ya tiene los cambios pero el '.compactando' no se llegó a borrar: aplicarlo de nuevo no duplica
+        copia = main.preparar_compactacion(self.lista, self.nombre_archivo)
+        main.escribir_csv_atomico(copia, self.nombre_archivo)
+        self.cambios_al_azar(10)
+        self.comprobar_recuperacion()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+# Pruebas de la lectura del CSV en streaming y de los filtros sobre iterables
+import csv
+import os
+import random
+import tempfile
+import unittest
+
+from utilidades import main, paises_al_azar
+
+
+class PruebasStreaming(unittest.TestCase):
+    """
+    leer_paises_csv entrega las filas de a una (sin leer el archivo entero
+    antes) y los filtros y estadísticas la consumen igual que a una lista.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+        self.paises = paises_al_azar(random.Random(4), 300)
+        main.escribir_csv_atomico(self.paises, self.nombre_archivo)
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def test_filas_de_a_una(self):
+        # Una fila rota al final solo falla cuando se llega a ella
+        with open(self.nombre_archivo, 'a', encoding='utf-8', newline='') as archivo:
+            csv.writer(archivo).writerow(["Rota", "muchos", "1", "Asia"])
+        filas = main.leer_paises_csv(self.nombre_archivo)
+        self.assertEqual(next(filas), self.paises[0])
+        leidas = [next(filas) for _ in self.paises[1:]]
+        self.assertEqual(leidas, self.paises[1:])
+        with self.assertRaises(ValueError):
+            next(filas)
+
+    def test_archivo_inexistente(self):
+        self.assertEqual(list(main.leer_paises_csv(os.path.join(self.carpeta.name, "no_existe.csv"))), [])
+
+    def test_filtros_y_estadisticas(self):
+        filas = main.leer_paises_csv(self.nombre_archivo)
+        en_asia = main.paises_de_continente(filas, "ASIA")
+        en_rango = main.paises_en_rango(en_asia, "POBLACION", 2, 6)
+        esperado = [pais for pais in self.paises if pais["CONTINENTE"] == "Asia" and 2 <= pais["POBLACION"] <= 6]
+        self.assertEqual(main.calcular_estadisticas(en_rango), main.calcular_estadisticas(esperado))
+        self.assertEqual(main.calcular_estadisticas(main.leer_paises_csv(self.nombre_archivo)),
+                         main.calcular_estadisticas(self.paises))
+
+
+if __name__ == "__main__":
+    unittest.main()
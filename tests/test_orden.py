@@ -0,0 +1,61 @@
+# Pruebas de ordenar_lista contra sorted, con la caché de ordenamientos
+import random
+import unittest
+
+from utilidades import main, paises_al_azar
+
+# Claves y direcciones de ordenar_lista, de una y de varias claves
+ORDENAMIENTOS = (("NOMBRE", False), ("NOMBRE", True), ("POBLACION", False), ("POBLACION", True),
+                 ("SUPERFICIE", True), (("CONTINENTE", "POBLACION"), (False, True)),
+                 (("SUPERFICIE", "NOMBRE"), True), (("CONTINENTE", "SUPERFICIE", "NOMBRE"), (True, False, True)))
+
+
+#Ordenamiento de referencia: sorted estable, de la última clave a la primera
+def ordenar_directo(paises, clave, reversa):
+    claves = (clave,) if isinstance(clave, str) else clave
+    reversas = (reversa,) * len(claves) if isinstance(reversa, bool) else reversa
+    resultado = list(paises)
+    for clave, reversa in reversed(list(zip(claves, reversas))):
+        resultado = sorted(resultado, key=lambda pais: pais[clave], reverse=reversa)
+    return resultado
+
+
+class PruebasOrdenarLista(unittest.TestCase):
+    """
+    ordenar_lista da lo mismo que sorted (también en los empates) sobre una
+    lista común y sobre una ListaPaises, y la permutación guardada en la
+    caché sigue valiendo después de altas y modificaciones.
+    """
+    def test_contra_sorted(self):
+        generador = random.Random(1)
+        for cantidad in (0, 1, 2, 50, 500):
+            paises = paises_al_azar(generador, cantidad)
+            lista = main.ListaPaises(paises)
+            for clave, reversa in ORDENAMIENTOS:
+                esperado = ordenar_directo(paises, clave, reversa)
+                self.assertEqual(main.ordenar_lista(paises, clave, reversa), esperado, (clave, reversa))
+                self.assertEqual([dict(pais) for pais in main.ordenar_lista(lista, clave, reversa)], esperado, (clave, reversa))
+
+    def test_cambios_despues_de_ordenar(self):
+        generador = random.Random(2)
+        paises = paises_al_azar(generador, 300)
+        lista = main.ListaPaises(paises[:200])
+        for paso in range(200):
+            if paso % 2 and len(lista) < len(paises):
+                lista.append(paises[len(lista)])
+            else:
+                posicion = generador.randrange(len(lista))
+                poblacion, superficie = generador.randrange(10), generador.randrange(10)
+                lista.actualizar(posicion, poblacion, superficie)
+                paises[posicion].update(POBLACION=poblacion, SUPERFICIE=superficie)
+            clave, reversa = generador.choice(ORDENAMIENTOS)
+            esperado = ordenar_directo(paises[:len(lista)], clave, reversa)
+            self.assertEqual([dict(pais) for pais in main.ordenar_lista(lista, clave, reversa)], esperado, (paso, clave))
+
+    def test_direcciones_de_otro_largo(self):
+        with self.assertRaises(ValueError):
+            main.ordenar_lista([], ("NOMBRE", "POBLACION"), (True,))
+
+
+if __name__ == "__main__":
+    unittest.main()
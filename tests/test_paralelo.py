@@ -0,0 +1,134 @@
+# Pruebas de la carga del CSV y de las consultas en varios procesos contra la versión en serie
+import csv
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from utilidades import consulta_lineal, criterios_al_azar, main, paises_al_azar
+
+
+class PruebasCargaParalela(unittest.TestCase):
+    """
+    cargar_csv_paralelo da la misma lista (y la misma tabla de continentes)
+    que leer el CSV en serie, o None cuando no puede cortar el archivo en
+    bloques.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+
+    def tearDown(self):
+        main._entradas_journal.pop(self.nombre_archivo, None)
+        self.carpeta.cleanup()
+
+    def escribir(self, paises, encabezado=main.CLAVES_PAIS):
+        with open(self.nombre_archivo, 'w', encoding='utf-8', newline='') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(encabezado)
+            escritor.writerows([pais[clave] for clave in encabezado] for pais in paises)
+
+    def comparar(self, procesos):
+        serie = main.ListaPaises(main.leer_paises_csv(self.nombre_archivo))
+        paralela = main.cargar_csv_paralelo(self.nombre_archivo, procesos)
+        self.assertIsNotNone(paralela, procesos)
+        self.assertEqual([dict(pais) for pais in paralela], [dict(pais) for pais in serie], procesos)
+        self.assertEqual(paralela.continentes, serie.continentes, procesos)
+        self.assertEqual(main.calcular_estadisticas(paralela), main.calcular_estadisticas(serie), procesos)
+
+    def test_igual_a_la_lectura_en_serie(self):
+        generador = random.Random(15)
+        paises = paises_al_azar(generador, 2000, valores=10**12)
+        # Nombres entre comillas (comas, comillas y caracteres de varios bytes) y continentes con otro formato
+        for pais in generador.sample(paises, 200):
+            pais["NOMBRE"] += generador.choice((", República de", ' "del Sur"', " 中国", "ñ"))
+            pais["CONTINENTE"] = generador.choice(("asia", "EUROPA", "Oceania"))
+        self.escribir(paises)
+        for procesos in (2, 3, 4, 7):
+            self.comparar(procesos)
+
+    def test_archivos_chicos(self):
+        for cantidad in (0, 1, 3):
+            self.escribir(paises_al_azar(random.Random(cantidad), cantidad))
+            self.comparar(4)
+
+    def test_vuelve_a_la_lectura_en_serie(self):
+        paises = paises_al_azar(random.Random(16), 500)
+        # Un nombre entre comillas con un salto de línea no se puede cortar por líneas
+        paises[250]["NOMBRE"] = "Isla\nPartida"
+        self.escribir(paises)
+        self.assertIsNone(main.cargar_csv_paralelo(self.nombre_archivo, 3))
+        self.assertEqual(main.cargar_datos_csv(self.nombre_archivo)[250]["NOMBRE"], "Isla\nPartida")
+
+        # Otro orden de columnas, o un solo proceso
+        self.escribir(paises[:10], encabezado=("CONTINENTE", "NOMBRE", "POBLACION", "SUPERFICIE"))
+        self.assertIsNone(main.cargar_csv_paralelo(self.nombre_archivo, 3))
+        self.escribir(paises[:10])
+        self.assertIsNone(main.cargar_csv_paralelo(self.nombre_archivo, 1))
+
+    def test_carga_de_un_csv_grande(self):
+        # Por encima del umbral, cargar_datos_csv usa la carga en paralelo
+        paises = paises_al_azar(random.Random(17), 300)
+        self.escribir(paises)
+        cargar_csv_paralelo = main.cargar_csv_paralelo
+        with mock.patch.object(main, "UMBRAL_CARGA_PARALELA", 0), \
+             mock.patch.object(main, "cargar_csv_paralelo", wraps=lambda nombre_archivo: cargar_csv_paralelo(nombre_archivo, 2)) as carga:
+            self.assertEqual([dict(pais) for pais in main.cargar_datos_csv(self.nombre_archivo)], paises)
+        carga.assert_called_once_with(self.nombre_archivo)
+
+
+class PruebasEjecutorParalelo(unittest.TestCase):
+    """
+    Los filtros y estadísticas de EjecutorParalelo dan lo mismo que en
+    serie, también después de altas y modificaciones (la memoria
+    compartida se vuelve a publicar).
+    """
+    def setUp(self):
+        self.generador = random.Random(16)
+        self.paises = paises_al_azar(self.generador, 500)
+        self.lista = main.ListaPaises(self.paises)
+        self.lista.ejecutor = main.EjecutorParalelo(self.lista, 2)
+
+    def tearDown(self):
+        if self.lista.ejecutor is not None:
+            self.lista.ejecutor.cerrar()
+
+    def comprobar(self, consultas):
+        ejecutor = self.lista.ejecutor
+        for _ in range(consultas):
+            criterios = criterios_al_azar(self.generador, self.paises)
+            del criterios["termino"]
+            esperado = consulta_lineal(self.paises, **criterios)
+            self.assertEqual(list(ejecutor.filtrar(**criterios)), esperado, criterios)
+            self.assertEqual(ejecutor.estadisticas(**criterios),
+                             main.calcular_estadisticas([self.paises[i] for i in esperado]), criterios)
+            # Con el ejecutor, el planificador recorre las columnas en los procesos
+            self.assertEqual(list(main.filtrar_posiciones(self.lista, **criterios)), esperado, criterios)
+
+    def test_consultas(self):
+        self.comprobar(60)
+        self.assertEqual(self.lista.ejecutor.estadisticas(), main.calcular_estadisticas(self.paises))
+
+    def test_despues_de_cambios(self):
+        for pais in paises_al_azar(self.generador, 50):
+            pais["NOMBRE"] += " nuevo"
+            self.lista.append(pais)
+            self.paises.append(pais)
+        for _ in range(50):
+            posicion = self.generador.randrange(len(self.paises))
+            poblacion, superficie = self.generador.randrange(10), self.generador.randrange(10)
+            self.lista.actualizar(posicion, poblacion, superficie)
+            self.paises[posicion].update(POBLACION=poblacion, SUPERFICIE=superficie)
+        self.comprobar(30)
+
+    def test_cerrar(self):
+        ejecutor = self.lista.ejecutor
+        ejecutor.estadisticas()
+        ejecutor.cerrar()
+        self.assertIsNone(self.lista.ejecutor)
+        self.assertIsNone(ejecutor._memoria)
+
+
+if __name__ == "__main__":
+    unittest.main()
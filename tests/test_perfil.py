@@ -0,0 +1,70 @@
+# Pruebas de la instrumentación (--profile): contadores, resumen e informe JSON
+import json
+import os
+import pstats
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from utilidades import main, paises_al_azar
+
+# El programa, para ejecutarlo como desde la terminal (activar_perfil reemplaza funciones del módulo)
+PROGRAMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+class PruebasPerfil(unittest.TestCase):
+    """
+    Con --profile las funciones instrumentadas cuentan sus llamadas y el
+    informe se escribe en JSON sin cambiar los resultados; sin --profile
+    las funciones son las originales.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+        main.escribir_csv_atomico(paises_al_azar(random.Random(20), 100), self.nombre_archivo)
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def ejecutar(self, *argumentos):
+        resultado = subprocess.run([sys.executable, PROGRAMA, "--data", self.nombre_archivo, "--format", "json", *argumentos],
+                                   capture_output=True, text=True, encoding="utf-8")
+        self.assertEqual(resultado.returncode, 0, resultado.stderr)
+        return resultado
+
+    def test_informe_json(self):
+        informe = os.path.join(self.carpeta.name, "perfil.json")
+        sin_perfil = self.ejecutar("filter", "--continent", "asia", "--sort", "NOMBRE")
+        for modo in ("tiempos", "memoria"):
+            con_perfil = self.ejecutar("--profile", modo, "--profile-output", informe,
+                                       "filter", "--continent", "asia", "--sort", "NOMBRE")
+            self.assertEqual(con_perfil.stdout, sin_perfil.stdout)
+            self.assertIn(f"--- Perfil ({modo}) ---", con_perfil.stderr)
+            with open(informe, encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+            self.assertEqual(datos["modo"], modo)
+            funciones = {funcion["funcion"]: funcion for operacion in datos["operaciones"].values() for funcion in operacion}
+            self.assertEqual(funciones["consultar_lista"]["llamadas"], 1)
+            self.assertIn("AlmacenamientoCSV.consultar", funciones)
+            self.assertTrue(all(funcion["llamadas"] > 0 and funcion["segundos"] >= 0 for funcion in funciones.values()))
+
+    def test_cprofile(self):
+        informe = os.path.join(self.carpeta.name, "perfil.prof")
+        self.ejecutar("--profile", "cprofile", "--profile-output", informe, "stats")
+        self.assertTrue(pstats.Stats(informe).total_calls > 0)
+
+    def test_modo_invalido(self):
+        with self.assertRaises(ValueError):
+            main.activar_perfil("todo")
+        self.assertIsNone(main._perfil["modo"])
+        # Los nombres de FUNCIONES_INSTRUMENTADAS existen (si no, activar_perfil fallaría al envolverlas)
+        for nombres in main.FUNCIONES_INSTRUMENTADAS.values():
+            for nombre in nombres:
+                clase, _, metodo = nombre.rpartition(".")
+                self.assertTrue(callable(getattr(getattr(main, clase) if clase else main, metodo)), nombre)
+
+
+if __name__ == "__main__":
+    unittest.main()
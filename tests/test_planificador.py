@@ -0,0 +1,70 @@
+# Pruebas del planificador de consultas compuestas contra un recorrido de la lista
+import random
+import unittest
+
+from utilidades import consulta_lineal, criterios_al_azar, main, paises_al_azar
+
+
+class PruebasPlanificador(unittest.TestCase):
+    """
+    ejecutar_plan(planificar_consulta(...)) tiene que devolver lo mismo que
+    un recorrido, con y sin índices armados.
+    """
+    def comparar(self, lista, paises, generador, consultas):
+        for _ in range(consultas):
+            criterios = criterios_al_azar(generador, paises)
+            plan = main.planificar_consulta(lista, **criterios)
+            posiciones = list(main.ejecutar_plan(lista, plan))
+            self.assertEqual(posiciones, consulta_lineal(paises, **criterios), (criterios, plan))
+            if plan and plan[-1]["filas"] is not None:
+                self.assertEqual(plan[-1]["filas"], len(posiciones))
+
+    def test_sin_indices(self):
+        generador = random.Random(1)
+        for cantidad in (0, 1, 40, 400):
+            paises = paises_al_azar(generador, cantidad)
+            self.comparar(main.ListaPaises(paises), paises, generador, 150)
+
+    def test_con_indices(self):
+        generador = random.Random(2)
+        for cantidad in (1, 40, 400):
+            paises = paises_al_azar(generador, cantidad)
+            lista = main.ListaPaises(paises)
+            lista.indice_trigramas
+            for clave in main.CLAVES_NUMERICAS:
+                lista.indice_ordenado(clave)
+            self.comparar(lista, paises, generador, 150)
+
+    def test_no_arma_indices_para_estimar(self):
+        generador = random.Random(3)
+        paises = paises_al_azar(generador, 200)
+        lista = main.ListaPaises(paises)
+        plan = main.planificar_consulta(lista, "ar", "asia", (0, 3), (2, 5))
+        self.assertEqual(lista.indices_ordenados, {})
+        self.assertIsNone(lista._indice_trigramas)
+        self.assertEqual(list(main.ejecutar_plan(lista, plan)), consulta_lineal(paises, "ar", "asia", (0, 3), (2, 5)))
+
+    def test_empieza_por_el_criterio_mas_selectivo(self):
+        paises = [{"NOMBRE": f"Pais {i}", "POBLACION": i, "SUPERFICIE": i % 7,
+                   "CONTINENTE": "Oceanía" if i % 100 == 0 else "Asia"} for i in range(1000)]
+        lista = main.ListaPaises(paises)
+        lista.indice_ordenado("POBLACION")
+        # Con el índice ordenado, 11 países en el rango: se usa el índice y el continente se verifica
+        plan = main.planificar_consulta(lista, continente="asia", poblacion=(500, 510))
+        self.assertEqual([(paso["clave"], paso["estrategia"]) for paso in plan],
+                         [("POBLACION", "indice_ordenado"), ("CONTINENTE", "verificacion")])
+        self.assertEqual(plan[0]["estimado"], 11)
+        # Un rango que deja casi toda la lista no justifica el índice: se recorre el continente
+        plan = main.planificar_consulta(lista, continente="oceania", poblacion=(0, 900))
+        self.assertEqual([(paso["clave"], paso["estrategia"]) for paso in plan],
+                         [("CONTINENTE", "recorrido"), ("POBLACION", "verificacion")])
+        self.assertEqual(list(main.ejecutar_plan(lista, plan)), list(range(0, 901, 100)))
+
+    def test_lista_comun(self):
+        generador = random.Random(4)
+        paises = paises_al_azar(generador, 300)
+        self.comparar(paises, paises, generador, 150)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# Pruebas de los rankings (K mayores o menores) contra sorted(...)[:k]
+import random
+import unittest
+
+from utilidades import consulta_lineal, criterios_al_azar, main, paises_al_azar
+
+
+class PruebasRanking(unittest.TestCase):
+    """
+    ranking_paises y ranking_lista dan lo mismo que ordenar todo con sorted
+    y cortar los primeros k, también en los empates y en las dos
+    direcciones, con y sin el índice ordenado armado.
+    """
+    def test_contra_sorted(self):
+        generador = random.Random(23)
+        for cantidad in (0, 1, 5, 300):
+            paises = paises_al_azar(generador, cantidad)
+            lista = main.ListaPaises(paises)
+            for con_indice in (False, True):
+                if con_indice:
+                    for clave in main.CLAVES_NUMERICAS:
+                        lista.indice_ordenado(clave)
+                for clave in main.CLAVES_NUMERICAS:
+                    for mayores in (True, False):
+                        for k in (0, 1, 3, 50, cantidad, cantidad + 5):
+                            esperado = sorted(paises, key=lambda pais: pais[clave], reverse=mayores)[:k]
+                            self.assertEqual([dict(pais) for pais in main.ranking_paises(lista, clave, k, mayores)], esperado)
+                            self.assertEqual(main.ranking_paises(paises, clave, k, mayores), esperado)
+
+    def test_con_filtros(self):
+        generador = random.Random(24)
+        paises = paises_al_azar(generador, 400)
+        lista = main.ListaPaises(paises)
+        for _ in range(150):
+            criterios = criterios_al_azar(generador, paises)
+            del criterios["termino"]
+            clave, mayores, k = generador.choice(main.CLAVES_NUMERICAS), generador.random() < 0.5, generador.randint(1, 30)
+            filtrados = [paises[i] for i in consulta_lineal(paises, **criterios)]
+            esperado = sorted(filtrados, key=lambda pais: pais[clave], reverse=mayores)[:k]
+            obtenido = main.ranking_lista(lista, clave, k, mayores, **criterios)
+            self.assertEqual([dict(pais) for pais in obtenido], esperado, (criterios, clave, mayores, k))
+
+    def test_clave_no_numerica(self):
+        with self.assertRaises(ValueError):
+            main.ranking_paises([], "NOMBRE", 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# Pruebas del servicio HTTP: consultas, errores, escrituras y lecturas en paralelo
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+from utilidades import consulta_lineal, main, paises_al_azar
+
+
+class PruebasServicio(unittest.TestCase):
+    """
+    ServicioPaises sobre un CSV temporal: las respuestas coinciden con un
+    recorrido de la lista y ningún parámetro inválido deja la petición sin
+    respuesta.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+        self.paises = paises_al_azar(random.Random(17), 150)
+        main.escribir_csv_atomico(self.paises, self.nombre_archivo)
+
+    def tearDown(self):
+        main._entradas_journal.pop(self.nombre_archivo, None)
+        self.carpeta.cleanup()
+
+    def servir(self, prueba, procesos=1):
+        """
+        Ejecuta la corrutina prueba(servicio) con el servicio iniciado.
+        """
+        async def ejecutar():
+            servicio = main.ServicioPaises(self.nombre_archivo, procesos)
+            await servicio.iniciar()
+            try:
+                await asyncio.wait_for(prueba(servicio), 30)
+            finally:
+                await servicio.cerrar()
+        asyncio.run(ejecutar())
+
+    def test_consultas_y_errores(self):
+        async def prueba(servicio):
+            estado, texto = await servicio.responder("GET", "/filter", {"continent": "asia", "pop_min": "3", "sort": "POBLACION:desc"}, b"")
+            self.assertEqual(estado, 200)
+            esperado = consulta_lineal(self.paises, continente="asia", poblacion=(3, main.sys.maxsize), orden=(("POBLACION",), (True,)))
+            self.assertEqual(json.loads(texto), [self.paises[i] for i in esperado])
+
+            for parametros in ({"pop_min": "1e400"}, {"pop_max": "1.5"}, {"limit": "abc"}, {"color": "rojo"}):
+                estado, texto = await servicio.responder("GET", "/filter", parametros, b"")
+                self.assertEqual(estado, 400, parametros)
+                self.assertIn("error", json.loads(texto))
+
+            # Un número que no entra en las columnas se rechaza sin tocar la lista
+            for datos in ({"NOMBRE": "Enorme", "POBLACION": 10**30, "SUPERFICIE": 1, "CONTINENTE": "Asia"}, [1, 2]):
+                estado, _ = await servicio.responder("POST", "/countries", None, json.dumps(datos).encode())
+                self.assertEqual(estado, 400)
+            self.assertEqual([dict(pais) for pais in servicio.lista], self.paises)
+        self.servir(prueba)
+
+    def test_numero_enorme_por_la_red(self):
+        async def prueba(servicio):
+            servidor = await asyncio.start_server(servicio.atender, "127.0.0.1", 0)
+            async with servidor:
+                puerto = servidor.sockets[0].getsockname()[1]
+                lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+                escritor.write(b"GET /filter?pop_min=1e400 HTTP/1.1\r\nConnection: close\r\n\r\n")
+                respuesta = await lector.read()
+                escritor.close()
+            self.assertTrue(respuesta.startswith(b"HTTP/1.1 400 "), respuesta)
+        self.servir(prueba)
+
+    def test_escrituras(self):
+        async def prueba(servicio):
+            nuevo = {"NOMBRE": "Nuevo País", "POBLACION": 4, "SUPERFICIE": 4, "CONTINENTE": "Asia"}
+            estado, _ = await servicio.responder("POST", "/countries", None, json.dumps(nuevo).encode())
+            self.assertEqual(estado, 201)
+            estado, _ = await servicio.responder("POST", "/countries", None, json.dumps(nuevo).encode())
+            self.assertEqual(estado, 409)
+            estado, _ = await servicio.responder("PUT", "/countries/nuevo pais", None, b'{"POBLACION": 9, "SUPERFICIE": 2}')
+            self.assertEqual(estado, 200)
+            self.paises.append({**nuevo, "POBLACION": 9, "SUPERFICIE": 2})
+            _, texto = await servicio.responder("GET", "/filter", {"pop_min": "9"}, b"")
+            self.assertEqual(json.loads(texto), [self.paises[i] for i in consulta_lineal(self.paises, poblacion=(9, main.sys.maxsize))])
+        self.servir(prueba)
+        # Los cambios quedaron guardados
+        self.assertEqual([dict(pais) for pais in main.cargar_datos_csv(self.nombre_archivo)], self.paises)
+
+    def test_lecturas_en_paralelo(self):
+        # La primera consulta solo termina cuando empieza la segunda: si las lecturas
+        # se resolvieran de a una en el bucle de eventos, la primera no terminaría nunca
+        segunda_empezo = threading.Event()
+
+        async def prueba(servicio):
+            consultar = servicio.consultar
+
+            def consultar_con_espera(ruta, parametros):
+                if parametros.get("q") == "a":
+                    self.assertTrue(segunda_empezo.wait(10))
+                else:
+                    segunda_empezo.set()
+                return consultar(ruta, parametros)
+
+            servicio.consultar = consultar_con_espera
+            (estado_lenta, _), (estado_rapida, _) = await asyncio.gather(
+                servicio.responder("GET", "/search", {"q": "a"}, b""),
+                servicio.responder("GET", "/stats", {}, b""))
+            self.assertEqual((estado_lenta, estado_rapida), (200, 200))
+        self.servir(prueba)
+
+    def test_con_procesos(self):
+        async def prueba(servicio):
+            consultas = [servicio.responder("GET", "/filter", {"pop_min": str(minimo), "continent": "europa"}, b"")
+                         for minimo in range(10)]
+            escritura = servicio.responder("PUT", f"/countries/{self.paises[0]['NOMBRE']}", None, b'{"POBLACION": 5, "SUPERFICIE": 5}')
+            respuestas = await asyncio.gather(escritura, *consultas)
+            self.assertTrue(all(estado == 200 for estado, _ in respuestas))
+            self.paises[0].update(POBLACION=5, SUPERFICIE=5)
+            for minimo in range(10):
+                _, texto = await servicio.responder("GET", "/filter", {"pop_min": str(minimo), "continent": "europa"}, b"")
+                esperado = consulta_lineal(self.paises, continente="europa", poblacion=(minimo, main.sys.maxsize))
+                self.assertEqual(json.loads(texto), [self.paises[i] for i in esperado])
+        self.servir(prueba, procesos=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
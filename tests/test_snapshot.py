@@ -0,0 +1,123 @@
+# Pruebas del snapshot binario: ida y vuelta, snapshots viejos o dañados y lectura mapeada
+import os
+import random
+import tempfile
+import unittest
+
+from utilidades import ORDENES, consulta_lineal, criterios_al_azar, main, paises_al_azar
+
+
+class PruebasSnapshot(unittest.TestCase):
+    """
+    leer_snapshot devuelve la misma lista que se escribió y descarta el
+    snapshot si el CSV cambió o si el archivo quedó cortado.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+        self.paises = paises_al_azar(random.Random(11), 200, valores=10**12)
+        self.paises.append({"NOMBRE": "Côte d'Ivoire, 中国", "POBLACION": main.sys.maxsize, "SUPERFICIE": 0, "CONTINENTE": "África"})
+        main.escribir_csv_atomico(self.paises, self.nombre_archivo)
+
+    def tearDown(self):
+        main._entradas_journal.pop(self.nombre_archivo, None)
+        self.carpeta.cleanup()
+
+    def test_ida_y_vuelta(self):
+        for paises in (self.paises, []):
+            main.escribir_snapshot(main.ListaPaises(paises), self.nombre_archivo)
+            leida = main.leer_snapshot(self.nombre_archivo)
+            self.assertEqual([dict(pais) for pais in leida], paises)
+            # La lista leída se puede seguir modificando
+            leida.append({"NOMBRE": "Nuevo", "POBLACION": 1, "SUPERFICIE": 2, "CONTINENTE": "Asia"})
+            self.assertEqual(main.buscar_pais_lista(leida, "nuevo")["SUPERFICIE"], 2)
+
+    def test_carga_desde_el_snapshot(self):
+        primera = main.cargar_datos_csv(self.nombre_archivo)
+        self.assertTrue(os.path.exists(self.nombre_archivo + ".snapshot"))
+        self.assertIsNotNone(main.leer_snapshot(self.nombre_archivo))
+        self.assertEqual([dict(pais) for pais in main.cargar_datos_csv(self.nombre_archivo)], [dict(pais) for pais in primera])
+
+    def test_csv_modificado(self):
+        main.escribir_snapshot(main.ListaPaises(self.paises), self.nombre_archivo)
+        # Misma cantidad de bytes, otra fecha de modificación
+        datos = os.stat(self.nombre_archivo)
+        os.utime(self.nombre_archivo, ns=(datos.st_atime_ns, datos.st_mtime_ns + 1))
+        self.assertIsNone(main.leer_snapshot(self.nombre_archivo))
+        # Al cargar se lee el CSV y el snapshot se vuelve a escribir
+        self.assertEqual([dict(pais) for pais in main.cargar_datos_csv(self.nombre_archivo)], self.paises)
+        self.assertIsNotNone(main.leer_snapshot(self.nombre_archivo))
+
+    def test_snapshot_cortado(self):
+        main.escribir_snapshot(main.ListaPaises(self.paises), self.nombre_archivo)
+        nombre_snapshot = self.nombre_archivo + ".snapshot"
+        for largo in (os.path.getsize(nombre_snapshot) // 2, 10, 0):
+            with open(nombre_snapshot, 'r+b') as archivo:
+                archivo.truncate(largo)
+            self.assertIsNone(main.leer_snapshot(self.nombre_archivo), largo)
+        self.assertEqual([dict(pais) for pais in main.cargar_datos_csv(self.nombre_archivo)], self.paises)
+
+
+class PruebasSnapshotMapeado(unittest.TestCase):
+    """
+    La lista mapeada con abrir_snapshot_mapeado se lee y se consulta igual
+    que la cargada, no se puede modificar y se abre solo si el snapshot
+    está al día.
+    """
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.nombre_archivo = os.path.join(self.carpeta.name, "paises.csv")
+        self.paises = paises_al_azar(random.Random(12), 300)
+        main.escribir_csv_atomico(self.paises, self.nombre_archivo)
+        main.escribir_snapshot(main.ListaPaises(self.paises), self.nombre_archivo)
+
+    def tearDown(self):
+        main._entradas_journal.pop(self.nombre_archivo, None)
+        self.carpeta.cleanup()
+
+    def test_consultas(self):
+        generador = random.Random(12)
+        with main.abrir_snapshot_mapeado(self.nombre_archivo) as mapeada:
+            self.assertEqual([dict(pais) for pais in mapeada], self.paises)
+            self.assertEqual(main.calcular_estadisticas(mapeada), main.calcular_estadisticas(self.paises))
+            for _ in range(100):
+                consulta = {**criterios_al_azar(generador, self.paises), "orden": generador.choice(ORDENES)}
+                obtenido = [pais.posicion for pais in main.consultar_lista(mapeada, **consulta)]
+                self.assertEqual(obtenido, consulta_lineal(self.paises, **consulta), consulta)
+
+    def test_solo_lectura(self):
+        with main.abrir_snapshot_mapeado(self.nombre_archivo) as mapeada:
+            with self.assertRaises(TypeError):
+                mapeada.append({"NOMBRE": "Nuevo", "POBLACION": 1, "SUPERFICIE": 1, "CONTINENTE": "Asia"})
+            with self.assertRaises(TypeError):
+                mapeada.actualizar(0, 1, 1)
+            with self.assertRaises(TypeError):
+                mapeada[0]["POBLACION"] = 1
+            # Las columnas son vistas de solo lectura sobre el archivo
+            with self.assertRaises(TypeError):
+                mapeada.poblaciones[0] = 1
+            self.assertEqual(len(mapeada), len(self.paises))
+        self.assertEqual(list(main.leer_paises_csv(self.nombre_archivo)), self.paises)
+
+    def test_snapshot_viejo_o_journal_pendiente(self):
+        lista = main.cargar_datos_csv(self.nombre_archivo)
+        pais = lista[0]
+        main.modificar_pais(lista, pais, 5, 5)
+        main.guardar_cambio_pais(lista, self.nombre_archivo, "MODIFICACION", pais)
+        # Con cambios en el journal, las consultas no usan el snapshot mapeado
+        consultas = main.cargar_para_consultas(self.nombre_archivo)
+        self.assertNotIsInstance(consultas, main.ListaPaisesMapeada)
+        self.assertEqual((consultas[0]["POBLACION"], consultas[0]["SUPERFICIE"]), (5, 5))
+
+        main.compactar_datos(lista, self.nombre_archivo)
+        with main.cargar_para_consultas(self.nombre_archivo) as mapeada:
+            self.assertIsInstance(mapeada, main.ListaPaisesMapeada)
+            self.assertEqual([dict(pais) for pais in mapeada], [dict(pais) for pais in lista])
+
+        with open(self.nombre_archivo, 'a', encoding='utf-8') as archivo:
+            archivo.write("Otro,1,1,Asia\n")
+        self.assertIsNone(main.abrir_snapshot_mapeado(self.nombre_archivo))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# Pruebas de la tabla de países: escritura por bloques y paginación
+import contextlib
+import io
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+from utilidades import main, paises_al_azar
+
+
+class PruebasTabla(unittest.TestCase):
+    """
+    La tabla escrita por bloques o por páginas tiene las mismas filas que
+    formatear_tabla, con países de una ListaPaises o diccionarios.
+    """
+    def setUp(self):
+        self.paises = paises_al_azar(random.Random(17), 23, valores=10**9)
+        self.lista = main.ListaPaises(self.paises)
+        self.pausar = main._pantalla["pausar"]
+
+    def tearDown(self):
+        main._pantalla["pausar"] = self.pausar
+
+    def ejecutar(self, funcion, entrada=""):
+        """
+        Ejecuta funcion() con la entrada dada y devuelve lo que imprimió. Si
+        pide más entrada de la dada, input() termina con EOFError.
+        """
+        entrada_original = sys.stdin
+        sys.stdin = io.StringIO(entrada)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) as salida:
+                funcion()
+        finally:
+            sys.stdin = entrada_original
+        return salida.getvalue()
+
+    def test_escritura_por_bloques(self):
+        esperado = main.formatear_tabla(self.paises) + "\n"
+        self.assertEqual(main.formatear_tabla(self.lista), main.formatear_tabla(self.paises))
+        for filas in (1, 7, 23, main.FILAS_POR_BLOQUE):
+            with mock.patch.object(main, "FILAS_POR_BLOQUE", filas):
+                for paises in (self.lista, self.paises, list(self.lista)):
+                    salida = io.StringIO()
+                    main.escribir_tabla(paises, salida)
+                    self.assertEqual(salida.getvalue(), esperado, filas)
+
+    def test_sin_pausa(self):
+        main._pantalla["pausar"] = False
+        salida = self.ejecutar(lambda: main.mostrar_lista_paises(self.lista))
+        self.assertEqual(salida, main.formatear_tabla(self.paises) + "\n")
+        self.assertIn("No se encontraron", self.ejecutar(lambda: main.mostrar_lista_paises([])))
+
+    def test_paginas(self):
+        # 5 filas por página: 5 páginas; se avanza, se vuelve una y se sigue hasta el final
+        filas = main.lineas_tabla(self.paises)
+        with mock.patch.object(main.shutil, "get_terminal_size", return_value=os.terminal_size((80, 11))):
+            salida = self.ejecutar(lambda: main.paginar_tabla(self.lista), "\na\n\n\n\n\n\n")
+        mostradas = [linea for linea in salida.splitlines() if linea in filas]
+        esperado = filas[0:5] + filas[5:10] + filas[0:5] + filas[5:10] + filas[10:15] + filas[15:20] + filas[20:23]
+        self.assertEqual(mostradas, esperado)
+        self.assertIn("Página 5/5", salida)
+
+        with mock.patch.object(main.shutil, "get_terminal_size", return_value=os.terminal_size((80, 11))):
+            salida = self.ejecutar(lambda: main.paginar_tabla(self.lista), "q\n")
+        self.assertEqual([linea for linea in salida.splitlines() if linea in filas], filas[0:5])
+
+
+if __name__ == "__main__":
+    unittest.main()
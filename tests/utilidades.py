@@ -0,0 +1,88 @@
+# Datos y referencias comunes de las pruebas
+import os
+import sys
+
+# Permite importar main.py desde la carpeta del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+# Ordenamientos de las consultas al azar (incluye una sola clave numérica descendente)
+ORDENES = (None, (("POBLACION",), (True,)), (("SUPERFICIE",), (False,)), (("NOMBRE",), (False,)),
+           (("CONTINENTE", "POBLACION"), (False, True)), (("POBLACION", "NOMBRE"), True))
+
+# Sílabas de los nombres inventados (con tildes y eñes para probar la normalización)
+SILABAS = ("ar", "gen", "ti", "na", "Á", "sil", "chí", "le", "pe", "ru", "co", "lóm", "bia", "ña", "stan", "ur")
+
+#Genera paises al azar
+def paises_al_azar(generador, cantidad, valores=10):
+    """
+    Genera países con nombres únicos y valores chicos, para que haya
+    muchos empates de población y superficie.
+
+    Args:
+        generador (random.Random): El generador de números al azar.
+        cantidad (int): Cantidad de países.
+        valores (int): Los valores numéricos van de 0 a valores - 1.
+
+    Returns:
+        list: Los países (diccionarios).
+    """
+    return [{"NOMBRE": "".join(generador.choices(SILABAS, k=generador.randint(1, 3))).title() + f" {i}",
+             "POBLACION": generador.randrange(valores),
+             "SUPERFICIE": generador.randrange(valores),
+             "CONTINENTE": generador.choice(list(main.CONTINENTES.values()))}
+            for i in range(cantidad)]
+
+#Criterios de consulta al azar
+def criterios_al_azar(generador, paises, valores=10):
+    """
+    Elige una consulta al azar: parte de un nombre existente (o uno que no
+    existe), continente con otras mayúsculas o tildes, y rangos que pueden
+    quedar vacíos o abarcar todo.
+
+    Returns:
+        dict: 'termino', 'continente', 'poblacion' y 'superficie'.
+    """
+    def rango():
+        if generador.random() < 0.5:
+            return None
+        minimo = generador.randrange(-1, valores + 1)
+        # Como en la línea de comandos, un rango sin máximo llega hasta sys.maxsize
+        return minimo, min(sys.maxsize, minimo + generador.choice((0, 1, 3, valores, sys.maxsize)))
+
+    termino = None
+    if generador.random() < 0.5:
+        nombre = generador.choice(paises)["NOMBRE"] if paises else "x"
+        inicio = generador.randrange(len(nombre))
+        termino = generador.choice((nombre[inicio:inicio + generador.randint(1, 4)].upper(), "zzz", "a"))
+    continente = generador.choice((None, None, "asia", "EUROPA", "America", "África", "marte"))
+    return {"termino": termino, "continente": continente, "poblacion": rango(), "superficie": rango()}
+
+#Consulta de referencia: recorre la lista sin indices ni cache
+def consulta_lineal(paises, termino=None, continente=None, poblacion=None, superficie=None, orden=None, limite=None):
+    """
+    Resuelve una consulta de consultar_lista con un recorrido y sorted,
+    sin índices, caché ni planificador.
+
+    Returns:
+        list: Las posiciones de los países, en el orden del resultado.
+    """
+    def cumple(pais):
+        if termino is not None and main.normalizar_texto(termino) not in main.normalizar_texto(pais["NOMBRE"]):
+            return False
+        if continente is not None and main.normalizar_texto(continente) != main.normalizar_texto(pais["CONTINENTE"]):
+            return False
+        for clave, rango in (("POBLACION", poblacion), ("SUPERFICIE", superficie)):
+            if rango is not None and not rango[0] <= pais[clave] <= rango[1]:
+                return False
+        return True
+
+    posiciones = [i for i, pais in enumerate(paises) if cumple(pais)]
+    if orden is not None:
+        claves, reversas = orden
+        reversas = (reversas,) * len(claves) if isinstance(reversas, bool) else reversas
+        # sorted es estable: de la última clave a la primera
+        for clave, reversa in reversed(list(zip(claves, reversas))):
+            posiciones = sorted(posiciones, key=lambda i: paises[i][clave], reverse=reversa)
+    return posiciones[:limite] if limite is not None else posiciones